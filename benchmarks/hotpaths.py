@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""hotpaths.py
+
+Benchmarks of the ArrayRegion hot paths, for every flora system and a range of grid sizes, with the same paths of the
+networkx Region (the region_ cases) on the small grids for comparison. Every case builds its region
+from a fixed seed, so two runs do the same work, and reports seconds per tick (the best of a few repeats), cells per
+second and the peak memory allocated while it ran (from tracemalloc, in a separate untimed run). Results are written
+to JSON together with the commit and library versions, and a run can be compared against an earlier results file,
+which flags every case that got slower or bigger by more than a tolerance and exits with status 1. Cases that are in
+only one of the two files are listed too.
+
+Run from the repository root:
+
+    python -m benchmarks.hotpaths --out bench.json
+    python -m benchmarks.hotpaths --quick --out new.json --compare bench.json
+    python -m benchmarks.hotpaths --cases pass_time find_basins --sizes 100 1000 --flora-systems 1 3
+
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from beringia.arrayregion import ArrayRegion
+from beringia.localebase import Locale
+from beringia.region import Region
+
+
+SIZES = (10, 32, 100, 316, 1000)
+QUICK_SIZES = (10, 32, 100)
+FLORA_SYSTEMS = (0, 1, 2, 3, 4)
+
+# locale_objects builds a Python object model per cell, so it is only run on grids up to this size.
+OBJECT_MODEL_CELLS = 100000
+# The region_ cases build a networkx Region, with a Locale per cell, so they are only run on grids up to this size.
+REGION_CELLS = 10000
+
+
+def _region(size, flora_system, seed, elevation=False):
+    region = ArrayRegion(size, size, flora_system=flora_system, seed=seed)
+    if elevation:
+        region.randomize_elevation_base()
+    return region
+
+
+def bench_init(size, flora_system, seed):
+    return None, lambda: ArrayRegion(size, size, flora_system=flora_system, seed=seed)
+
+
+def bench_pass_time(size, flora_system, seed):
+    region = _region(size, flora_system, seed, elevation=True)
+    return region, region.pass_time
+
+
+def bench_spread_fire(size, flora_system, seed):
+    """Fire spreading from the same forced ignitions every tick, on flora grown for a few ticks first."""
+    region = _region(size, flora_system, seed)
+    region.pass_time(10)
+    rng = np.random.default_rng(seed)
+    ignitions = rng.choice(region.n_cells, max(1, region.n_cells // 1000), replace=False)
+    state = region.flora_state.copy()
+
+    def tick():
+        region.flora_state[:] = state
+        region.on_fire[:] = 0
+        region.on_fire[ignitions] = 1
+        region.spread_fire(show=False)
+    return region, tick
+
+
+def bench_erode_all(size, flora_system, seed):
+    region = _region(size, flora_system, seed, elevation=True)
+    return region, lambda: region.erode_all(**region.erosion_parameters)
+
+
+def bench_find_basins(size, flora_system, seed):
+    """A full flood every tick."""
+    region = _region(size, flora_system, seed, elevation=True)
+
+    def tick():
+        region.invalidate_basins()
+        region.find_basins()
+    return region, tick
+
+
+def bench_find_basins_eroded(size, flora_system, seed):
+    """The incremental update after one tick of erosion, which is untimed."""
+    region = _region(size, flora_system, seed, elevation=True)
+    region.find_basins()
+    return region, region.find_basins, lambda: region.erode_all(**region.erosion_parameters)
+
+
+def bench_get_map_array(size, flora_system, seed):
+    region = _region(size, flora_system, seed, elevation=True)
+    return region, lambda: [region.get_map_array(kind) for kind in ('flora', 'elevation', 'fire')]
+
+
+def bench_get_neighbors(size, flora_system, seed, depth=3):
+    region = _region(size, flora_system, seed)
+    return region, lambda: region.get_neighbors(size // 2, size // 2, depth=depth)
+
+
+def bench_randomize_elevation_base_cov(size, flora_system, seed):
+    region = _region(size, flora_system, seed)
+    return region, region.randomize_elevation_base_cov
+
+
+def bench_randomize_terrain(size, flora_system, seed):
+    region = _region(size, flora_system, seed)
+    return region, lambda: region.randomize_terrain(correlation_length=8.0)
+
+
+def bench_locale_objects(size, flora_system, seed):
+    """A Locale per cell, as Region builds them, each run for a tick so its flora and fauna are built. peak_bytes over
+    cells is the memory of the object model per cell."""
+    if size * size > OBJECT_MODEL_CELLS:
+        return None
+    np.random.seed(seed)
+
+    def tick():
+        locales = [Locale(flora_system=flora_system) for _ in range(size * size)]
+        for locale in locales:
+            locale.pass_time()
+        return locales
+    return None, tick
+
+
+def _networkx_region(size, flora_system, seed, elevation=False):
+    if size * size > REGION_CELLS:
+        return None
+    region = Region(size, size, flora_system=flora_system, seed=seed)
+    if elevation:
+        region.randomize_elevation_base()
+    return region
+
+
+def bench_region_init(size, flora_system, seed):
+    if size * size > REGION_CELLS:
+        return None
+    return None, lambda: Region(size, size, flora_system=flora_system, seed=seed)
+
+
+def bench_region_pass_time(size, flora_system, seed):
+    region = _networkx_region(size, flora_system, seed, elevation=True)
+    if region is None:
+        return None
+    return region, region.pass_time
+
+
+def bench_region_spread_fire(size, flora_system, seed):
+    """bench_spread_fire on a Region. Restoring the flora and the ignitions is untimed."""
+    region = _networkx_region(size, flora_system, seed)
+    if region is None:
+        return None
+    region.pass_time(10)
+    locales = [region.get_locale(*node) for node in region.nodes]
+    rng = np.random.default_rng(seed)
+    ignitions = rng.choice(len(locales), max(1, len(locales) // 1000), replace=False)
+    states = [locale.flora.state for locale in locales]
+
+    def reset():
+        for locale, state in zip(locales, states):
+            locale.flora.state = state
+            locale.flora.on_fire = 0
+            locale.on_fire = 0
+        for cell in ignitions:
+            locales[cell].flora.on_fire = 1
+            locales[cell].on_fire = 1
+    return region, lambda: region.spread_fire(show=False), reset
+
+
+def bench_region_erode_all(size, flora_system, seed):
+    region = _networkx_region(size, flora_system, seed, elevation=True)
+    if region is None:
+        return None
+    return region, lambda: region.erode_all(magnitude=0.1)
+
+
+def bench_region_find_basins(size, flora_system, seed):
+    region = _networkx_region(size, flora_system, seed, elevation=True)
+    if region is None:
+        return None
+    return region, region.find_basins
+
+
+CASES = {
+    'init': bench_init,
+    'pass_time': bench_pass_time,
+    'spread_fire': bench_spread_fire,
+    'erode_all': bench_erode_all,
+    'find_basins': bench_find_basins,
+    'find_basins_eroded': bench_find_basins_eroded,
+    'get_map_array': bench_get_map_array,
+    'get_neighbors': bench_get_neighbors,
+    'randomize_elevation_base_cov': bench_randomize_elevation_base_cov,
+    'randomize_terrain': bench_randomize_terrain,
+    'locale_objects': bench_locale_objects,
+    'region_init': bench_region_init,
+    'region_pass_time': bench_region_pass_time,
+    'region_spread_fire': bench_region_spread_fire,
+    'region_erode_all': bench_region_erode_all,
+    'region_find_basins': bench_region_find_basins
+}
+
+
+def measure(case, size, flora_system, seed=0, ticks=5, repeat=3):
+    """Time one case.
+
+    Args:
+        case (str): A key of CASES.
+        size (int): The grid is size x size.
+        flora_system (int):
+        seed (int):
+        ticks (int): Calls per repeat.
+        repeat (int): The fastest repeat is reported.
+
+    Returns:
+        dict: The case, its settings, seconds_per_tick, cells_per_second and peak_bytes, or skipped.
+
+    """
+    result = {'case': case, 'flora_system': flora_system, 'xdim': size, 'ydim': size, 'cells': size * size,
+              'seed': seed, 'ticks': ticks}
+    setup = CASES[case](size, flora_system, seed)
+    if setup is None:
+        result['skipped'] = True
+        return result
+    function, between = setup[1], (setup[2] if len(setup) > 2 else None)
+    best = np.inf
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(ticks):
+            if between is not None:
+                between()
+            start = time.perf_counter()
+            function()
+            elapsed += time.perf_counter() - start
+        best = min(best, elapsed)
+    result['seconds_per_tick'] = best / ticks
+    result['cells_per_second'] = size * size * ticks / best if best else float('inf')
+
+    setup = CASES[case](size, flora_system, seed)
+    tracemalloc.start()
+    try:
+        if len(setup) > 2:
+            setup[2]()
+        tracemalloc.reset_peak()
+        setup[1]()
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def environment():
+    """The commit and versions a results file was made with."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run(cases=None, sizes=SIZES, flora_systems=FLORA_SYSTEMS, seed=0, ticks=5, repeat=3, verbose=True):
+    """Measure every combination of case, size and flora system.
+
+    Returns:
+        dict: 'environment' and 'results', a list of measure dicts.
+
+    """
+    results = []
+    for case in cases or CASES:
+        for size in sizes:
+            for flora_system in flora_systems:
+                result = measure(case, size, flora_system, seed, ticks, repeat)
+                results.append(result)
+                if verbose:
+                    print(_describe(result), file=sys.stderr)
+    return {'environment': environment(), 'results': results}
+
+
+def _key(result):
+    return result['case'], result['flora_system'], result['xdim'], result['ydim']
+
+
+def _describe(result):
+    name = '{case} flora_system={flora_system} {xdim}x{ydim}'.format(**result)
+    if result.get('skipped'):
+        return name + ': skipped'
+    return name + ': {:.6f} s/tick, {:.3g} cells/s, {:.1f} MB peak'.format(
+        result['seconds_per_tick'], result['cells_per_second'], result['peak_bytes'] / 2 ** 20)
+
+
+def compare(current, baseline, tolerance=0.25, floor=1e-3):
+    """Find the cases of current that are slower, or use more memory, than in baseline.
+
+    Args:
+        current (dict): From run, or loaded from its JSON.
+        baseline (dict):
+        tolerance (float): Allowed relative increase.
+        floor (float): Seconds per tick below which timing differences are treated as noise.
+
+    Returns:
+        list: A dict per regression with the case, the metric and both values.
+
+    """
+    before = {_key(result): result for result in baseline['results'] if not result.get('skipped')}
+    regressions = []
+    for result in current['results']:
+        old = before.get(_key(result))
+        if old is None or result.get('skipped'):
+            continue
+        for metric, minimum in (('seconds_per_tick', floor), ('peak_bytes', 0)):
+            if result[metric] > old[metric] * (1 + tolerance) and result[metric] - old[metric] > minimum:
+                regressions.append({'case': result['case'], 'flora_system': result['flora_system'],
+                                    'xdim': result['xdim'], 'ydim': result['ydim'], 'metric': metric,
+                                    'baseline': old[metric], 'current': result[metric],
+                                    'ratio': result[metric] / old[metric] if old[metric] else float('inf')})
+    return regressions
+
+
+def unmatched(current, baseline, cases=None):
+    """The cases measured in only one of current and baseline, such as renamed or removed ones, which compare skips.
+    Cases of baseline are only listed for the grid sizes and flora systems current was run with, so that a --quick run
+    can be checked against a full one.
+
+    Args:
+        current (dict):
+        baseline (dict):
+        cases (list): The cases current was restricted to, if any. Other cases of baseline are not listed.
+
+    Returns:
+        tuple: The (case, flora_system, xdim, ydim) keys only in current, and those only in baseline.
+
+    """
+    ran = {_key(result) for result in current['results'] if not result.get('skipped')}
+    before = {_key(result) for result in baseline['results'] if not result.get('skipped')}
+    settings = {key[1:] for key in ran}
+    missing = [key for key in before - ran if key[1:] in settings and (cases is None or key[0] in cases)]
+    return sorted(ran - before), sorted(missing)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='benchmarks.hotpaths',
+                                     description='Benchmark the ArrayRegion and Region hot paths.')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=None)
+    parser.add_argument('--sizes', nargs='+', type=int, default=None, help='Grid sides; the grids are square.')
+    parser.add_argument('--flora-systems', nargs='+', type=int, choices=range(5), default=list(FLORA_SYSTEMS))
+    parser.add_argument('--quick', action='store_true', help='Only the small sizes.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None, help='JSON file for the results.')
+    parser.add_argument('--compare', default=None, help='Earlier results JSON to check for regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative increase.')
+    parser.add_argument('--floor', type=float, default=1e-3, help='Ignore timing differences below this, in seconds.')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    current = run(args.cases, sizes, args.flora_systems, args.seed, args.ticks, args.repeat)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.floor)
+        for where, keys in zip(('current run', args.compare), unmatched(current, baseline, args.cases)):
+            for key in keys:
+                print('ONLY IN {} {} flora_system={} {}x{}'.format(where, *key))
+        for regression in regressions:
+            print('REGRESSION {case} flora_system={flora_system} {xdim}x{ydim} {metric}: {baseline:.6g} -> '
+                  '{current:.6g} ({ratio:.2f}x)'.format(**regression))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""__main__.py
+
+Command line entry point for unattended runs:
+
+    python -m beringia run --x 500 --y 500 --ticks 10000 --flora-system 3 --seed 7 --out run.npz
+
+The timing summary is printed to stdout as one line of JSON. The exit status is 0 on success, 1 if the run failed and
+2 for bad arguments.
+
+"""
+import argparse
+import json
+import sys
+import traceback
+
+from beringia.runner import run
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='beringia', description='Headless Beringia runs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Run one region and write its metrics.')
+    run_parser.add_argument('--x', type=int, default=100, help='x dimension.')
+    run_parser.add_argument('--y', type=int, default=100, help='y dimension.')
+    run_parser.add_argument('--ticks', type=int, default=100)
+    run_parser.add_argument('--flora-system', type=int, default=1, choices=range(5))
+    run_parser.add_argument('--grid-type', default='2d', choices=['2d', 'hex', 'tri'])
+    run_parser.add_argument('--fauna-depth', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=None)
+    run_parser.add_argument('--out', default=None, help='.npz file for metrics and snapshots.')
+    run_parser.add_argument('--snapshot-every', type=int, default=0, help='Ticks between layer snapshots.')
+    run_parser.add_argument('--randomize-elevation', action='store_true')
+    run_parser.add_argument('--metrics', default=None, help='CSV file to stream per tick metrics to.')
+    run_parser.add_argument('--trace', default=None, help='Binary file to record trace events to.')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        summary = run(
+            xdim=args.x, ydim=args.y, ticks=args.ticks, flora_system=args.flora_system, grid_type=args.grid_type,
+            seed=args.seed, out=args.out, snapshot_every=args.snapshot_every, fauna_depth=args.fauna_depth,
+            randomize_elevation=args.randomize_elevation, metrics=args.metrics, trace=args.trace
+        )
+    except Exception as error:
+        traceback.print_exc(file=sys.stderr)
+        print(json.dumps({'status': 'error', 'error': repr(error)}))
+        return 1
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
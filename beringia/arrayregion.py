@@ -0,0 +1,1087 @@
+# -*- coding: utf-8 -*-
+"""arrayregion.py
+
+An alternate region engine that stores every layer of the landscape in contiguous numpy arrays indexed by cell, rather
+than holding one Locale object per networkx node. The public interface mirrors beringia.region.Region, so scripts that
+call pass_time, show_map, get_map_array or get_locale keep working. get_locale returns a LocaleView, a lightweight
+window onto the arrays rather than a Locale.
+
+Cells are numbered 0..n_cells-1. On a '2d' grid cell (x, y) has id x * ydim + y, so any per cell layer reshaped to
+(xdim, ydim) lines up with get_map_array. Border cells, when present, are numbered after the interior cells and only
+carry geology layers. Adjacency comes from a shared beringia.neighbors.NeighborIndex, so every grid type uses the same
+array kernels.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import copy
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from beringia.soil import Geology, BorderGeology
+from beringia.flora import FloraSystem0, FloraSystem1, FloraSystem2, FloraSystem3, FloraSystem4, state_lookup_tables
+from beringia.fauna import BulkFauna, BulkFaunaD
+from beringia.neighbors import neighbor_index
+from beringia.rng import RandomStreams
+from beringia.instruments import Instruments
+from beringia.trace import Tracer, IGNITION, SPREAD, EROSION
+from beringia.dispersal import Dispersal, DISPERSAL_PARAMETERS
+from beringia.foodwebs import CompiledFoodWeb, read_food_webs, build_food_web, FOOD_WEBS_PATH
+from beringia.terrain import spectral_field, field_at
+from beringia import basins, snapshot
+from beringia.render import TerminalRenderer, glyph_codes, frame_string, COLOR_GLYPHS, PLAIN_GLYPHS, FIRE_CODE
+from beringia.constants import STATE_CONSTANTS, PLANT_COLOR_KEY, GRAYSCALE_COLOR_KEY
+from math import floor
+
+
+FLORA_SYSTEMS = {
+    0: FloraSystem0,
+    1: FloraSystem1,
+    2: FloraSystem2,
+    3: FloraSystem3,
+    4: FloraSystem4
+}
+
+FLORA_PARAMETERS = ('rate', 'max', 'fire_risk', 'fire_damage')
+FIRE_PARAMETERS = ('fire_spread_prob',)
+EROSION_PARAMETERS = ('magnitude', 'rate')
+FAUNA_RATES = ('reproduction_rate', 'starvation_rate', 'feeding_rate', 'emigration_rate', 'ambient_death_rate',
+               'cryptocity')
+
+
+class ArrayRegion(object):
+    """ArrayRegion class docs
+
+    A structure of arrays version of Region. Each layer (flora state, fire, elevation, soil, fauna) is a numpy array
+    with one entry per cell.
+
+    Args:
+        xdim (int):
+        ydim (int):
+        grid_type (str):
+        flora_system (int):
+        colorize (bool):
+        edges (bool):
+        slow_burn (bool):
+        fauna_depth (int): Number of species in the default simple food chain.
+        seed (int): Seed for the region's RandomStreams. Runs with the same seed are identical.
+
+    """
+    def __init__(self, xdim=10, ydim=10, grid_type='2d', flora_system=1, colorize=True, edges=True, slow_burn=False,
+                 fauna_depth=1, seed=None):
+        self._setup(xdim, ydim, grid_type, flora_system, colorize, edges, slow_burn, seed)
+        self.n_cells = self.neighbor_index.n_cells
+        self.n_border = self.neighbor_index.n_border
+        self.n_total = self.neighbor_index.n_total
+        self._allocate_layers()
+        for _ in range(fauna_depth):
+            self.insert_new_fauna()
+
+    def _setup(self, xdim, ydim, grid_type, flora_system, colorize, edges, slow_burn, seed):
+        """Everything but the layer arrays, so that load() can attach arrays it did not allocate."""
+        self.xdim = xdim
+        self.ydim = ydim
+        self.grid_type = grid_type
+        self.edges = edges
+        self.random = RandomStreams(seed)
+        self._neighbor_index = None
+        self.flora_system = flora_system
+        self.flora_class = FLORA_SYSTEMS.get(flora_system, FloraSystem1)
+        self._flora = self.flora_class()
+        self._geology = Geology()
+        self._border_geology = BorderGeology()
+        self.fauna = []
+        self.conversion_rates = {0: 0.2, 1: 0.1, 2: 0.15, 3: 0.05, 4: 0.1, 5: 0}
+        self.time = 0
+        self.colorize = colorize
+        self.slow_burn = slow_burn
+        self.renderer = None
+        self.tick_hooks = []
+        self.instruments = Instruments()
+        self.tracer = Tracer()
+        self.dispersal = Dispersal()
+        self.constants = STATE_CONSTANTS
+        self.verbose = False
+        self.basins_current = False
+        self.basin_stats = None
+        self.basin_map = None
+        self._basin_dirty = None
+        self._next_basin_label = 1
+        self.parameters = {}
+        self.flora_parameters = {}
+        self.fire_parameters = {}
+        self.erosion_parameters = {'magnitude': 0.1}
+        self.fauna_parameters = []
+
+    def _allocate_layers(self):
+        self.flora_state = np.full(self.n_cells, self._flora.state,
+                                   dtype=np.int64 if isinstance(self._flora.state, int) else np.float64)
+        self.on_fire = np.zeros(self.n_cells, dtype=np.int8)
+        self.elevation_base = np.full(self.n_total, self.random.terrain.gamma(5, 0.5), dtype=np.float64)
+        self.soil_depth = np.full(self.n_total, self._geology.soil_depth, dtype=np.float64)
+        self.soil_moisture = np.full(self.n_total, self._geology.soil_moisture, dtype=np.float64)
+        self.is_in_basin = np.zeros(self.n_total, dtype=bool)
+        self.basin_elevation = self.elevation.copy()
+        self.basin_label = np.zeros(self.n_cells, dtype=np.int64)
+        self.fauna_population = np.zeros((0, self.n_cells), dtype=np.float64)
+        self.fauna_stress = np.zeros((0, self.n_cells), dtype=np.float64)
+
+    def __repr__(self, verbose=False):
+        return f'array region {self.xdim}x{self.ydim}'
+
+    def __str__(self, verbose=False):
+        if not verbose or self.grid_type != '2d':
+            return f'array region {self.xdim}x{self.ydim}'
+        else:
+            return self.show_map(do_print=False)
+
+    def set_topology(self, index):
+        """Swap in a new NeighborIndex. The only way the topology of an ArrayRegion changes.
+
+        Args:
+            index (beringia.neighbors.NeighborIndex): Must have the same number of cells.
+
+        """
+        if index.n_total != self.n_total or index.n_cells != self.n_cells:
+            raise ValueError("A new topology must keep the same cells.")
+        self._neighbor_index = index
+        self.basin_map = None
+        self.invalidate_basins()
+
+    @property
+    def neighbor_index(self):
+        """beringia.neighbors.NeighborIndex: The shared adjacency of this topology, built on first use."""
+        if self._neighbor_index is None:
+            self._neighbor_index = neighbor_index(self.xdim, self.ydim, self.grid_type,
+                                                  self.edges and self.grid_type == '2d')
+        return self._neighbor_index
+
+    @property
+    def is_border(self):
+        """numpy.ndarray: True for the border cells."""
+        return self.neighbor_index.is_border
+
+    def save(self, path):
+        """Write the region to a snapshot directory. See beringia.snapshot.
+
+        Args:
+            path (str):
+
+        """
+        snapshot.save(self, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Read a region written by save.
+
+        Args:
+            path (str):
+            mmap_mode (str): None to read the layers into memory, or a numpy.load mmap_mode ('r', 'c', 'r+').
+
+        Returns:
+            ArrayRegion:
+
+        """
+        return snapshot.load(path, mmap_mode, cls)
+
+    def set_parameters(self, parameters):
+        """Override tunable constants by name, so they can be swept without editing code.
+
+        Names are dotted:
+            'state_constants.<state>.<key>': a STATE_CONSTANTS entry of FloraSystem0/1, eg
+                'state_constants.3.fireSpreadProb'.
+            'flora.<argument>': a bulk_step argument of FloraSystem2-4 (rate, max, fire_risk, fire_damage).
+            'fire.fire_spread_prob': the bulk_spread_prob argument of FloraSystem2-4.
+            'fauna.<attribute>' or 'fauna.<species>.<attribute>': a BulkFauna rate, for every species or one of them.
+            'erosion.<argument>': the erode_all arguments used by pass_time (magnitude, rate).
+            'dispersal.<attribute>': a Dispersal weight (flora_preference, elevation_aversion).
+
+        Overrides accumulate across calls and are kept in self.parameters. Fauna overrides are also set on every species
+        added later by insert_new_fauna or set_food_web, and a per species one waits until its species exists.
+
+        Args:
+            parameters (dict): {name: value}
+
+        Raises:
+            ValueError: For unknown names, names that do not apply to this flora system, or a negative
+                dispersal.flora_preference.
+
+        """
+        merged = dict(self.parameters, **parameters)
+        discrete = hasattr(self.flora_class, 'state_tables')
+        constants = copy.deepcopy(self._flora.STATE_CONSTANTS) if discrete else None
+        flora_parameters = {}
+        fire_parameters = {}
+        erosion_parameters = {'magnitude': 0.1}
+        fauna_parameters = {}
+        dispersal_parameters = {}
+        for name, value in merged.items():
+            group, _, key = name.partition('.')
+            if group == 'state_constants' and discrete:
+                state, _, key = key.partition('.')
+                if int(state) not in constants or key not in constants[int(state)]:
+                    raise ValueError(f"Unknown parameter {name}")
+                constants[int(state)][key] = value
+            elif group == 'flora' and not discrete and key in FLORA_PARAMETERS:
+                flora_parameters[key] = value
+            elif group == 'fire' and not discrete and key in FIRE_PARAMETERS:
+                fire_parameters[key] = value
+            elif group == 'erosion' and key in EROSION_PARAMETERS:
+                erosion_parameters[key] = value
+            elif group == 'fauna' and key.rpartition('.')[2] in FAUNA_RATES:
+                species, _, attribute = key.rpartition('.')
+                fauna_parameters[(int(species) if species else -1, attribute)] = value
+            elif group == 'dispersal' and key in DISPERSAL_PARAMETERS:
+                if key == 'flora_preference' and value < 0:
+                    raise ValueError(f"{name} can not be negative")
+                dispersal_parameters[key] = value
+            else:
+                raise ValueError(f"Unknown parameter {name} for flora system {self.flora_system}")
+        if discrete and any(name.startswith('state_constants.') for name in merged):
+            flora_parameters['tables'] = fire_parameters['tables'] = state_lookup_tables(constants)
+        if self.dispersal is not None:
+            for attribute, value in dispersal_parameters.items():
+                setattr(self.dispersal, attribute, value)
+        self.parameters = merged
+        self.flora_parameters = flora_parameters
+        self.fire_parameters = fire_parameters
+        self.erosion_parameters = erosion_parameters
+        # Overrides for every species come first, so that the per species ones win.
+        self.fauna_parameters = sorted(fauna_parameters.items())
+        self._apply_fauna_parameters()
+
+    def _apply_fauna_parameters(self):
+        """Set the fauna overrides on the current species. Run whenever species are added or replaced."""
+        for (species, attribute), value in self.fauna_parameters:
+            for taxa in self.fauna if species < 0 else self.fauna[species:species + 1]:
+                setattr(taxa, attribute, value)
+
+    @property
+    def elevation(self):
+        """numpy.ndarray: Surface elevation (elevation_base + soil_depth) of every cell, borders included."""
+        return self.elevation_base + self.soil_depth
+
+    @property
+    def state(self):
+        """numpy.ndarray: The integer flora state of every cell, as Locale.state reports it."""
+        return self.flora_state.astype(np.int64)
+
+    def _cell(self, x, y):
+        return self.neighbor_index.cell((x, y))
+
+    def _in_range(self, x, y):
+        cell = self.neighbor_index.cell((x, y))
+        return cell is not None and not self.is_border[cell]
+
+    def _layer(self, array):
+        return array[:self.n_cells].reshape(self.xdim, self.ydim)
+
+    def show_map(self, do_print=True, show_fire=True, colorize=True):
+        """show_map docs
+
+        Args:
+            do_print (bool): T/F, should the output be printed(T), or returned as an array(F).
+            show_fire (bool):
+            colorize (bool):
+
+        Returns:
+            str:
+
+        """
+        if self.grid_type == '2d':
+            glyphs = COLOR_GLYPHS if colorize else PLAIN_GLYPHS
+            if not do_print:
+                glyphs = glyphs.copy()
+                glyphs[FIRE_CODE] = "f"
+            out = frame_string(glyph_codes(self, show_fire), glyphs) + '\r'
+            if do_print:
+                print(out)
+            else:
+                return out
+        else:
+            print('!!! This grid type does not have this feature implemented !!!')
+
+    def show_fire_map(self, do_print=True):
+        """Display a visual representation of the region with fire state layered on if doPrint.
+
+        Args:
+            do_print (bool): T/F, should the output be printed(T), or returned as an array(F).
+
+        Returns:
+             str:
+
+        """
+        if self.grid_type == '2d':
+            fire = self._layer(self.on_fire)
+            out = ''.join(''.join(str(int(v)) for v in fire[:, y]) + '\n' for y in range(self.ydim))
+            if do_print:
+                print(out)
+            else:
+                return out
+        else:
+            print('!!! This grid type does not have this feature implemented !!!')
+
+    def show_elevation_map(self, do_print=True):
+        """show_elevation_map docs
+
+        Args:
+            do_print (bool): T/F, should the output be printed(T), or returned as an array(F).
+
+        Returns:
+            str:
+
+        """
+        if self.grid_type == '2d':
+            out = ''.join(''.join(self.view_elevation(x, y, colorize=True) for x in range(self.xdim)) + '\n'
+                          for y in range(self.ydim))
+            if do_print:
+                print(out)
+            else:
+                return out
+        else:
+            print('!!! This grid type does not have this feature implemented !!!')
+
+    def show_fauna_map(self, do_print=True, index=0):
+        """show_fauna_map docs
+
+        Args:
+            do_print (bool): T/F, should the output be printed(T), or returned as an array(F).
+            index (int): The index of which fauna should be displayed/returned.
+
+        Returns:
+            str:
+
+        """
+        if self.grid_type == '2d':
+            out = ''.join(''.join(str(self.view_fauna_pop(x, y, index, colorize=True, ceiling=10.0))
+                                  for x in range(self.xdim)) + '\n' for y in range(self.ydim))
+            if do_print:
+                print(out)
+            else:
+                return out
+        else:
+            print('!!! This grid type does not have this feature implemented !!!')
+
+    def get_map_array(self, kind="flora", index=0):
+        """Return a layer as an (xdim, ydim) array.
+
+        Args:
+            kind (str): "flora", "fauna", "elev"/"elevation", "fire", "soil", "moisture" or "basins" (the labels).
+            index (int): The fauna index, when kind is "fauna".
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        if self.grid_type != '2d':
+            print("Grid type:", self.grid_type, " not supported.")
+            return None
+        if kind == "flora":
+            layer = self.state
+        elif kind == "fauna":
+            layer = self.fauna_population[index] * 100
+        elif kind == "elev" or kind == "elevation":
+            layer = self.elevation
+        elif kind == "fire":
+            layer = self.on_fire
+        elif kind == "soil":
+            layer = self.soil_depth
+        elif kind == "moisture":
+            layer = self.soil_moisture
+        elif kind == "basins":
+            layer = self.get_basin_labels()
+        else:
+            layer = self.state
+            print("Map type error. Returning default.")
+        return self._layer(layer).astype(np.float64)
+
+    def show_heat_map(self, kind="flora"):
+        array = self.get_map_array(kind)
+        plt.imshow(array, cmap="YlGn")
+        plt.colorbar()
+        plt.show()
+
+    def pass_time(self, count=1, show_heat_map=False):
+        """Move forward one time(or count # of) step(s). Each phase is timed by self.instruments when it is enabled.
+
+        Args:
+            count (int):
+            show_heat_map (bool):
+
+        """
+        if show_heat_map and count > 50:
+            print("Count too high. Display hidden")
+            show_heat_map = False
+        if show_heat_map:
+            plt.imshow(self.get_map_array("flora"), cmap="YlGn")
+            plt.colorbar()
+        instruments = self.instruments
+        n = self.n_cells
+        for _ in range(count):
+            self.time += 1
+            self.tracer.tick = self.time
+            instruments.timed('flora', n, self._flora_phase)
+            instruments.timed('fauna', n * len(self.fauna), self._fauna_phase)
+            instruments.timed('fire', n, self.spread_fire, show=False)
+            transport = instruments.timed('erosion', n, self.erode_all, **self.erosion_parameters)
+            instruments.count('erosion_transport', transport)
+            for hook in self.tick_hooks:
+                instruments.timed('hooks', 0, hook, self)
+            instruments.end_tick(self)
+            if show_heat_map:
+                plt.imshow(self.get_map_array("flora"), cmap="YlGn")
+                plt.draw()
+                plt.pause(0.1)
+
+    def add_tick_hook(self, hook):
+        """Call hook(region) at the end of every tick of pass_time, eg a beringia.metrics.MetricsRecorder.
+
+        Args:
+            hook (callable):
+
+        """
+        self.tick_hooks.append(hook)
+
+    def remove_tick_hook(self, hook):
+        self.tick_hooks.remove(hook)
+
+    def _flora_phase(self):
+        """Burn, grow and risk fire in every cell at once, the per cell part of Locale.pass_time."""
+        self.flora_class.bulk_step(self.flora_state, self.on_fire, rng=self.random.flora, **self.flora_parameters)
+
+    def _fauna_phase(self):
+        """Feed each species on its prey and apply its stress response, in food chain order.
+
+        The species are compiled into a CompiledFoodWeb, and each one in its topological order feeds on all of its
+        prey and applies its stress response over every cell at once, as array operations on fauna_population and
+        fauna_stress. Its emigrants are then spread over the neighboring cells by self.dispersal (they are lost when it
+        is None). Species that have no array version fall back to the per cell loop, without dispersal.
+
+        """
+        if not self.fauna:
+            return
+        if not all(isinstance(taxa, (BulkFauna, BulkFaunaD)) for taxa in self.fauna):
+            return self._fauna_phase_cells()
+        web = CompiledFoodWeb(self.fauna, self._flora)
+        weights = None
+        if self.dispersal is not None:
+            # The dispersal of every species counts as one call per tick.
+            weights = self.instruments.timed('dispersal', 0, self.dispersal.weights, self)
+        tracer = self.tracer if self.tracer.enabled else None
+        for s in web.order:
+            taxa = self.fauna[s]
+            web.feed(s, self.fauna_population, self.fauna_stress[s], self.flora_state, self.random.fauna, tracer)
+            emigrants = taxa.bulk_stress_response(self.fauna_population[s], self.fauna_stress[s], self.random.fauna,
+                                                  tracer, s)
+            if self.dispersal is not None:
+                self.fauna_population[s] += self.instruments.timed_part(
+                    'dispersal', self.n_cells, self.dispersal.disperse, self, emigrants,
+                    discrete=isinstance(taxa, BulkFaunaD), rng=self.random.fauna, weights=weights)
+
+    def _fauna_phase_cells(self):
+        """_fauna_phase one cell at a time, with the species objects as flyweights."""
+        flora = self._flora
+        for cell in range(self.n_cells):
+            flora.state = self.flora_state[cell].item()
+            for s, taxa in enumerate(self.fauna):
+                taxa.population = self.fauna_population[s, cell]
+                taxa.stress = self.fauna_stress[s, cell]
+            for taxa in self.fauna:
+                taxa.pass_turn(self.random.fauna)
+            for s, taxa in enumerate(self.fauna):
+                self.fauna_population[s, cell] = taxa.population
+                self.fauna_stress[s, cell] = taxa.stress
+            self.flora_state[cell] = flora.state
+
+    def show_turns(self, count=1, pause=0.25, max_fps=None):
+        """Run count ticks, drawing the map in place after each one.
+
+        Args:
+            count (int):
+            pause (float): Seconds to sleep after each tick.
+            max_fps (float): Optional cap on frames drawn per second.
+
+        """
+        self.renderer = TerminalRenderer(colorize=self.colorize, max_fps=max_fps)
+        for _ in range(count):
+            self.pass_time()
+            self.renderer.render(self)
+            if pause:
+                time.sleep(pause)
+        self.renderer = None
+
+    def _show_frame(self):
+        if self.renderer is not None:
+            self.renderer.render(self)
+        else:
+            self.show_map()
+
+    def spread_fire(self, verbose=False, pause=0.15, show=True):
+        """Scan cells for fire, and if present, cause fire to spread to neighboring cells.
+
+        The fire front is kept as an array of cell ids and spreads one wave at a time. Every burning cell gets one
+        catch_fire roll against each neighbor that was not yet burning when its wave came up, as in Region, and all the
+        rolls of a wave are drawn together. Cells ignited in a wave form the next front, so a fire can keep spreading
+        within the same tick. The burning cells and every wave are recorded as ignition and spread events by
+        self.tracer.
+
+        Args:
+            verbose (bool): Unused, enable self.tracer instead.
+            pause (float):
+            show (bool):
+
+        Returns:
+            int: The number of cells ignited by spreading.
+
+        """
+        front = np.flatnonzero(self.on_fire == 1)
+        fires_present = bool(front.size)
+        tracer = self.tracer
+        if tracer.enabled:
+            tracer.record(IGNITION, front, self.flora_state[front])
+        ignited = 0
+        attempts = 0
+        wave = 0
+        while front.size:
+            targets = self._front_neighbors(front)
+            targets = targets[self.on_fire[targets] == 0]
+            if not targets.size:
+                break
+            attempts += targets.size
+            spread_prob = self.flora_class.bulk_spread_prob(self.flora_state[targets], **self.fire_parameters)
+            front = np.unique(targets[self.random.fire.uniform(0, 1, targets.size) < spread_prob])
+            self.on_fire[front] = 1
+            ignited += front.size
+            wave += 1
+            if tracer.enabled:
+                tracer.record(SPREAD, front, wave)
+            if self.slow_burn and show and front.size:
+                self._show_frame()
+                time.sleep(pause)
+        if fires_present and not self.slow_burn and show:
+            self._show_frame()
+            time.sleep(pause*2)
+        self.instruments.count('fire_attempts', attempts)
+        self.instruments.count('fire_ignitions', ignited)
+        return ignited
+
+    def _front_neighbors(self, front):
+        """Every interior neighbor of every cell in front, one entry per (cell, neighbor) link."""
+        targets = self.neighbor_index.gather(front)
+        return targets[targets < self.n_cells]
+
+    def insert_new_fauna(self, new_fauna=None, target=None, all_locales=True, target_locale=None,
+                         simple_food_chain=True):
+        """Add a species layer. The fauna object is used as the template for the species' rates.
+
+        Args:
+            new_fauna (fauna):
+            target (feature, or other): Unused, kept for compatibility with Region.
+            all_locales (bool): Seed the species in every cell.
+            target_locale (tuple): Otherwise, the single location to seed the species in.
+            simple_food_chain (bool): Unused, species always feed on the previous species (or flora).
+
+        Returns:
+            (bool): T/F success/failure
+
+        """
+        if new_fauna is None:
+            new_fauna = BulkFauna()
+        population = np.zeros(self.n_cells, dtype=np.float64)
+        if all_locales:
+            population[:] = new_fauna.population
+        elif target_locale is not None and self._in_range(*target_locale):
+            population[self._cell(*target_locale)] = new_fauna.population
+        else:
+            print("No target locale specified")
+            return False
+        new_fauna.prey = self.fauna[-1] if self.fauna else self._flora
+        self.fauna.append(new_fauna)
+        self._apply_fauna_parameters()
+        self.fauna_population = np.vstack([self.fauna_population, population])
+        self.fauna_stress = np.vstack([self.fauna_stress, np.full(self.n_cells, new_fauna.stress)])
+        return True
+
+    def set_food_web(self, web='simple', path=FOOD_WEBS_PATH):
+        """Replace every species with those of a food web, each seeded with its population in every cell.
+
+        Args:
+            web (str or list): The name of a web in the definitions file, or a definition as in
+                beringia.foodwebs.read_food_webs.
+            path (str): The definitions file.
+
+        Raises:
+            ValueError: For unknown webs, or definitions that do not compile.
+
+        """
+        if isinstance(web, str):
+            webs = read_food_webs(path)
+            if web not in webs:
+                raise ValueError(f"Unknown food web {web}")
+            web = webs[web]
+        species = build_food_web(web, self._flora)
+        self.fauna = species
+        self._apply_fauna_parameters()
+        self.fauna_population = np.array([np.full(self.n_cells, taxa.population, dtype=np.float64)
+                                          for taxa in species]).reshape(len(species), self.n_cells)
+        self.fauna_stress = np.array([np.full(self.n_cells, taxa.stress, dtype=np.float64)
+                                      for taxa in species]).reshape(len(species), self.n_cells)
+
+    def view_locale(self, x=0, y=0, fire_state=False, colorize=True):
+        """view_locale docs
+
+        Args:
+            x (int):
+            y (int):
+            fire_state (bool):
+            colorize (bool):
+
+        Returns:
+            str or int:
+
+        """
+        cell = self._cell(x, y)
+        if fire_state:
+            return int(self.on_fire[cell])
+        if colorize:
+            return PLANT_COLOR_KEY[int(floor(self.flora_state[cell]))]
+        return int(floor(self.flora_state[cell]))
+
+    def view_elevation(self, x=0, y=0, colorize=False):
+        """view_elevation docs
+
+        Args:
+            x (int):
+            y (int):
+            colorize(bool)
+
+        Returns:
+            int:
+
+        """
+        cell = self._cell(x, y)
+        elevation = self.elevation_base[cell] + self.soil_depth[cell]
+        if colorize:
+            return GRAYSCALE_COLOR_KEY[int(elevation//1)]
+        return elevation
+
+    def view_fauna_pop(self, x=0, y=0, index=0, colorize=False, scale_factor=1.0, ceiling=100.0):
+        """view_fauna_pop docs
+
+        Args:
+            x (int): locale x dim.
+            y (int): locale y dim.
+            index (int): which fauna element to return. default is the first.
+            colorize(bool): whether or not to return output with ascii colorization.
+
+        Returns:
+            int: May have ascii colorization.
+
+        """
+        if self.fauna:
+            population = int(self.fauna_population[index, self._cell(x, y)] * scale_factor // 1)
+            if colorize:
+                return GRAYSCALE_COLOR_KEY[min(int(ceiling), population)]
+            return population
+
+    def erode_one(self, node, magnitude=1.0, rate=0.01):
+        """This will cause erosion to occur at one location.
+
+        Args:
+            node (tuple or int): A location, or a cell id.
+            magnitude (float):
+            rate (float):
+
+        """
+        cell = self._cell(*node) if isinstance(node, tuple) else node
+        base, soil = self.elevation_base, self.soil_depth
+        lowest = cell
+        for neighbor in self.neighbor_index.neighbors(cell):
+            if base[lowest] + soil[lowest] > base[neighbor] + soil[neighbor]:
+                lowest = neighbor
+        if lowest != cell:
+            slope = (base[cell] + soil[cell]) - (base[lowest] + soil[lowest])
+        else:
+            slope = 0.01
+        geology = self._border_geology if self.is_border[cell] else self._geology
+        geology.elevation_base, geology.soil_depth = base[cell], soil[cell]
+        transport = geology.erode(magnitude, rate, slope)
+        base[cell], soil[cell] = geology.elevation_base, geology.soil_depth
+        if not self.is_border[lowest]:
+            soil[lowest] += transport
+
+        self.invalidate_basins([cell, lowest])
+
+    def erode_all(self, magnitude=1.0, rate=0.01):
+        """Erode every interior cell toward its lowest neighbor in one step.
+
+        The rules are those of erode_one and Geology.erode, applied to all cells at once from the elevations at the
+        start of the step: each cell's lowest neighbor comes from the neighbor table, slopes and loads are arrays, and
+        deposits are scattered with bincount. Deposits onto border cells are lost, as BorderGeology.accrete does.
+
+        Args:
+            magnitude (float):
+            rate (float):
+
+        Returns:
+            float: The total soil transported.
+
+        """
+        n = self.n_cells
+        elevation = np.append(self.elevation, np.inf)
+        table = self.neighbor_index.padded()
+        lowest = table[np.arange(n), np.argmin(elevation[table], axis=1)]
+        downhill = elevation[lowest] < elevation[:n]
+        lowest = np.where(downhill, lowest, np.arange(n))
+        slope = np.where(downhill, elevation[:n] - elevation[lowest], 0.01)
+
+        soil = self.soil_depth[:n]
+        load = magnitude * rate * slope
+        over = load > soil
+        transport = np.where(over, soil, load)
+        self.elevation_base[:n] -= np.where(over, (load - load * rate) * rate, 0.0)
+        soil[:] = np.where(over, load * rate, soil - load)
+        soil += np.bincount(lowest, weights=transport, minlength=self.n_total)[:n]
+        if self.tracer.enabled:
+            moved = np.flatnonzero(transport > 0)
+            self.tracer.record(EROSION, moved, transport[moved])
+
+        if self._basin_dirty is None:
+            self.invalidate_basins()
+        else:
+            # Nearly every cell moves a little, but only those whose lowest neighbor changed can move a catchment.
+            after = np.append(self.elevation, np.inf)
+            descent = table[np.arange(n), np.argmin(after[table], axis=1)]
+            descent = np.where(after[descent] < after[:n], descent, np.arange(n))
+            self.invalidate_basins(np.flatnonzero(descent != lowest))
+        return float(transport.sum())
+
+    def randomize_elevation_base(self, mean=5, sd=1.5):
+        """randomize_elevation_base docs
+
+        Args:
+            mean (int):
+            sd (float):
+
+        """
+        self.elevation_base[:self.n_cells] = self.random.terrain.normal(mean, sd, self.n_cells)
+        self.invalidate_basins()
+
+    def randomize_elevation_base_cov(self, mean=5, cov=0.4):
+        """randomize_elevation_base_cov docs
+
+        Neighboring cells are correlated. This used to draw from a dense (n_cells, n_cells) multivariate normal, and is
+        now randomize_terrain with a correlation length of one cell.
+
+        Args:
+            mean (int):
+            cov (float): The variance of the elevations.
+
+        """
+        self.randomize_terrain(mean, np.sqrt(cov), correlation_length=1.0)
+
+    def randomize_terrain(self, mean=5, sd=1.5, correlation_length=8.0, hurst=0.8):
+        """Draw a spatially correlated elevation_base by spectral synthesis, see terrain.spectral_field. The noise
+        comes from the terrain stream, so the terrain follows the region's seed.
+
+        Args:
+            mean (float):
+            sd (float):
+            correlation_length (float): In cells.
+            hurst (float): Hurst exponent. Lower is rougher.
+
+        """
+        n = self.n_cells
+        if self.grid_type == '2d':
+            field = spectral_field((self.xdim, self.ydim), correlation_length, hurst, self.random.terrain).ravel()
+        else:
+            locations = [self.neighbor_index.location(cell) for cell in range(n)]
+            field = field_at(locations, correlation_length, hurst, self.random.terrain)
+        field *= sd
+        field += mean
+        self.elevation_base[:n] = field
+        self.invalidate_basins()
+
+    def invalidate_basins(self, cells=None):
+        """Mark the basins out of date after elevations change. Erosion and the GeologyView setters call this
+        themselves; code that writes elevation_base or soil_depth directly should too.
+
+        Args:
+            cells (list): Ids of the cells that changed, so that the next find_basins only looks for new downhill
+                neighbors around them. Cells whose lowest neighbor stayed the same may be left out. None means any
+                cell may have changed.
+
+        """
+        self.basins_current = False
+        if cells is None or self._basin_dirty is None:
+            self._basin_dirty = None
+        else:
+            cells = np.asarray(cells, dtype=np.int64)
+            self._basin_dirty[cells[cells < self.n_cells]] = True
+
+    def find_basins(self):
+        """Find all the basins in the region and record, per cell, whether it is in a basin, the elevation of the
+        point of outflow for the basin and the basin's label. See beringia.basins.
+
+        Labels carry over from the last call wherever a basin overlaps its earlier self. Per basin area, volume, depth,
+        spill elevation and outlet cell are kept in self.basin_stats, indexed by label.
+
+        self.basin_map keeps the work of the last call, so after erosion only the catchments of the cells whose
+        lowest neighbor changed are found again, as long as every change went through invalidate_basins. See
+        beringia.basins for timings.
+
+        Returns:
+            bool: True if any water is held.
+
+        """
+        n = self.n_cells
+        if self.basin_map is None:
+            self.basin_map = basins.BasinMap(self.neighbor_index.padded(), self.basin_label.copy(),
+                                             self._next_basin_label)
+            self._basin_dirty = None
+        filled = self.basin_map.update(self.elevation[:n], self._basin_dirty)
+        self._basin_dirty = np.zeros(n, dtype=bool)
+        self.basin_label[:] = self.basin_map.labels
+        self._next_basin_label = self.basin_map.next_label
+        self.is_in_basin[:n] = self.basin_label > 0
+        self.basin_elevation[:n] = filled
+        self.basin_stats = self.basin_map.stats
+        self.basins_current = True
+        return bool(self.basin_stats['volume'].sum())
+
+    def get_basins(self):
+        """A LocaleView of every cell in a basin, brought up to date first. Building the views takes longer than
+        finding the basins on large grids; per tick, use get_basin_labels and get_basin_stats instead.
+
+        Returns:
+            list:
+
+        """
+        if not self.basins_current:
+            self.find_basins()
+        return [LocaleView(self, cell) for cell in np.flatnonzero(self.is_in_basin[:self.n_cells])]
+
+    def get_basin_labels(self):
+        """The basin label of every cell, by cell id, brought up to date first. 0 outside basins; the labels index
+        get_basin_stats. The array is the region's own, and is rewritten by the next find_basins.
+
+        Returns:
+            numpy.ndarray: int64, n_cells long. On a 2d grid, reshape(xdim, ydim) lays it out as get_map_array does.
+
+        """
+        if not self.basins_current:
+            self.find_basins()
+        return self.basin_label
+
+    def get_basin_stats(self):
+        """Per basin aggregates, brought up to date first. See beringia.basins.basin_aggregates.
+
+        Returns:
+            dict:
+
+        """
+        if not self.basins_current or self.basin_stats is None:
+            self.find_basins()
+        return self.basin_stats
+
+    def get_locale(self, x=0, y=0):
+        if not self._in_range(x, y):
+            print("Value out of range.")
+            return None
+        return LocaleView(self, self._cell(x, y))
+
+    def get_neighbors(self, x=0, y=0, depth=1, tiered=False, ids=False, borders=False):
+        """Breadth first neighborhood of a location, out to depth steps.
+
+        Args:
+            x (int):
+            y (int):
+            depth (int):
+            tiered (bool): Return a list per step rather than one flat list.
+            ids (bool): Return locations rather than LocaleViews.
+            borders (bool): Include border cells.
+
+        Returns:
+            list:
+
+        """
+        if not self._in_range(x, y):
+            if self.verbose:
+                print("Value out of range.")
+            return None
+        neighbors = []
+        for tier in self.neighbor_index.neighborhood(self._cell(x, y), depth, borders):
+            if ids:
+                tier = [self.neighbor_index.location(cell) for cell in tier]
+            else:
+                tier = [LocaleView(self, cell) for cell in tier]
+            if tiered:
+                neighbors.append(tier)
+            else:
+                neighbors.extend(tier)
+        return neighbors
+
+
+class LocaleView(object):
+    """A lightweight stand in for Locale that reads and writes one cell of an ArrayRegion.
+
+    Args:
+        region (ArrayRegion):
+        cell (int):
+
+    """
+    __slots__ = ('region', 'cell')
+
+    def __init__(self, region, cell):
+        self.region = region
+        self.cell = cell
+
+    def __repr__(self):
+        return str(self.state)
+
+    def __str__(self):
+        if self.on_fire == 1:
+            return "\033[1;31mf\033[0;37m"
+        return PLANT_COLOR_KEY[self.state]
+
+    @property
+    def location(self):
+        return self.region.neighbor_index.location(self.cell)
+
+    @property
+    def is_border(self):
+        return bool(self.region.is_border[self.cell])
+
+    @property
+    def state(self):
+        if self.is_border:
+            return 0
+        return int(self.region.flora_state[self.cell])
+
+    @property
+    def on_fire(self):
+        if self.is_border:
+            return 0
+        return int(self.region.on_fire[self.cell])
+
+    @property
+    def flora(self):
+        return FloraView(self.region, self.cell)
+
+    @property
+    def geology(self):
+        return GeologyView(self.region, self.cell)
+
+    @property
+    def fauna(self):
+        if self.is_border:
+            return []
+        return [FaunaView(self.region, self.cell, s) for s in range(len(self.region.fauna))]
+
+
+class FloraView(object):
+    """The flora of one ArrayRegion cell."""
+    __slots__ = ('region', 'cell')
+
+    def __init__(self, region, cell):
+        self.region = region
+        self.cell = cell
+
+    def __repr__(self):
+        return "FloraState: " + str(self.state)
+
+    @property
+    def state(self):
+        return self.region.flora_state[self.cell].item()
+
+    @state.setter
+    def state(self, value):
+        self.region.flora_state[self.cell] = value
+
+    @property
+    def on_fire(self):
+        return int(self.region.on_fire[self.cell])
+
+    @on_fire.setter
+    def on_fire(self, value):
+        self.region.on_fire[self.cell] = value
+
+
+class GeologyView(object):
+    """The geology of one ArrayRegion cell."""
+    __slots__ = ('region', 'cell')
+
+    def __init__(self, region, cell):
+        self.region = region
+        self.cell = cell
+
+    @property
+    def elevation_base(self):
+        return float(self.region.elevation_base[self.cell])
+
+    @elevation_base.setter
+    def elevation_base(self, value):
+        self.region.elevation_base[self.cell] = value
+        self.region.invalidate_basins([self.cell])
+
+    @property
+    def soil_depth(self):
+        return float(self.region.soil_depth[self.cell])
+
+    @soil_depth.setter
+    def soil_depth(self, value):
+        self.region.soil_depth[self.cell] = value
+        self.region.invalidate_basins([self.cell])
+
+    @property
+    def soil_moisture(self):
+        return float(self.region.soil_moisture[self.cell])
+
+    @property
+    def elevation(self):
+        return self.elevation_base + self.soil_depth
+
+    @property
+    def is_in_basin(self):
+        return bool(self.region.is_in_basin[self.cell])
+
+    @property
+    def basin_elevation(self):
+        return float(self.region.basin_elevation[self.cell])
+
+    def get_basin_depth(self):
+        if self.is_in_basin:
+            return self.basin_elevation - self.elevation
+        return 0.0
+
+
+class FaunaView(object):
+    """One species' population in one ArrayRegion cell."""
+    __slots__ = ('region', 'cell', 'species')
+
+    def __init__(self, region, cell, species):
+        self.region = region
+        self.cell = cell
+        self.species = species
+
+    def __repr__(self):
+        return "Bulk Fauna: " + str(self.population)
+
+    @property
+    def population(self):
+        return float(self.region.fauna_population[self.species, self.cell])
+
+    @population.setter
+    def population(self, value):
+        self.region.fauna_population[self.species, self.cell] = value
+
+    @property
+    def stress(self):
+        return float(self.region.fauna_stress[self.species, self.cell])
+
+    @stress.setter
+    def stress(self, value):
+        self.region.fauna_stress[self.species, self.cell] = value
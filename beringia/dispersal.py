@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""dispersal.py
+
+Delivers emigrating fauna to neighboring cells. Every cell's emigrants of a species are gathered into one array and
+spread over the interior links of the region's NeighborIndex with sparse matrix-vector products. The share that goes
+from cell i to its neighbor j is proportional to
+
+    exp(elevation_aversion * (elevation[i] - elevation[j])) * (1 + flora_preference * flora_state[j])
+
+normalized over the neighbors of i, with the flora term clipped at 0 on burnt cells. With both at 0 emigrants spread
+evenly, a positive elevation_aversion sends them downhill and a positive flora_preference towards greener cells.
+flora_preference can not be negative. Emigrants of a cell without interior neighbors stay
+where they are, so the total population is unchanged by dispersal.
+
+Discrete species move whole animals: the emigrants of each cell are split over its neighbors by one vectorized
+multinomial draw with the same shares.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import numpy as np
+
+
+DISPERSAL_PARAMETERS = ('flora_preference', 'elevation_aversion')
+
+
+class Dispersal(object):
+    """Dispersal class docs
+
+    The source term of a share cancels when it is normalized, so a share is the attraction of the neighbor,
+    exp(-elevation_aversion * elevation[j]) * (1 + flora_preference * flora_state[j]), over the total attraction of
+    all the neighbors of the source. Arrivals are then attraction * (A.T @ (emigrants / (A @ attraction))), two
+    products with the fixed unit adjacency A of the interior cells, which is taken from the NeighborIndex once per
+    topology.
+
+    Args:
+        flora_preference (float):
+        elevation_aversion (float):
+
+    Raises:
+        ValueError: For a negative flora_preference.
+
+    """
+    def __init__(self, flora_preference=0.0, elevation_aversion=0.0):
+        if flora_preference < 0:
+            raise ValueError("flora_preference can not be negative")
+        self.flora_preference = flora_preference
+        self.elevation_aversion = elevation_aversion
+        self._index = None
+
+    def __repr__(self):
+        return f'dispersal (flora_preference={self.flora_preference}, elevation_aversion={self.elevation_aversion})'
+
+    def _structure(self, index):
+        """Cache the interior adjacency of index, and what is derived from it."""
+        if self._index is index:
+            return
+        n = index.n_cells
+        self._adjacency = index.adjacency(interior=True).tocsr()
+        self._transpose = self._adjacency.T
+        degree = np.diff(self._adjacency.indptr).astype(np.float64)
+        self._inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=degree > 0)
+        self._isolated = np.flatnonzero(degree == 0)
+        table = index.padded()
+        self._table = np.where(table < n, table, n)
+        self._index = index
+
+    def attraction(self, region):
+        """The weight of each interior cell as a destination.
+
+        Returns:
+            numpy.ndarray: None when every neighbor gets the same share.
+
+        """
+        if not self.flora_preference and not self.elevation_aversion:
+            return None
+        n = region.n_cells
+        if self.elevation_aversion:
+            attraction = np.add(region.elevation_base[:n], region.soil_depth[:n])
+            attraction -= attraction.min()
+            attraction *= -self.elevation_aversion
+            np.exp(attraction, out=attraction)
+        else:
+            attraction = np.ones(n)
+        if self.flora_preference:
+            preference = np.multiply(region.flora_state, self.flora_preference, dtype=np.float64)
+            preference += 1.0
+            np.maximum(preference, 0.0, out=preference)     # Burnt cells (state -1) would otherwise go negative.
+            attraction *= preference
+        return attraction
+
+    def weights(self, region):
+        """The attraction of each cell and the total attraction of each cell's neighbors, for the current state of
+        region. They do not change during a fauna phase, so every species can share them.
+
+        Returns:
+            tuple: (attraction, total), both None when every neighbor gets the same share.
+
+        """
+        self._structure(region.neighbor_index)
+        attraction = self.attraction(region)
+        if attraction is None:
+            return None, None
+        total = self._adjacency @ attraction
+        total[total <= 0] = np.inf
+        return attraction, total
+
+    def disperse(self, region, emigrants, discrete=False, rng=None, weights=None):
+        """Spread emigrants over the neighbors of their cells.
+
+        Args:
+            region (beringia.arrayregion.ArrayRegion):
+            emigrants (numpy.ndarray): The emigrants leaving each cell.
+            discrete (bool): Move whole animals.
+            rng (numpy.random.Generator): For discrete species.
+            weights (tuple): From weights(region), computed here when None.
+
+        Returns:
+            numpy.ndarray: The arrivals in each cell. Sums to emigrants.sum().
+
+        """
+        self._structure(region.neighbor_index)
+        attraction, total = weights if weights is not None else self.weights(region)
+        if discrete:
+            return self._disperse_discrete(region, emigrants, attraction, rng)
+        if attraction is None:
+            arrivals = self._transpose @ (emigrants * self._inverse_degree)
+            stuck = self._isolated
+        else:
+            arrivals = self._transpose @ (emigrants / total)
+            arrivals *= attraction
+            stuck = np.flatnonzero(np.isinf(total))
+        arrivals[stuck] += emigrants[stuck]
+        return arrivals
+
+    def _disperse_discrete(self, region, emigrants, attraction, rng):
+        n = region.n_cells
+        cells = np.flatnonzero(emigrants > 0)
+        arrivals = np.zeros(n)
+        if not cells.size:
+            return arrivals
+        table = self._table[cells]
+        if attraction is None:
+            weight = (table < n).astype(np.float64)
+        else:
+            weight = np.append(attraction, 0.0)[table]
+        total = weight.sum(axis=1)
+        stuck = total <= 0
+        arrivals[cells[stuck]] += emigrants[cells[stuck]]
+        moving = ~stuck
+        if not moving.any():
+            return arrivals
+        counts = emigrants[cells[moving]].astype(np.int64)
+        draws = rng.multinomial(counts, weight[moving] / total[moving, None])
+        arrivals += np.bincount(table[moving].ravel(), weights=draws.ravel(), minlength=n + 1)[:n]
+        return arrivals
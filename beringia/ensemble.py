@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""ensemble.py
+
+Monte Carlo ensembles. run_ensemble runs many independent replicates of one region configuration over a process pool.
+Each replicate gets its own child of one SeedSequence, so the ensemble as a whole is reproducible while the replicates
+are statistically independent. Workers send back only reduced time series, never regions, and the series are merged
+into mean and quantile bands.
+
+    result = run_ensemble({'xdim': 100, 'ydim': 100, 'ticks': 500, 'flora_system': 1}, 200, workers=8, seed=1)
+    result['quantiles'][0.95]['burned_area']
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from beringia.arrayregion import ArrayRegion
+
+
+DEFAULT_CONFIG = {
+    'xdim': 50,
+    'ydim': 50,
+    'ticks': 100,
+    'flora_system': 1,
+    'grid_type': '2d',
+    'fauna_depth': 1,
+    'food_web': None,
+    'randomize_elevation': False
+}
+
+SERIES = ('burned_area', 'mean_flora_state', 'soil_loss', 'fauna_population')
+
+
+def run_replicate(config, seed=None, parameters=None):
+    """Run one replicate and reduce it to per tick series.
+
+    Args:
+        config (dict): Keys of DEFAULT_CONFIG. A food_web replaces the fauna_depth species with a web of
+            beringia.foodwebs.
+        seed (int or numpy.random.SeedSequence):
+        parameters (dict): Overrides for ArrayRegion.set_parameters.
+
+    Returns:
+        dict: {series name: numpy.ndarray of length ticks}
+
+    """
+    config = dict(DEFAULT_CONFIG, **config)
+    region = ArrayRegion(config['xdim'], config['ydim'], grid_type=config['grid_type'],
+                         flora_system=config['flora_system'], fauna_depth=config['fauna_depth'], seed=seed)
+    if config['food_web'] is not None:
+        region.set_food_web(config['food_web'])
+    if parameters:
+        region.set_parameters(parameters)
+    if config['randomize_elevation']:
+        region.randomize_elevation_base()
+    ticks = config['ticks']
+    series = {name: np.zeros(ticks) for name in SERIES}
+    soil = region.soil_depth[:region.n_cells]
+    initial_soil = soil.sum()
+    for tick in range(ticks):
+        region.pass_time()
+        series['burned_area'][tick] = np.count_nonzero(region.on_fire)
+        series['mean_flora_state'][tick] = region.flora_state.mean()
+        series['soil_loss'][tick] = initial_soil - soil.sum()
+        series['fauna_population'][tick] = region.fauna_population.sum(axis=0).mean()
+    return series
+
+
+def _run_replicate(args):
+    return run_replicate(*args)
+
+
+def summarize(replicates, quantiles=(0.05, 0.5, 0.95)):
+    """Merge replicate series into summary statistics.
+
+    Args:
+        replicates (list): Dicts returned by run_replicate.
+        quantiles (tuple):
+
+    Returns:
+        dict: 'replicates' ({name: (n, ticks) array}), 'mean', 'std' and 'quantiles' ({q: {name: array}}).
+
+    """
+    stacked = {name: np.stack([replicate[name] for replicate in replicates]) for name in replicates[0]}
+    return {
+        'n_replicates': len(replicates),
+        'replicates': stacked,
+        'mean': {name: values.mean(axis=0) for name, values in stacked.items()},
+        'std': {name: values.std(axis=0) for name, values in stacked.items()},
+        'quantiles': {q: {name: np.quantile(values, q, axis=0) for name, values in stacked.items()} for q in quantiles}
+    }
+
+
+def run_ensemble(config, n_replicates, workers=None, seed=None, quantiles=(0.05, 0.5, 0.95)):
+    """Run n_replicates of config in parallel and summarize them.
+
+    Args:
+        config (dict): Keys of DEFAULT_CONFIG.
+        n_replicates (int):
+        workers (int): Worker processes. None uses every core, 1 runs in this process.
+        seed (int): Root seed of the ensemble.
+        quantiles (tuple):
+
+    Returns:
+        dict: See summarize.
+
+    """
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    replicates = map_jobs(_run_replicate, [(config, child) for child in seeds], workers)
+    return summarize(replicates, quantiles)
+
+
+def map_jobs(function, jobs, workers=None):
+    """[function(job) for job in jobs], spread over a process pool.
+
+    Args:
+        function (callable): A module level function, so it can be pickled.
+        jobs (list):
+        workers (int): Worker processes. None uses every core, 1 runs in this process.
+
+    Returns:
+        list: Results in the order of jobs.
+
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        return list(executor.map(function, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
@@ -55,11 +55,52 @@
 """
 from beringia.feature import Feature
 from beringia.flora import PlantBulk, Flora
-from math import floor
-from numpy.random import binomial
+import numpy as np
 from beringia.constants import CONT_TO_DISC_FAUNA_CONVERSION
+from beringia.trace import FEEDING, STARVATION, REPRODUCTION, EMIGRATION
 #TODO import detritus object
 
+
+def stochastic_round(magnitude, rng=np.random):
+    """Round down or up at random, up with probability equal to the fractional part, so the expectation is unchanged.
+    This is floor(x) + binomial(1, x % 1), for a whole array of non negative values with one draw.
+
+    Args:
+        magnitude (float or numpy.ndarray):
+        rng: numpy.random, or a numpy.random.Generator such as a region's random.fauna.
+
+    Returns:
+        int or numpy.ndarray: int64 when magnitude is an array.
+
+    """
+    whole = np.floor(magnitude)
+    rounded = whole + (rng.random(np.shape(magnitude)) < magnitude - whole)
+    if np.ndim(rounded) == 0:
+        return int(rounded)
+    return rounded.astype(np.int64)
+
+
+def _trace_stress_response(tracer, species, reproducing, births, starving, deaths, migrating, emigrants):
+    """Record the non zero births, deaths and emigrants of a bulk stress response."""
+    for kind, cells, values in ((REPRODUCTION, reproducing, births), (STARVATION, starving, deaths),
+                                (EMIGRATION, migrating, emigrants[migrating])):
+        some = values > 0
+        tracer.record(kind, cells[some], values[some], species)
+
+
+def _bulk_feed_on(target, stress, food, consumption, available_food, relief, penalty):
+    """The part of feed shared by every predator and target: set stress from what was found, then depredate. Cells
+    that needed nothing (an empty population) are left unstressed rather than divided by zero."""
+    enough_food = available_food >= consumption
+    hungry = ~enough_food
+    stress[enough_food] *= relief
+    shortfall = available_food[hungry] - consumption[hungry]
+    needed = consumption[hungry]
+    stress[hungry] -= np.divide(shortfall, needed, out=np.zeros_like(shortfall), where=needed > 0) * penalty
+    target.bulk_get_depredated(food, np.where(enough_food, consumption, available_food))
+    return enough_food
+
+
 class FoodWeb(Feature):
     """FoodWeb class docs
 
@@ -81,9 +122,21 @@ class Fauna(Feature):
         arg (str):
 
     """
+    __slots__ = ()
+
     def __init__(self, location = "hi"):
         super(Fauna, self).__init__(location=location)
 
+    def _trace(self, kind, value):
+        """Record an event of kind for this fauna's locale, if it is in a region whose tracer is on. The species is
+        the fauna's index in the locale."""
+        region = getattr(self.location, 'region', None)
+        tracer = getattr(region, 'tracer', None)
+        if tracer is None or not tracer.enabled or not value > 0:
+            return
+        species = next((s for s, taxa in enumerate(self.location.fauna) if taxa == self), -1)
+        tracer.record(kind, [region._trace_cell(self.location.location)], value, species)
+
 
 
 class FeedBag(Fauna):
@@ -203,7 +256,17 @@ class BulkFauna(Fauna):
         starvation_rate (float):
         feeding_rate (float):
 
+    Instances use __slots__, and share the class STRESS_RESPONSES thresholds until stress_responses is assigned a dict
+    of their own.
+
     """
+    __slots__ = ('name', 'population', 'reproduction_rate', 'starvation_rate', 'feeding_rate', 'emigration_rate',
+                 'ambient_death_rate', 'stress', 'cryptocity', 'stress_responses', 'prey', 'verbose', 'diet')
+    STRESS_RESPONSES = {
+        'migrate': 0.375,
+        'starve': 0.85,
+        'reproduce': 0.20
+    }
 
     def __init__(self, population=1, reproduction_rate=0.04, starvation_rate=0.3, feeding_rate=0.3,
                  emigration_rate=0.1, prey=FeedBag(), location=None, name=None):
@@ -221,11 +284,7 @@ class BulkFauna(Fauna):
         self.ambient_death_rate = 0.05
         self.stress = 0.0
         self.cryptocity = 0.8 #                     # Cryptocity rate is how hard a species is to find.(eg a mole may have a cryptocity of 0.8, while a singing bird might be 0.1)
-        self.stress_responses = {
-            'migrate': 0.375,
-            'starve': 0.85,
-            'reproduce': 0.20
-        }
+        self.stress_responses = self.STRESS_RESPONSES
         self.prey = prey
         self.verbose = False
 
@@ -266,14 +325,14 @@ class BulkFauna(Fauna):
             return False
         return True
 
-    def pass_turn(self):
+    def pass_turn(self, rng=np.random):
         """pass_turn docs
         Run all actions that occur in 1 unit of time.
         """
-        self.feed()
+        self.feed(rng=rng)
         self.stress_response()
 
-    def feed(self, target=None):
+    def feed(self, target=None, rng=np.random):
         """feed docs
         Target should default to self.prey generally. (ie self.prey should be the thing that this fauna generally feeds
         on)
@@ -295,13 +354,11 @@ class BulkFauna(Fauna):
                 self.stress = self.stress * 0.35
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .25)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " + str(enough_food) + " Method: bulkfauna")
-                print("  consumption: " + str(consumption) + "  available food: " + str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
         elif isinstance(target, BulkFaunaD):
             consumption_magnitude = self.population * self.feeding_rate * CONT_TO_DISC_FAUNA_CONVERSION
-            consumption = floor(consumption_magnitude) + binomial(1, consumption_magnitude % 1)
+            consumption = stochastic_round(consumption_magnitude, rng)
             available_food = target.population * (1-target.cryptocity)
             if available_food >= consumption:
                 target.get_depredated(consumption)
@@ -313,9 +370,7 @@ class BulkFauna(Fauna):
                 self.stress = self.stress * 0.35
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .25)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " +str(enough_food)+" Method: bulkfaunad")
-                print("  consumption: "+ str(consumption)+"  available food: "+ str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
         elif isinstance(target, Flora):
             consumption = self.population * self.feeding_rate
@@ -330,9 +385,7 @@ class BulkFauna(Fauna):
                 self.stress = self.stress * 0.25
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .25)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " + str(enough_food) + " Method: bulkfauna")
-                print("  consumption: " + str(consumption) + "  available food: " + str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
 
     def stress_response(self):
@@ -344,11 +397,90 @@ class BulkFauna(Fauna):
         if self.stress > self.stress_responses['migrate']:
             self.emigrate()
 
+    def bulk_pass_turn(self, population, stress, food, target=None, rng=np.random):
+        """pass_turn for every cell at once. This species' rates apply to every cell, and the arrays are updated in
+        place.
+
+        Args:
+            population (numpy.ndarray): This species' population in each cell.
+            stress (numpy.ndarray): Its stress in each cell.
+            food (numpy.ndarray): The target's population, or flora state, in each cell.
+            target: Defaults to self.prey.
+            rng: For stochastic rounding, when the target is discrete.
+
+        Returns:
+            numpy.ndarray: The emigrants from each cell.
+
+        """
+        self.bulk_feed(population, stress, food, target, rng)
+        return self.bulk_stress_response(population, stress, rng)
+
+    def bulk_feed(self, population, stress, food, target=None, rng=np.random):
+        """feed for every cell at once, with the same arithmetic as feed.
+
+        Args:
+            population (numpy.ndarray):
+            stress (numpy.ndarray): Updated in place.
+            food (numpy.ndarray): The target's population, or flora state. Depredated in place.
+            target: Defaults to self.prey.
+            rng:
+
+        Returns:
+            numpy.ndarray: enough_food in each cell, or None if the target is not something this species can eat.
+
+        """
+        if not target:
+            target = self.prey
+        if isinstance(target, BulkFauna):
+            consumption = population * self.feeding_rate
+            available_food = food * (1-target.cryptocity)
+            relief = 0.35
+        elif isinstance(target, BulkFaunaD):
+            consumption = stochastic_round(population * self.feeding_rate * CONT_TO_DISC_FAUNA_CONVERSION, rng)
+            available_food = food * (1-target.cryptocity)
+            relief = 0.35
+        elif isinstance(target, Flora):
+            consumption = population * self.feeding_rate
+            available_food = food
+            relief = 0.25
+        else:
+            return None
+        return _bulk_feed_on(target, stress, food, consumption, available_food, relief, .25)
+
+    def bulk_stress_response(self, population, stress, rng=None, tracer=None, species=-1):
+        """stress_response for every cell at once, updating population and stress in place. rng is unused, as there is
+        nothing to round, and only there to match BulkFaunaD.
+
+        Args:
+            population (numpy.ndarray):
+            stress (numpy.ndarray):
+            rng:
+            tracer (beringia.trace.Tracer): Records reproduction, starvation and emigration events.
+            species (int): The species row in those events.
+
+        Returns:
+            numpy.ndarray: The emigrants from each cell.
+
+        """
+        np.clip(stress, 0.0, 1.0, out=stress)
+        reproducing = np.flatnonzero(stress <= self.stress_responses['reproduce'])
+        births = population[reproducing] * self.reproduction_rate
+        population[reproducing] += births
+        starving = np.flatnonzero(stress > self.stress_responses['starve'])
+        deaths = population[starving] * self.starvation_rate
+        population[starving] -= deaths
+        emigrants = np.zeros_like(population)
+        migrating = np.flatnonzero(stress > self.stress_responses['migrate'])
+        emigrants[migrating] = np.minimum(population[migrating] * self.emigration_rate, population[migrating])
+        population -= emigrants
+        if tracer is not None:
+            _trace_stress_response(tracer, species, reproducing, births, starving, deaths, migrating, emigrants)
+        return emigrants
+
     def starve(self, magnitude=1.0):
         starvation_quantity= self.population * self.starvation_rate * magnitude
         self.population -= starvation_quantity
-        if self.verbose:
-            print(self.__repr__() +" starving: " + str(starvation_quantity))
+        self._trace(STARVATION, starvation_quantity)
         return starvation_quantity
 
     def emigrate(self, magnitude=1.0):
@@ -357,15 +489,13 @@ class BulkFauna(Fauna):
             emigration_quantity = self.population
         self.population -= emigration_quantity
         #TODO self.location.get_neighbors.population += emigration_quantity # TODO pseudocode. Finish this.
-        if self.verbose:
-            print(self.__repr__() +" emigrating: "+str(emigration_quantity))
+        self._trace(EMIGRATION, emigration_quantity)
         return emigration_quantity
 
     def reproduce(self, magnitude=1.0):
         growth_quantity = self.population * self.reproduction_rate * magnitude
         self.population += growth_quantity
-        if self.verbose:
-            print(self.__repr__() +" reproducing: " + str(growth_quantity))
+        self._trace(REPRODUCTION, growth_quantity)
         return growth_quantity
 
     def get_depredated(self, magnitude=0.1, percentage=None):
@@ -377,10 +507,19 @@ class BulkFauna(Fauna):
         if percentage:
             predation_quantity = self.population * (1.0-percentage)
         self.population -= predation_quantity
-        if self.verbose:
-            print(self.__repr__() +" Preyed upon: " + str(predation_quantity))
         return self._zero_correct_pop()
 
+    def bulk_get_depredated(self, population, magnitude):
+        """get_depredated for every cell at once, in place.
+
+        Args:
+            population (numpy.ndarray):
+            magnitude (numpy.ndarray):
+
+        """
+        population -= magnitude
+        population[population <= 0.0] = 0.0
+
 
 class BulkFaunaD(Fauna):
     """AnimalBulk class docs
@@ -399,7 +538,18 @@ class BulkFaunaD(Fauna):
         starvation_rate (float):
         feeding_rate (float):
 
+    Instances use __slots__, and share the class STRESS_RESPONSES thresholds until stress_responses is assigned a dict
+    of their own.
+
     """
+    __slots__ = ('name', 'population', 'reproduction_rate', 'starvation_rate', 'feeding_rate', 'emigration_rate',
+                 'ambient_death_rate', 'stress', 'cryptocity', 'stress_responses', 'prey', 'verbose', 'diet')
+    STRESS_RESPONSES = {
+        'migrate': 0.375,
+        'starve': 0.75,
+        'reproduce': 0.20
+    }
+
     def __init__(self, population=10, reproduction_rate=0.04, starvation_rate=0.3, feeding_rate=0.3,
                  emigration_rate=0.3, prey=FeedBagD(), location=None, name=None):
         super().__init__(location=location)
@@ -412,13 +562,9 @@ class BulkFaunaD(Fauna):
         self.ambient_death_rate = 0.05
         self.stress=0.0
         self.cryptocity = 0.8 #                     # Cryptocity rate is how hard a species is to find.(eg a mole may have a cryptocity of 0.8, while a singing bird might be 0.1)
-        self.stress_responses ={
-            'migrate': 0.375,
-            'starve': 0.75,
-            'reproduce': 0.20
-        }
+        self.stress_responses = self.STRESS_RESPONSES
         self.prey = prey
-        self.verbose = True
+        self.verbose = False
 
     def __repr__(self):
         if self.name:
@@ -459,14 +605,14 @@ class BulkFaunaD(Fauna):
     def _is_feedbag(self):
         return False
 
-    def pass_turn(self):
+    def pass_turn(self, rng=np.random):
         """pass_turn docs
         Run all actions that occur in 1 unit of time.
         """
-        self.feed()
-        self.stress_response()
+        self.feed(rng=rng)
+        self.stress_response(rng)
 
-    def feed(self, target=None): #not rewritten for discrete
+    def feed(self, target=None, rng=np.random): #not rewritten for discrete
         """feed docs
         Target should default to self.prey generally. (ie self.prey should be the thing that this fauna generally feeds
         on)
@@ -488,13 +634,11 @@ class BulkFaunaD(Fauna):
                 self.stress = self.stress * 0.35
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .5)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " +str(enough_food)+" Method: bulkfauna")
-                print("  consumption: "+ str(consumption)+"  available food: "+ str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
         elif isinstance(target, BulkFaunaD):
             consumption_magnitude = self.population * self.feeding_rate
-            consumption = floor(consumption_magnitude) + binomial(1, consumption_magnitude % 1)
+            consumption = stochastic_round(consumption_magnitude, rng)
             available_food = target.population * (1-target.cryptocity)
             if available_food >= consumption:
                 target.get_depredated(consumption)
@@ -506,9 +650,7 @@ class BulkFaunaD(Fauna):
                 self.stress = self.stress * 0.35
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .5)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " +str(enough_food)+" Method: bulkfaunad")
-                print("  consumption: "+ str(consumption)+"  available food: "+ str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
         elif isinstance(target, Flora):
             consumption = self.population * self.feeding_rate / CONT_TO_DISC_FAUNA_CONVERSION
@@ -523,50 +665,116 @@ class BulkFaunaD(Fauna):
                 self.stress = self.stress * 0.35
             elif not enough_food:
                 self.stress -= ((available_food - consumption)/consumption * .5)   #Please improve this.
-            if self.verbose:
-                print(self.__repr__() + " feeding: " +str(enough_food)+" Method: flora")
-                print("  consumption: "+ str(consumption)+"  available food: "+ str(available_food))
+            self._trace(FEEDING, min(consumption, available_food))
             return enough_food
 
 
 
-    def stress_response(self):
+    def stress_response(self, rng=np.random):
         self._stress_correct()
         if self.stress <= self.stress_responses['reproduce']:
-            self.reproduce()
+            self.reproduce(rng=rng)
         if self.stress > self.stress_responses['starve']:
-            self.starve()
+            self.starve(rng=rng)
         if self.stress > self.stress_responses['migrate']:
-            self.emigrate()
+            self.emigrate(rng=rng)
 
-    def starve(self, magnitude=1.0):
+    def bulk_pass_turn(self, population, stress, food, target=None, rng=np.random):
+        """pass_turn for every cell at once, as BulkFauna.bulk_pass_turn. Every rounding is one stochastic_round
+        over the cells that need it, so populations stay whole numbers.
+
+        Returns:
+            numpy.ndarray: The emigrants from each cell.
+
+        """
+        self.bulk_feed(population, stress, food, target, rng)
+        return self.bulk_stress_response(population, stress, rng)
+
+    def bulk_feed(self, population, stress, food, target=None, rng=np.random):
+        """feed for every cell at once, with the same arithmetic as feed.
+
+        Args:
+            population (numpy.ndarray):
+            stress (numpy.ndarray): Updated in place.
+            food (numpy.ndarray): The target's population, or flora state. Depredated in place.
+            target: Defaults to self.prey.
+            rng:
+
+        Returns:
+            numpy.ndarray: enough_food in each cell, or None if the target is not something this species can eat.
+
+        """
+        if not target:
+            target = self.prey
+        if isinstance(target, BulkFauna):
+            consumption = population * self.feeding_rate / CONT_TO_DISC_FAUNA_CONVERSION
+            available_food = food * (1-target.cryptocity)
+        elif isinstance(target, BulkFaunaD):
+            consumption = stochastic_round(population * self.feeding_rate, rng)
+            available_food = food * (1-target.cryptocity)
+        elif isinstance(target, Flora):
+            consumption = population * self.feeding_rate / CONT_TO_DISC_FAUNA_CONVERSION
+            available_food = food
+        else:
+            return None
+        return _bulk_feed_on(target, stress, food, consumption, available_food, 0.35, .5)
+
+    def bulk_stress_response(self, population, stress, rng=np.random, tracer=None, species=-1):
+        """stress_response for every cell at once, updating population and stress in place.
+
+        Args:
+            population (numpy.ndarray):
+            stress (numpy.ndarray):
+            rng:
+            tracer (beringia.trace.Tracer): Records reproduction, starvation and emigration events.
+            species (int): The species row in those events.
+
+        Returns:
+            numpy.ndarray: The emigrants from each cell.
+
+        """
+        np.clip(stress, 0.0, 1.0, out=stress)
+        reproducing = np.flatnonzero(stress <= self.stress_responses['reproduce'])
+        births = stochastic_round(population[reproducing] * self.reproduction_rate, rng)
+        population[reproducing] += births
+        starving = np.flatnonzero(stress > self.stress_responses['starve'])
+        current = population[starving]
+        deaths = np.minimum(stochastic_round(current * self.starvation_rate, rng), current)
+        population[starving] -= deaths
+        emigrants = np.zeros_like(population)
+        migrating = np.flatnonzero(stress > self.stress_responses['migrate'])
+        current = population[migrating]
+        emigrants[migrating] = np.minimum(stochastic_round(current * self.emigration_rate, rng), current)
+        population -= emigrants
+        if tracer is not None:
+            _trace_stress_response(tracer, species, reproducing, births, starving, deaths, migrating, emigrants)
+        return emigrants
+
+    def starve(self, magnitude=1.0, rng=np.random):
         starvation_magnitude = self.population * self.starvation_rate * magnitude
-        starvation_quantity = floor(starvation_magnitude) + binomial(1, starvation_magnitude%1)
+        starvation_quantity = stochastic_round(starvation_magnitude, rng)
         if starvation_quantity > self.population:
             starvation_quantity = self.population
         self.population -= starvation_quantity
-        if self.verbose:
-            print(self.__repr__() +" starving: " + str(starvation_magnitude)+" "+str(starvation_quantity))
+        self._trace(STARVATION, starvation_quantity)
         return starvation_quantity
 
-    def emigrate(self, magnitude=1.0):
+    def emigrate(self, magnitude=1.0, rng=np.random):
         emigration_magnitude = self.population * self.emigration_rate * magnitude
-        emigration_quantity = floor(emigration_magnitude) + binomial(1, emigration_magnitude%1)
+        emigration_quantity = stochastic_round(emigration_magnitude, rng)
         if emigration_quantity > self.population:
             emigration_quantity = self.population
         self.population -= emigration_quantity
         #TODO self.location.get_neighbors.population += emigration_quantity # TODO pseudcode. Finish this.
-        if self.verbose:
-            print(self.__repr__() +" emigrating: " + str(emigration_magnitude)+" "+str(emigration_quantity))
+        self._trace(EMIGRATION, emigration_quantity)
         return emigration_quantity
 
 
-    def reproduce(self, magnitude=1.0):
+    def reproduce(self, magnitude=1.0, rng=np.random):
         growth_magnitude = self.population * self.reproduction_rate * magnitude
-        growth_quantity = floor(growth_magnitude) + binomial(1, growth_magnitude%1)
+        growth_quantity = stochastic_round(growth_magnitude, rng)
         self.population += growth_quantity
-        if self.verbose:
-            print(self.__repr__() +" reproducing: " + str(growth_magnitude)+" "+str(growth_quantity))
+        self._trace(REPRODUCTION, growth_quantity)
         return growth_quantity
 
     def get_depredated(self, magnitude=1, percentage=None):
@@ -580,10 +788,18 @@ class BulkFaunaD(Fauna):
             self.population -= self.population * (1.0-percentage)
             predation_quantity = int(self._zero_correct_pop * percentage)
         self.population -= predation_quantity
-        if self.verbose:
-            print(self.__repr__() +"Preyed upon: " + str(predation_quantity))
         return predation_quantity
 
+    def bulk_get_depredated(self, population, magnitude):
+        """get_depredated for every cell at once, in place. As there, only whole animals are taken.
+
+        Args:
+            population (numpy.ndarray):
+            magnitude (numpy.ndarray):
+
+        """
+        population -= np.trunc(magnitude)
+
 
 
 class AnimalBulk(Fauna):
@@ -14,6 +14,8 @@ class Feature(object):
         location (beringia.locale.Locale):
 
     """
+    __slots__ = ('location',)
+
     def __init__(self, location=None, locale=None):
         self.location = location
         #self.locale = locale
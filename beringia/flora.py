@@ -40,6 +40,50 @@ import numpy as np
 from beringia.feature import Feature
 
 
+def state_lookup_tables(state_constants):
+    """Turn a STATE_CONSTANTS dict into numpy lookup arrays indexed by state.
+
+    States start at -1 (burnt), so the arrays are indexed by state + 1.
+
+    Args:
+        state_constants (dict): {state: {'stateIncreaseProb': ..., ...}}
+
+    Returns:
+        dict: One float array per constant name.
+
+    """
+    states = sorted(state_constants)
+    offset = -states[0]
+    tables = {}
+    for key in state_constants[states[0]]:
+        table = np.zeros(states[-1] + offset + 1)
+        for state in states:
+            table[state + offset] = state_constants[state][key]
+        tables[key] = table
+    tables['offset'] = offset
+    return tables
+
+
+def _bulk_discrete_step(tables, state, on_fire, rng=np.random):
+    """Advance every cell of a discrete flora system by one tick, in place.
+
+    Matches Locale.pass_time: burn the cells that are on fire, roll increment_state, then roll risk_fire against the
+    new state. All rolls are drawn as one array, from rng (a numpy Generator, or the legacy numpy.random module).
+
+    """
+    offset = tables['offset']
+    burning = on_fire == 1
+    state[burning] = -1
+    on_fire[burning] = 0
+    rolls = rng.uniform(0, 1, (2, state.size))
+    index = state + offset
+    up = rolls[0] < tables['stateIncreaseProb'][index]
+    down = ~up & (rolls[0] > 1 - tables['stateDecreaseProb'][index])
+    state += up
+    state -= down
+    on_fire[rolls[1] < tables['fireStartProb'][state + offset]] = 1
+
+
 class Flora(Feature):
     """
     This is the base flora class, which includes all the functions necessary. This particular version does not work
@@ -47,10 +91,19 @@ class Flora(Feature):
 
     Flora is housed within a locale, and keeps track of which species are present and in what quantities.
 
+    Every flora class uses __slots__, and its constants (INITIAL_STATE, STATE_CONSTANTS) live on the class, so that an
+    instance per cell only holds its state and fire flag.
+
+    increment_state, risk_fire and catch_fire roll against rng, the legacy numpy.random module unless a region passes
+    one of its streams.
+
     """
+    __slots__ = ('state', 'on_fire')
+    INITIAL_STATE = 0
+
     def __init__(self):
         super(Feature, self).__init__()
-        self.state = 0
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
 
     def __repr__(self, verbose=False):
@@ -60,7 +113,7 @@ class Flora(Feature):
             return("FloraState: "+str(self.state)+"\nFireState: "+str(self.on_fire)) #TODO change something more specific
 
 
-    def increment_state(self):
+    def increment_state(self, rng=np.random):
         """increment_state docs
 
         Returns:
@@ -69,27 +122,27 @@ class Flora(Feature):
         """
         self.state+=1
 
-    def risk_fire(self):
+    def risk_fire(self, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < 0.1:
             self.on_fire = 1
             return True
         return False
 
-    def catch_fire(self):
+    def catch_fire(self, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < 0.1:
             self.on_fire = 1
             return True
@@ -117,30 +170,42 @@ class Flora(Feature):
         else:
             return bool(self.state)
 
+    def bulk_get_depredated(self, state, magnitude):
+        """get_depredated for every cell at once, as fauna feed it. Herbivory is off here, so state is left alone.
+
+        Args:
+            state (numpy.ndarray): The flora state of each cell.
+            magnitude (numpy.ndarray): What was eaten in each cell.
+
+        """
+        pass
+
 class FloraSystem0(Flora):
     """The most basic plant system that tracks simply Plants/No Plants state at each location.
     """
 
+    __slots__ = ()
+    STATE_CONSTANTS = {
+        0: {'stateIncreaseProb': 0.20, 'stateDecreaseProb': 0.0, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000},
+        1: {'stateIncreaseProb': 0.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0015, 'fireSpreadProb': 0.500},
+        -1: {'stateIncreaseProb': 1.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.000,
+             'fireSpreadProb': 0.000}
+    }
+
     def __init__(self):
         super(Flora, self).__init__()
-        self.state = 0
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
-        self.STATE_CONSTANTS = {
-            0: {'stateIncreaseProb': 0.20, 'stateDecreaseProb': 0.0, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000},
-            1: {'stateIncreaseProb': 0.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0015, 'fireSpreadProb': 0.500},
-            -1: {'stateIncreaseProb': 1.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.000,
-                 'fireSpreadProb': 0.000}
-        }
 
 
-    def increment_state(self):
+    def increment_state(self, rng=np.random):
         """increment_state docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['stateIncreaseProb']:
             self.state += 1
             return True
@@ -150,28 +215,28 @@ class FloraSystem0(Flora):
         return False
 
 
-    def risk_fire(self):
+    def risk_fire(self, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['fireStartProb']:
             self.on_fire = 1
             return True
         return False
 
 
-    def catch_fire(self):
+    def catch_fire(self, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['fireSpreadProb']:
             self.on_fire = 1
             return True
@@ -185,34 +250,71 @@ class FloraSystem0(Flora):
         self.state = -1
         self.on_fire = 0
 
+    @classmethod
+    def state_tables(cls):
+        """Lookup arrays built from STATE_CONSTANTS, cached on the class. See state_lookup_tables."""
+        if '_state_tables' not in cls.__dict__:
+            cls._state_tables = state_lookup_tables(cls.STATE_CONSTANTS)
+        return cls._state_tables
+
+    @classmethod
+    def bulk_step(cls, state, on_fire, tables=None, rng=np.random):
+        """Advance an array of cells by one tick in place: burn, increment_state, risk_fire.
+
+        Args:
+            state (numpy.ndarray): integer flora states.
+            on_fire (numpy.ndarray): 0/1 fire flags.
+            tables (dict): state_lookup_tables to use instead of the class STATE_CONSTANTS.
+            rng (numpy.random.Generator): Source of the rolls.
+
+        """
+        _bulk_discrete_step(cls.state_tables() if tables is None else tables, state, on_fire, rng)
+
+    @classmethod
+    def bulk_spread_prob(cls, state, tables=None):
+        """The catch_fire probability of each cell.
+
+        Args:
+            state (numpy.ndarray):
+            tables (dict): state_lookup_tables to use instead of the class STATE_CONSTANTS.
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        if tables is None:
+            tables = cls.state_tables()
+        return tables['fireSpreadProb'][state + tables['offset']]
 
 
 class FloraSystem1(Flora):
     """A system that categorizes several increasing states, and increments them forward.
     """
+    __slots__ = ()
+    STATE_CONSTANTS = {
+        0: {'stateIncreaseProb': 0.20, 'stateDecreaseProb': 0, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000},
+        1: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.100},
+        2: {'stateIncreaseProb': 0.15, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.200},
+        3: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.300},
+        4: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.450},
+        5: {'stateIncreaseProb': 0.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.700},
+        -1: {'stateIncreaseProb': 1.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000}
+    }
+
     def __init__(self):
         super(Flora, self).__init__()
-        self.state = 0
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
-        self.STATE_CONSTANTS = {
-            0: {'stateIncreaseProb': 0.20, 'stateDecreaseProb': 0, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000},
-            1: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.100},
-            2: {'stateIncreaseProb': 0.15, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.200},
-            3: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.300},
-            4: {'stateIncreaseProb': 0.10, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.450},
-            5: {'stateIncreaseProb': 0.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.0005, 'fireSpreadProb': 0.700},
-            -1: {'stateIncreaseProb': 1.00, 'stateDecreaseProb': 0.00, 'fireStartProb': 0.000, 'fireSpreadProb': 0.000}
-            }
-
-
-    def increment_state(self):
+
+
+    def increment_state(self, rng=np.random):
         """increment_state docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['stateIncreaseProb']:
             self.state += 1
             return True
@@ -222,28 +324,28 @@ class FloraSystem1(Flora):
         return False
 
 
-    def risk_fire(self):
+    def risk_fire(self, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['fireStartProb']:
             self.on_fire = 1
             return True
         return False
 
 
-    def catch_fire(self):
+    def catch_fire(self, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.STATE_CONSTANTS[self.state]['fireSpreadProb']:
             self.on_fire = 1
             return True
@@ -257,6 +359,42 @@ class FloraSystem1(Flora):
         self.state = -1
         self.on_fire = 0
 
+    @classmethod
+    def state_tables(cls):
+        """Lookup arrays built from STATE_CONSTANTS, cached on the class. See state_lookup_tables."""
+        if '_state_tables' not in cls.__dict__:
+            cls._state_tables = state_lookup_tables(cls.STATE_CONSTANTS)
+        return cls._state_tables
+
+    @classmethod
+    def bulk_step(cls, state, on_fire, tables=None, rng=np.random):
+        """Advance an array of cells by one tick in place: burn, increment_state, risk_fire.
+
+        Args:
+            state (numpy.ndarray): integer flora states.
+            on_fire (numpy.ndarray): 0/1 fire flags.
+            tables (dict): state_lookup_tables to use instead of the class STATE_CONSTANTS.
+            rng (numpy.random.Generator): Source of the rolls.
+
+        """
+        _bulk_discrete_step(cls.state_tables() if tables is None else tables, state, on_fire, rng)
+
+    @classmethod
+    def bulk_spread_prob(cls, state, tables=None):
+        """The catch_fire probability of each cell.
+
+        Args:
+            state (numpy.ndarray):
+            tables (dict): state_lookup_tables to use instead of the class STATE_CONSTANTS.
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        if tables is None:
+            tables = cls.state_tables()
+        return tables['fireSpreadProb'][state + tables['offset']]
+
 
 class FloraSystem2(Flora):
     """
@@ -267,14 +405,17 @@ class FloraSystem2(Flora):
 
     """
 
+    __slots__ = ('random_growth', 'herbivory_active')
+    INITIAL_STATE = 0.0  #State exists from 0-9 continuous, but should be rounded for display.
+
     def __init__(self):
         super(Flora, self).__init__()
-        self.state = 0.0  #State exists from 0-9 continuous, but should be rounded for display.
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
         self.random_growth = True
         self.herbivory_active = False
 
-    def increment_state(self, rate = 0.05, max= 9.9999):
+    def increment_state(self, rate = 0.05, max= 9.9999, rng=np.random):
         """increment_state docs
 
         Returns:
@@ -290,7 +431,7 @@ class FloraSystem2(Flora):
                 self.state = max
         elif self.random_growth:
             if self.state <= max:
-                self.state += np.random.normal(rate, rate/5)
+                self.state += rng.normal(rate, rate/5)
                 if self.state > max:
                     self.state = max
             else:
@@ -306,27 +447,27 @@ class FloraSystem2(Flora):
             return False
         return True
 
-    def risk_fire(self, fire_risk=0.0002):
+    def risk_fire(self, fire_risk=0.0002, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < fire_risk * self.state:
             self.on_fire = 1
             return True
         return False
 
-    def catch_fire(self, fire_spread_prob= 0.05):
+    def catch_fire(self, fire_spread_prob= 0.05, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.state * fire_spread_prob:
             self.on_fire = 1
             return True
@@ -339,6 +480,41 @@ class FloraSystem2(Flora):
         self.state = self.state * (1-fire_damage)
         self.on_fire = 0
 
+    @classmethod
+    def bulk_step(cls, state, on_fire, rate=0.05, max=9.9999, fire_risk=0.0002, fire_damage=0.9, random_growth=True,
+                  rng=np.random):
+        """Advance an array of cells by one tick in place: burn, increment_state, risk_fire.
+
+        Args:
+            state (numpy.ndarray): continuous flora states.
+            on_fire (numpy.ndarray): 0/1 fire flags.
+            rng (numpy.random.Generator): Source of the rolls.
+
+        """
+        burning = on_fire == 1
+        state[burning] *= (1-fire_damage)
+        on_fire[burning] = 0
+        if random_growth:
+            growing = state <= max
+            state[growing] += rng.normal(rate, rate/5, np.count_nonzero(growing))
+        else:
+            state += rate
+        np.minimum(state, max, out=state)
+        on_fire[rng.uniform(0, 1, state.size) < fire_risk * state] = 1
+
+    @classmethod
+    def bulk_spread_prob(cls, state, fire_spread_prob=0.05):
+        """The catch_fire probability of each cell.
+
+        Args:
+            state (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        return state * fire_spread_prob
+
     def get_depredated(self, magnitude=0.0, percentage=None, on=False):
         """get_depredated docs
         Population experiences herbivory.
@@ -354,6 +530,19 @@ class FloraSystem2(Flora):
         else:
             return bool(floor(self.state))
 
+    def bulk_get_depredated(self, state, magnitude):
+        """get_depredated for every cell at once, in place. The state is only grazed down when herbivory_active.
+
+        Args:
+            state (numpy.ndarray):
+            magnitude (numpy.ndarray):
+
+        """
+        if self.herbivory_active:
+            state -= magnitude
+            state[state <= 0.0] = 0.0
+
+
 class FloraSystem3(Flora):
     """
     This flora system increases plant mass as a logistic function from (0, 10). Fire probabilities
@@ -363,13 +552,16 @@ class FloraSystem3(Flora):
 
     """
 
+    __slots__ = ('random_growth',)
+    INITIAL_STATE = 0.1  #State exists from (0-10) continuous, but should be rounded for display.
+
     def __init__(self):
         super(Flora, self).__init__()
-        self.state = 0.1  #State exists from (0-10) continuous, but should be rounded for display.
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
         self.random_growth = False
 
-    def increment_state(self, rate = 0.05, max= 9.9999):
+    def increment_state(self, rate = 0.05, max= 9.9999, rng=np.random):
         """increment_state docs
 
         Returns:
@@ -379,27 +571,27 @@ class FloraSystem3(Flora):
         self.state += rate * self.state * (1 - self.state/max)
 
 
-    def risk_fire(self, fire_risk=0.0005):
+    def risk_fire(self, fire_risk=0.0005, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < fire_risk * self.state:
             self.on_fire = 1
             return True
         return False
 
-    def catch_fire(self, fire_spread_prob= 0.08):
+    def catch_fire(self, fire_spread_prob= 0.08, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.state * fire_spread_prob:
             self.on_fire = 1
             return True
@@ -412,6 +604,35 @@ class FloraSystem3(Flora):
         self.state = self.state * (1-fire_damage)
         self.on_fire = 0
 
+    @classmethod
+    def bulk_step(cls, state, on_fire, rate=0.05, max=9.9999, fire_risk=0.0005, fire_damage=0.9, rng=np.random):
+        """Advance an array of cells by one tick in place: burn, increment_state, risk_fire.
+
+        Args:
+            state (numpy.ndarray): continuous flora states.
+            on_fire (numpy.ndarray): 0/1 fire flags.
+            rng (numpy.random.Generator): Source of the rolls.
+
+        """
+        burning = on_fire == 1
+        state[burning] *= (1-fire_damage)
+        on_fire[burning] = 0
+        state += rate * state * (1 - state/max)
+        on_fire[rng.uniform(0, 1, state.size) < fire_risk * state] = 1
+
+    @classmethod
+    def bulk_spread_prob(cls, state, fire_spread_prob=0.08):
+        """The catch_fire probability of each cell.
+
+        Args:
+            state (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        return state * fire_spread_prob
+
 
 class FloraSystem4(Flora):
     """
@@ -419,14 +640,17 @@ class FloraSystem4(Flora):
     In progress....
     """
 
+    __slots__ = ('random_growth',)
+    INITIAL_STATE = 0.1  #State exists from (0-10) continuous, but should be rounded for display.
+
     def __init__(self):
         super(Flora, self).__init__()
-        self.state = 0.1  #State exists from (0-10) continuous, but should be rounded for display.
+        self.state = self.INITIAL_STATE
         self.on_fire = 0
         self.random_growth = False
 
 
-    def increment_state(self, rate = 0.05, max= 9.9999):
+    def increment_state(self, rate = 0.05, max= 9.9999, rng=np.random):
         """increment_state docs
 
         Returns:
@@ -436,27 +660,27 @@ class FloraSystem4(Flora):
         self.state += rate * self.state * (1 - self.state/max)
 
 
-    def risk_fire(self, fire_risk=0.0005):
+    def risk_fire(self, fire_risk=0.0005, rng=np.random):
         """risk_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < fire_risk * self.state:
             self.on_fire = 1
             return True
         return False
 
-    def catch_fire(self, fire_spread_prob= 0.08):
+    def catch_fire(self, fire_spread_prob= 0.08, rng=np.random):
         """catch_fire docs
 
         Returns:
             bool:
 
         """
-        roll = np.random.uniform(0, 1)
+        roll = rng.uniform(0, 1)
         if roll < self.state * fire_spread_prob:
             self.on_fire = 1
             return True
@@ -469,6 +693,35 @@ class FloraSystem4(Flora):
         self.state = self.state * (1-fire_damage)
         self.on_fire = 0
 
+    @classmethod
+    def bulk_step(cls, state, on_fire, rate=0.05, max=9.9999, fire_risk=0.0005, fire_damage=0.9, rng=np.random):
+        """Advance an array of cells by one tick in place: burn, increment_state, risk_fire.
+
+        Args:
+            state (numpy.ndarray): continuous flora states.
+            on_fire (numpy.ndarray): 0/1 fire flags.
+            rng (numpy.random.Generator): Source of the rolls.
+
+        """
+        burning = on_fire == 1
+        state[burning] *= (1-fire_damage)
+        on_fire[burning] = 0
+        state += rate * state * (1 - state/max)
+        on_fire[rng.uniform(0, 1, state.size) < fire_risk * state] = 1
+
+    @classmethod
+    def bulk_spread_prob(cls, state, fire_spread_prob=0.08):
+        """The catch_fire probability of each cell.
+
+        Args:
+            state (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        return state * fire_spread_prob
+
 
 class PlantBulk(Flora):
     """PlantBulk class docs
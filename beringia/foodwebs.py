@@ -1,51 +1,220 @@
+# -*- coding: utf-8 -*-
+"""foodwebs.py
 
-x={"population": 10, "reproduction_rate":0.06, "name":"spider"}
-
-y1= dict(BulkFaunas={
-    dict(name="aphid", population=1.0, reproduction_rate=0.1, starvation_rate=0.3, feeding_rate=0.1,
-         emigration_rate=0.1, prey="plant", location=None),
-    dict(name="spider", population=1.0, reproduction_rate=0.04, starvation_rate=0.3, feeding_rate=0.1,
-         emigration_rate=0.1, prey="aphid", location=None)
-}, BulkFaunasD={
-    dict(name="shrew", population=20, reproduction_rate=0.08, starvation_rate=0.3, feeding_rate=0.1,
-         emigration_rate=0.25, prey="spider", location=None),
-    dict(name="ferret", population=2, reproduction_rate=0.02, starvation_rate=0.2, feeding_rate=0.1,
-         emigration_rate=0.35, prey="shrew", location=None)
-})
-
-y={"BulkFaunas":{
-    {"name": "aphid",
-    "population":1.0,
-    "reproduction_rate":0.1,
-    "starvation_rate":0.3,
-    "feeding_rate":0.1,
-    "emigration_rate":0.1,
-    "prey":"plant",
-    "location":None},
-    {"name": "spider",
-    "population":1.0,
-    "reproduction_rate":0.04,
-    "starvation_rate":0.3,
-    "feeding_rate":0.1,
-    "emigration_rate":0.1,
-    "prey":"aphid",
-    "location":None}
-    },
-"BulkFaunasD":{
-    {"name": "shrew",
-    "population":20,
-    "reproduction_rate":0.08,
-    "starvation_rate":0.3,
-    "feeding_rate":0.1,
-    "emigration_rate":0.1,
-    "prey":"spider",
-    "location":None},
-    {"name": "ferret",
-    "population":2,
-    "reproduction_rate":0.02,
-    "starvation_rate":0.2,
-    "feeding_rate":0.1,
-    "emigration_rate":0.1,
-    "prey":"shrew",
-    "location":None}
-}}
\ No newline at end of file
+Food webs. A web is defined once, in foodwebs.xml or as a list of species dicts, and built into BulkFauna and BulkFaunaD
+objects whose diet lists every (prey, feeding_rate) pair, so a species may eat several prey. "plant" is the region's
+flora.
+
+    region.set_food_web('omnivore')
+
+CompiledFoodWeb turns a list of species into arrays: a species index, a predator by prey feeding rate matrix whose last
+column is the flora, the cryptocity of every prey, and a topological order in which each species is fed after all of
+its prey. Feeding one predator on all of its prey in every cell is then a handful of array operations, with the same
+arithmetic as BulkFauna.feed and BulkFaunaD.feed for single prey diets.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import os
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+import networkx as nx
+
+from beringia.fauna import BulkFauna, BulkFaunaD, stochastic_round
+from beringia.flora import Flora
+from beringia.constants import CONT_TO_DISC_FAUNA_CONVERSION
+from beringia.trace import FEEDING
+
+
+FOOD_WEBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'foodwebs.xml')
+FLORA = 'plant'
+KINDS = {'BulkFauna': BulkFauna, 'BulkFaunaD': BulkFaunaD}
+SPECIES_ATTRIBUTES = ('population', 'reproduction_rate', 'starvation_rate', 'feeding_rate', 'emigration_rate',
+                      'ambient_death_rate', 'cryptocity')
+
+
+def read_food_webs(path=FOOD_WEBS_PATH):
+    """Parse every web of a definitions file.
+
+    Args:
+        path (str):
+
+    Returns:
+        dict: {name: definition}, where a definition is a list of species dicts with 'name', 'kind', any of
+            SPECIES_ATTRIBUTES and 'diet', a list of (prey name, feeding_rate or None) pairs.
+
+    """
+    webs = {}
+    for web in ElementTree.parse(path).getroot().iter('foodweb'):
+        definition = []
+        for element in web.iter('species'):
+            species = {'name': element.get('name'), 'kind': element.get('kind', 'BulkFauna')}
+            species.update((key, float(value)) for key, value in element.attrib.items() if key in SPECIES_ATTRIBUTES)
+            species['diet'] = [(prey.get('name'), float(prey.get('feeding_rate')) if prey.get('feeding_rate') else None)
+                               for prey in element.iter('prey')]
+            definition.append(species)
+        webs[web.get('name')] = definition
+    return webs
+
+
+def build_food_web(definition, flora):
+    """The species of a definition, in its order, with their diets linked.
+
+    Args:
+        definition (list): As returned in read_food_webs. A diet entry may also be just the prey name.
+        flora (beringia.flora.Flora): What FLORA refers to.
+
+    Returns:
+        list: BulkFauna and BulkFaunaD objects. Each prey is set to the first entry of its diet.
+
+    Raises:
+        ValueError: For unknown kinds or prey, repeated names, or a web with a cycle.
+
+    """
+    species = {}
+    for entry in definition:
+        if entry['name'] in species or entry['name'] == FLORA:
+            raise ValueError(f"Species {entry['name']} is defined twice")
+        if entry.get('kind', 'BulkFauna') not in KINDS:
+            raise ValueError(f"Unknown kind of species {entry.get('kind')}")
+        taxa = KINDS[entry.get('kind', 'BulkFauna')](name=entry['name'])
+        taxa.verbose = False
+        for key in SPECIES_ATTRIBUTES:
+            if key in entry:
+                setattr(taxa, key, entry[key])
+        species[entry['name']] = taxa
+    for entry in definition:
+        diet = []
+        for item in entry.get('diet', []):
+            name, feeding_rate = (item, None) if isinstance(item, str) else item
+            if name != FLORA and name not in species:
+                raise ValueError(f"Unknown prey {name} of {entry['name']}")
+            diet.append((flora if name == FLORA else species[name], feeding_rate))
+        taxa = species[entry['name']]
+        taxa.diet = diet
+        taxa.prey = diet[0][0] if diet else flora
+    taxa = list(species.values())
+    CompiledFoodWeb(taxa, flora)
+    return taxa
+
+
+class CompiledFoodWeb(object):
+    """CompiledFoodWeb class docs
+
+    Compiling reads the current rates of the species, and is cheap enough to redo every tick.
+
+    Args:
+        species (list): BulkFauna and BulkFaunaD objects, eating what their diet lists, or else their prey.
+        flora (beringia.flora.Flora): The flora, which is column n_species of the matrices.
+
+    Attributes:
+        index (dict): Row of each species, by name when it has one and by id otherwise.
+        feeding (numpy.ndarray): (n_species, n_species + 1) feeding rates, 0 where there is no link.
+        cryptocity (numpy.ndarray): Of every prey column, 0 for the flora.
+        order (numpy.ndarray): Rows in an order that feeds every species after its prey.
+
+    Raises:
+        ValueError: If the web has a cycle, or a diet lists a prey twice.
+
+    """
+    def __init__(self, species, flora):
+        self.species = list(species)
+        self.flora = flora
+        n = self.n_species = len(self.species)
+        rows = {id(taxa): s for s, taxa in enumerate(self.species)}
+        self.index = {taxa.name if taxa.name else id(taxa): s for s, taxa in enumerate(self.species)}
+        self.discrete = np.array([isinstance(taxa, BulkFaunaD) for taxa in self.species] + [False])
+        self.cryptocity = np.array([taxa.cryptocity for taxa in self.species] + [0.0])
+        self.feeding = np.zeros((n, n + 1))
+        self.diets = []
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(n))
+        for s, taxa in enumerate(self.species):
+            diet = []
+            for prey, feeding_rate in getattr(taxa, 'diet', None) or [(taxa.prey, None)]:
+                column = n if isinstance(prey, Flora) else rows.get(id(prey))
+                if column is None:
+                    continue
+                if column in diet:
+                    raise ValueError(f"{taxa.name or 'A species'} lists the same prey twice")
+                self.feeding[s, column] = taxa.feeding_rate if feeding_rate is None else feeding_rate
+                diet.append(column)
+                if column < n:
+                    graph.add_edge(column, s)
+            self.diets.append(np.array(diet, dtype=np.int64))
+        try:
+            self.order = np.array(list(nx.lexicographical_topological_sort(graph)), dtype=np.int64)
+        except nx.NetworkXUnfeasible:
+            raise ValueError("A food web can not have a cycle")
+
+        # The unit conversions and factors of BulkFauna.feed and BulkFaunaD.feed, per predator and prey.
+        predator = self.discrete[:n, None]
+        prey = self.discrete[None, :]
+        self.scale_up = np.where(~predator & prey, CONT_TO_DISC_FAUNA_CONVERSION, 1)
+        self.scale_down = np.where(predator & ~prey, CONT_TO_DISC_FAUNA_CONVERSION, 1)
+        plants_only = np.array([diet.size > 0 and (diet == n).all() for diet in self.diets])
+        self.relief = np.where(self.discrete[:n], 0.35, np.where(plants_only, 0.25, 0.35))
+        self.penalty = np.where(self.discrete[:n], 0.5, 0.25)
+
+    def __repr__(self):
+        return f'food web of {self.n_species} species'
+
+    def links(self):
+        """Every (predator, prey, feeding_rate) by name, with FLORA for the flora."""
+        names = [taxa.name if taxa.name else str(s) for s, taxa in enumerate(self.species)] + [FLORA]
+        return [(names[s], names[p], float(self.feeding[s, p])) for s, diet in enumerate(self.diets) for p in diet]
+
+    def feed(self, s, population, stress, flora_state, rng=np.random, tracer=None):
+        """Feed species s on every prey in its diet, in every cell at once. Arrays are updated in place.
+
+        Each prey is hunted for population * feeding_rate, converted between continuous and discrete units and
+        stochastically rounded for discrete prey as in feed, and yields at most its population * (1 - cryptocity), or
+        the flora state. Stress falls by relief if the total eaten covers the total hunted, and rises with the
+        shortfall otherwise. Cells where nothing was hunted are not stressed.
+
+        Args:
+            s (int): Row of the predator.
+            population (numpy.ndarray): (n_species, n_cells) populations of every species.
+            stress (numpy.ndarray): The predator's stress in each cell.
+            flora_state (numpy.ndarray):
+            rng:
+            tracer (beringia.trace.Tracer): Records a feeding event for every cell where food was found.
+
+        Returns:
+            numpy.ndarray: enough_food in each cell, or None for a species with nothing to eat.
+
+        """
+        diet = self.diets[s]
+        if not diet.size:
+            return None
+        n = self.n_species
+        demand = population[s] * self.feeding[s, diet][:, None]
+        demand *= self.scale_up[s, diet][:, None]
+        demand /= self.scale_down[s, diet][:, None]
+        discrete = np.flatnonzero(self.discrete[diet])
+        if discrete.size:
+            demand[discrete] = stochastic_round(demand[discrete], rng)
+        fauna = diet < n
+        available = np.empty_like(demand)
+        available[fauna] = population[diet[fauna]] * (1-self.cryptocity[diet[fauna]])[:, None]
+        available[~fauna] = flora_state
+        eaten = np.minimum(demand, available)
+        consumption = demand.sum(axis=0)
+        found = eaten.sum(axis=0)
+        enough_food = found >= consumption
+        hungry = ~enough_food
+        stress[enough_food] *= self.relief[s]
+        shortfall = found[hungry] - consumption[hungry]
+        needed = consumption[hungry]
+        stress[hungry] -= np.divide(shortfall, needed, out=np.zeros_like(shortfall), where=needed > 0) * self.penalty[s]
+        if tracer is not None:
+            fed = np.flatnonzero(found > 0)
+            tracer.record(FEEDING, fed, found[fed], s)
+        for row, p in enumerate(diet):
+            if p == n:
+                self.flora.bulk_get_depredated(flora_state, eaten[row])
+            else:
+                self.species[p].bulk_get_depredated(population[p], eaten[row])
+        return enough_food
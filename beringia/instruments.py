@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""instruments.py
+
+Per phase instrumentation for pass_time. Every region has an Instruments object, off by default. Once enabled it keeps
+a monotonic timer and call and cell counters for each phase of a tick, plus named counters such as fire attempts and
+ignitions and the soil moved by erosion, and calls its per tick callbacks at the end of every tick:
+
+    region.instruments.enable()
+    region.instruments.add_callback(lambda region, instruments: print(instruments.as_dict()))
+    region.pass_time(100)
+    region.instruments.as_dict()['phases']['fire']['seconds']
+
+While it is off, timed only calls the phase and count returns at once, so the cost is one attribute check per phase.
+
+Phase times are exclusive: a phase timed while another is running, such as dispersal inside the fauna phase, is
+subtracted from the outer phase, so the seconds of all phases add up to the time spent in them.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import time
+
+
+class Instruments(object):
+    """Instruments class docs
+
+    Args:
+        enabled (bool):
+        clock (callable): Returns the time in seconds. time.perf_counter by default.
+
+    """
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.callbacks = []
+        self._nested = []
+        self.reset()
+
+    def __repr__(self):
+        return f'instruments ({"on" if self.enabled else "off"}, {self.ticks} ticks)'
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Zero every timer and counter. Callbacks and the enabled flag are kept."""
+        self.ticks = 0
+        self.seconds = {}
+        self.calls = {}
+        self.cells = {}
+        self.counters = {}
+
+    def add_callback(self, callback):
+        """Call callback(region, instruments) at the end of every instrumented tick.
+
+        Args:
+            callback (callable):
+
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def timed(self, phase, cells, function, *args, **kwargs):
+        """Call function(*args, **kwargs), and time it as one call of phase over cells when enabled. The time of phases
+        timed inside function is not counted for phase.
+
+        Returns:
+            The return value of function.
+
+        """
+        if not self.enabled:
+            return function(*args, **kwargs)
+        return self._time(phase, 1, cells, function, args, kwargs)
+
+    def timed_part(self, phase, cells, function, *args, **kwargs):
+        """timed, for a phase that runs in several pieces per tick, such as dispersal between the feeding of each
+        species: the time and cells of function are added to phase, but not a call. Time one of the pieces with timed
+        to count the call.
+
+        Returns:
+            The return value of function.
+
+        """
+        if not self.enabled:
+            return function(*args, **kwargs)
+        return self._time(phase, 0, cells, function, args, kwargs)
+
+    def _time(self, phase, calls, cells, function, args, kwargs):
+        start = self.clock()
+        self._nested.append(0.0)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            inner = self._nested.pop()
+        elapsed = self.clock() - start
+        if self._nested:
+            self._nested[-1] += elapsed
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + elapsed - inner
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+        self.cells[phase] = self.cells.get(phase, 0) + cells
+        return result
+
+    def count(self, name, value=1):
+        """Add value to the counter name when enabled."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def end_tick(self, region):
+        """Count a tick and run the callbacks, when enabled."""
+        if self.enabled:
+            self.ticks += 1
+            for callback in self.callbacks:
+                callback(region, self)
+
+    def as_dict(self):
+        """Everything measured so far.
+
+        Returns:
+            dict: 'enabled', 'ticks', 'phases' ({phase: {'seconds', 'calls', 'cells', 'seconds_per_call',
+                'cells_per_second'}}) and 'counters'.
+
+        """
+        phases = {}
+        for phase, seconds in self.seconds.items():
+            calls, cells = self.calls[phase], self.cells[phase]
+            phases[phase] = {'seconds': seconds, 'calls': calls, 'cells': cells,
+                             'seconds_per_call': seconds / calls if calls else 0.0,
+                             'cells_per_second': cells / seconds if seconds else 0.0}
+        return {'enabled': self.enabled, 'ticks': self.ticks, 'phases': phases, 'counters': dict(self.counters)}
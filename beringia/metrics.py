@@ -1,32 +1,159 @@
-'''
-TODO:
-    Metrics
-        Diversity
-            Richness
-            Evenness
-            Patchiness
-        Populations:
-            Size
-            Age Structure
-            growth rate
-            mortality
-                cause thereof
-        Biomass
-        Ecological Yield(?)
-            Forest Products
-            Hunting
-        Foodweb mapping
-        Productivity
-            Soil production
-            Carbon capture(?)
-            Water Retention
-            Soil Loss
-        Carrying Capacity(????)
-        METRICS BASED ON PROPER SAMPLING METHODOLIGIES!?!
-    Visualizations
-        Mapping
-            Heatmaps seem like they would work well?
-        graphing
-        Foodweb mapping
-    Dashboard UI
-'''
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""metrics.py
+
+Per tick metrics for ArrayRegions. A MetricsRecorder is attached to a region as a tick hook; every tick it computes a
+configurable set of aggregates with array reductions and appends them to a CSV file in fixed size chunks, so memory use
+does not grow with the length of the run.
+
+    recorder = MetricsRecorder('run_metrics.csv')
+    region.add_tick_hook(recorder)
+    region.pass_time(1000000)
+    recorder.close()
+
+    TODO:
+        Metrics
+            Diversity
+                Richness
+                Evenness
+                Patchiness
+            Populations:
+                Size
+                Age Structure
+                growth rate
+                mortality
+                    cause thereof
+            Biomass
+            Ecological Yield(?)
+                Forest Products
+                Hunting
+            Foodweb mapping
+            Productivity
+                Soil production
+                Carbon capture(?)
+                Water Retention
+                Soil Loss
+            Carrying Capacity(????)
+            METRICS BASED ON PROPER SAMPLING METHODOLIGIES!?!
+        Visualizations
+            Mapping
+                Heatmaps seem like they would work well?
+            graphing
+            Foodweb mapping
+        Dashboard UI
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import numpy as np
+
+
+FLORA_STATES = range(-1, 10)
+
+
+def flora_states(region):
+    """Number of cells in each (floored) flora state, -1 to 9."""
+    counts = np.bincount(np.clip(np.floor(region.flora_state).astype(np.int64), -1, 9) + 1,
+                         minlength=len(FLORA_STATES))
+    return {f'flora_state_{state}': count for state, count in zip(FLORA_STATES, counts)}
+
+
+def mean_flora_state(region):
+    return {'mean_flora_state': region.flora_state.mean()}
+
+
+def cells_on_fire(region):
+    return {'cells_on_fire': np.count_nonzero(region.on_fire)}
+
+
+def soil_depth_total(region):
+    return {'soil_depth_total': region.soil_depth[:region.n_cells].sum()}
+
+
+def fauna_population(region):
+    """Summed population of each species."""
+    totals = region.fauna_population.sum(axis=1)
+    return {f'fauna_population_{s}': total for s, total in enumerate(totals)}
+
+
+METRICS = {
+    'flora_states': flora_states,
+    'mean_flora_state': mean_flora_state,
+    'cells_on_fire': cells_on_fire,
+    'soil_depth_total': soil_depth_total,
+    'fauna_population': fauna_population
+}
+
+
+class MetricsRecorder(object):
+    """MetricsRecorder class docs
+
+    Call it with a region (or add it with ArrayRegion.add_tick_hook) to record one row. Rows are buffered in a
+    preallocated chunk and appended to path whenever the chunk fills, and on close.
+
+    Args:
+        path (str): CSV file to append to. Its header is written with the first chunk.
+        metrics (list): Names from METRICS, or callables taking a region and returning {column: value}.
+        chunk_size (int): Rows held in memory between writes.
+        every (int): Record only every this many ticks.
+
+    """
+    def __init__(self, path, metrics=('flora_states', 'cells_on_fire', 'soil_depth_total', 'fauna_population'),
+                 chunk_size=1000, every=1):
+        self.path = path
+        self.metrics = [METRICS[metric] if isinstance(metric, str) else metric for metric in metrics]
+        self.chunk_size = chunk_size
+        self.every = every
+        self.columns = None
+        self.chunk = None
+        self.rows = 0
+        self.written = 0
+
+    def __call__(self, region):
+        if region.time % self.every:
+            return
+        row = {'time': region.time}
+        for metric in self.metrics:
+            row.update(metric(region))
+        if self.columns is None:
+            self.columns = list(row)
+            self.chunk = np.zeros((self.chunk_size, len(self.columns)))
+        self.chunk[self.rows] = [row[column] for column in self.columns]
+        self.rows += 1
+        if self.rows == self.chunk_size:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def flush(self):
+        """Append the buffered rows to the file."""
+        if self.columns is None:
+            return
+        with open(self.path, 'a' if self.written else 'w') as f:
+            np.savetxt(f, self.chunk[:self.rows], delimiter=',', fmt='%.10g',
+                       header=','.join(self.columns) if not self.written else '', comments='')
+        self.written += self.rows
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+
+
+def read_metrics(path):
+    """Read a file written by MetricsRecorder.
+
+    Args:
+        path (str):
+
+    Returns:
+        dict: {column: numpy.ndarray}
+
+    """
+    with open(path) as f:
+        columns = f.readline().strip().split(',')
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    return {column: data[:, i] for i, column in enumerate(columns)}
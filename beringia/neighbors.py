@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""neighbors.py
+
+A compressed (CSR) neighbor index over the cells of a region. Cells are integer ids; the neighbors of cell i are
+targets[offsets[i]:offsets[i+1]]. Interior cells come first, border cells (inert sinks around a '2d' grid) after them.
+
+The index is built once per topology and shared: neighbor_index() caches it by (xdim, ydim, grid_type, edges), and
+its arrays are read only. Fire, erosion, dispersal and neighborhood queries all read it instead of asking networkx,
+in ArrayRegion and in the Region object model alike.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+from functools import lru_cache
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+
+
+class NeighborIndex(object):
+    """NeighborIndex class docs
+
+    Args:
+        offsets (numpy.ndarray): n_total + 1 row offsets into targets.
+        targets (numpy.ndarray): neighbor cell ids.
+        n_cells (int): Number of interior cells.
+        locations (list): Location of every cell, or None on '2d' grids where it is computed.
+        xdim (int):
+        ydim (int):
+        grid_type (str):
+
+    """
+    def __init__(self, offsets, targets, n_cells, locations=None, xdim=0, ydim=0, grid_type='2d'):
+        self.offsets = offsets
+        self.targets = targets
+        self.n_cells = n_cells
+        self.n_total = offsets.size - 1
+        self.n_border = self.n_total - n_cells
+        self.xdim = xdim
+        self.ydim = ydim
+        self.grid_type = grid_type
+        self.is_border = np.zeros(self.n_total, dtype=bool)
+        self.is_border[n_cells:] = True
+        self.degree = np.diff(offsets)
+        self._locations = locations
+        if locations is not None:
+            self._border_nodes = []
+            self._index = {node: i for i, node in enumerate(locations)}
+        else:
+            self._border_nodes = _grid_2d_border_nodes(xdim, ydim)[:self.n_border]
+            self._index = {node: n_cells + i for i, node in enumerate(self._border_nodes)}
+        self._padded = None
+        self._adjacency = None
+        for array in (self.offsets, self.targets, self.is_border, self.degree):
+            array.flags.writeable = False
+
+    def __repr__(self):
+        return f'NeighborIndex {self.grid_type} {self.n_cells}+{self.n_border} cells, {self.targets.size} links'
+
+    @classmethod
+    def grid_2d(cls, xdim, ydim, edges=True):
+        """Build the index of an xdim by ydim grid directly, without networkx. Cell (x, y) has id x * ydim + y.
+
+        Args:
+            xdim (int):
+            ydim (int):
+            edges (bool): Surround the grid with border cells.
+
+        Returns:
+            NeighborIndex:
+
+        """
+        n = xdim * ydim
+        x, y = np.divmod(np.arange(n), ydim)
+        missing = np.full(n, -1, dtype=np.int64)
+        if edges:
+            west, east = n + 2 * xdim + 2 * y, n + 2 * xdim + 2 * y + 1
+            north, south = n + 2 * x, n + 2 * x + 1
+        else:
+            west = east = north = south = missing
+        table = np.stack([
+            np.where(x > 0, np.arange(n) - ydim, west),
+            np.where(x < xdim - 1, np.arange(n) + ydim, east),
+            np.where(y > 0, np.arange(n) - 1, north),
+            np.where(y < ydim - 1, np.arange(n) + 1, south)
+        ], axis=1)
+        present = table >= 0
+        counts = present.sum(axis=1)
+        targets = table[present]
+        if edges:
+            i, j = np.arange(xdim), np.arange(ydim)
+            border = np.concatenate([
+                np.stack([i * ydim, i * ydim + ydim - 1], axis=1).ravel(),
+                np.stack([j, (xdim - 1) * ydim + j], axis=1).ravel()
+            ])
+            targets = np.concatenate([targets, border])
+            counts = np.concatenate([counts, np.ones(border.size, dtype=counts.dtype)])
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(offsets, targets.astype(np.int64), n, xdim=xdim, ydim=ydim, grid_type='2d')
+
+    @classmethod
+    def from_graph(cls, graph, grid_type=None, border=()):
+        """Build the index of any networkx graph. Cells are numbered in sorted node order, border nodes last.
+
+        Args:
+            graph (networkx.Graph):
+            grid_type (str):
+            border (iterable): The nodes to flag as border cells.
+
+        Returns:
+            NeighborIndex:
+
+        """
+        border = sorted(border)
+        flagged = set(border)
+        locations = sorted(node for node in graph.nodes if node not in flagged) + border
+        index = {node: i for i, node in enumerate(locations)}
+        counts = np.array([graph.degree(node) for node in locations], dtype=np.int64)
+        targets = np.array([index[n] for node in locations for n in graph.neighbors(node)], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(offsets, targets, len(locations) - len(border), locations=locations, grid_type=grid_type)
+
+    def location(self, cell):
+        """The location tuple of a cell id."""
+        if self._locations is not None:
+            return self._locations[cell]
+        if cell < self.n_cells:
+            return divmod(int(cell), self.ydim)
+        return self._border_nodes[cell - self.n_cells]
+
+    def cell(self, location):
+        """The cell id of a location tuple, or None if there is no such cell."""
+        if self._locations is None:
+            x, y = location
+            if 0 <= x < self.xdim and 0 <= y < self.ydim:
+                return x * self.ydim + y
+        return self._index.get(location)
+
+    def neighbors(self, cell):
+        """The neighbor ids of one cell."""
+        return self.targets[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def gather(self, cells):
+        """The neighbors of many cells, concatenated, one entry per (cell, neighbor) link.
+
+        Args:
+            cells (numpy.ndarray): cell ids.
+
+        Returns:
+            numpy.ndarray: neighbor ids, with repeats.
+
+        """
+        starts = self.offsets[cells]
+        counts = self.offsets[cells + 1] - starts
+        total = counts.sum()
+        if not total:
+            return np.zeros(0, dtype=np.int64)
+        shift = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        return self.targets[shift + np.arange(total)]
+
+    def sources(self):
+        """The cell id of each link in targets, so (sources()[k], targets[k]) is one link."""
+        return np.repeat(np.arange(self.n_total), self.degree)
+
+    def padded(self):
+        """The interior rows as an (n_cells, max_degree) table, padded with n_total. Cached.
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        if self._padded is None:
+            degree = self.degree[:self.n_cells]
+            table = np.full((self.n_cells, int(degree.max(initial=0))), self.n_total, dtype=np.int64)
+            rows = np.repeat(np.arange(self.n_cells), degree)
+            columns = np.arange(self.offsets[self.n_cells]) - np.repeat(self.offsets[:self.n_cells], degree)
+            table[rows, columns] = self.targets[:self.offsets[self.n_cells]]
+            table.flags.writeable = False
+            self._padded = table
+        return self._padded
+
+    def adjacency(self, interior=True):
+        """The adjacency matrix as a scipy CSR matrix. Cached.
+
+        Args:
+            interior (bool): Only the links between interior cells.
+
+        Returns:
+            scipy.sparse.csr_matrix:
+
+        """
+        if self._adjacency is None:
+            data = np.ones(self.targets.size)
+            self._adjacency = sparse.csr_matrix((data, self.targets, self.offsets), shape=(self.n_total, self.n_total))
+        if interior:
+            return self._adjacency[:self.n_cells, :self.n_cells]
+        return self._adjacency
+
+    def neighborhood(self, cell, depth=1, borders=False):
+        """Breadth first rings around a cell.
+
+        Args:
+            cell (int):
+            depth (int):
+            borders (bool): Include border cells.
+
+        Returns:
+            list: One array of cell ids per step.
+
+        """
+        explored = np.zeros(self.n_total, dtype=bool)
+        explored[cell] = True
+        frontier = np.array([cell], dtype=np.int64)
+        tiers = []
+        for _ in range(depth):
+            tier = np.unique(self.gather(frontier))
+            tier = tier[~explored[tier]]
+            if not borders:
+                tier = tier[~self.is_border[tier]]
+            explored[tier] = True
+            tiers.append(tier)
+            frontier = tier
+        return tiers
+
+
+def _grid_2d_border_nodes(xdim, ydim):
+    border = []
+    for i in range(xdim):
+        border.extend([(i, -1), (i, ydim)])
+    for j in range(ydim):
+        border.extend([(-1, j), (xdim, j)])
+    return border
+
+
+@lru_cache(maxsize=32)
+def neighbor_index(xdim, ydim, grid_type='2d', edges=True):
+    """The shared NeighborIndex of a region topology.
+
+    Args:
+        xdim (int):
+        ydim (int):
+        grid_type (str): '2d', 'hex' or 'tri'. Unknown types fall back to '2d'.
+        edges (bool): Surround a '2d' grid with border cells.
+
+    Returns:
+        NeighborIndex:
+
+    """
+    if grid_type == 'hex':
+        return NeighborIndex.from_graph(nx.hexagonal_lattice_graph(xdim, ydim), grid_type)
+    elif grid_type == 'tri':
+        return NeighborIndex.from_graph(nx.triangular_lattice_graph(xdim, ydim), grid_type)
+    return NeighborIndex.grid_2d(xdim, ydim, edges)
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""parallel.py
+
+Domain decomposition over worker processes. A ParallelRegion splits a '2d' grid into horizontal stripes, one per worker,
+and keeps every layer in multiprocessing.shared_memory so that workers read their neighbors' edge rows directly. The
+per stripe kernels are those of beringia.tiled.TiledRegion, and the parent process only sends commands and waits for
+every worker between phases, which is when halos are exchanged:
+    Flora runs on each stripe independently.
+    Fire spreads in rounds. Every stripe with a front spreads it as far as its own cells allow, reading its halo as it
+    was at the start of the round, and reports the halo cells it ignited. Between rounds the parent sets those cells
+    burning and puts them on their owners' fronts, and rounds repeat until no front is left, so a fire can cross any
+    number of stripes in one tick.
+    Erosion runs its two passes with a barrier between them, and matches ArrayRegion.erode_all.
+
+A kernel that raises in a worker is reported back to the parent, which raises WorkerError with the worker's traceback
+once every worker has replied. The workers keep running, and close() frees the shared memory whatever state they are
+in.
+
+Each worker draws from its own child of the region's RandomStreams, so a run is reproducible for a given seed and
+worker count, and statistically the same as a serial TiledRegion run.
+
+    with ParallelRegion(4000, 4000, workers=8, flora_system=3, seed=1) as region:
+        region.pass_time(100)
+        print(region.timings)
+        region.save('landscape')
+    region = TiledRegion.open('landscape')
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from beringia.soil import Geology
+from beringia.tiled import TiledRegion, LAYERS, SCRATCH
+
+
+class WorkerError(Exception):
+    """Raised in the parent when a worker's kernel fails, or a worker is gone."""
+
+
+class _Failure(object):
+    """The reply of a worker whose kernel raised."""
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        self.message = message
+
+
+class ParallelRegion(TiledRegion):
+    """ParallelRegion class docs
+
+    Args:
+        xdim (int):
+        ydim (int):
+        workers (int): Worker processes, and stripes. None uses every core.
+        flora_system (int):
+        seed (int): Seed for the region's RandomStreams.
+
+    """
+    def __init__(self, xdim=1000, ydim=1000, workers=None, flora_system=1, seed=None):
+        self._setup(None, xdim, ydim, None, flora_system, seed)
+        workers = min(workers or os.cpu_count() or 1, xdim)
+        bounds = np.linspace(0, xdim, workers + 1).astype(int)
+        self.stripes = [(slice(int(x0), int(x1)), slice(0, ydim)) for x0, x1 in zip(bounds[:-1], bounds[1:])]
+        self._bounds = bounds
+        self.timings = {'ticks': 0, 'flora': 0.0, 'fire': 0.0, 'erosion': 0.0, 'fire_rounds': 0}
+
+        geology = Geology()
+        self.border_elevation = self.random.terrain.gamma(5, 0.5) + geology.soil_depth
+        dtype = np.int64 if isinstance(self._flora.state, int) else np.float64
+        layers = {'flora_state': dtype, 'on_fire': np.int8, 'elevation_base': np.float64, 'soil_depth': np.float64,
+                  'soil_moisture': np.float64}
+        layers.update(('scratch_' + name, dtype) for name, dtype in SCRATCH.items())
+        self._shared = {}
+        self._layout = {}
+        for name, dtype in layers.items():
+            nbytes = max(xdim * ydim * np.dtype(dtype).itemsize, 1)
+            self._shared[name] = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._layout[name] = (self._shared[name].name, np.dtype(dtype).str)
+        self._attach(self._shared)
+        self.flora_state[:] = self._flora.state
+        self.on_fire[:] = 0
+        self.elevation_base[:] = self.border_elevation - geology.soil_depth
+        self.soil_depth[:] = geology.soil_depth
+        self.soil_moisture[:] = geology.soil_moisture
+
+        context = multiprocessing.get_context()
+        self._connections = []
+        self._workers = []
+        for stripe, streams in zip(self.stripes, self.random.spawn(len(self.stripes))):
+            parent, child = context.Pipe()
+            process = context.Process(target=_work, daemon=True,
+                                      args=(child, self._layout, (xdim, ydim, flora_system), stripe,
+                                            streams.get_state(), self.parameters))
+            process.start()
+            self._connections.append(parent)
+            self._workers.append(process)
+
+    def _attach(self, shared):
+        for name, block in shared.items():
+            array = np.ndarray((self.xdim, self.ydim), dtype=np.dtype(self._layout[name][1]), buffer=block.buf)
+            if name.startswith('scratch_'):
+                self._scratch[name[len('scratch_'):]] = array
+            else:
+                setattr(self, name, array)
+
+    def __repr__(self):
+        return f'parallel region {self.xdim}x{self.ydim} over {len(self.stripes)} workers'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the workers and free the shared memory. The layers are no longer usable afterwards.
+
+        The shared memory is freed even if a worker has died or does not stop.
+
+        """
+        try:
+            for connection, process in zip(self._connections, self._workers):
+                if process.is_alive():
+                    try:
+                        connection.send(('stop',))
+                    except OSError:
+                        pass
+            for connection, process in zip(self._connections, self._workers):
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                connection.close()
+        finally:
+            self._connections = []
+            self._workers = []
+            for name in LAYERS:
+                setattr(self, name, None)
+            self._scratch = {}
+            for block in self._shared.values():
+                block.close()
+                block.unlink()
+            self._shared = {}
+
+    def save(self, path, tile=1024):
+        """Write the layers to a TiledRegion directory, with the same files and header as TiledRegion.save, so the
+        region outlives its shared memory and can be reopened with TiledRegion.open.
+
+        Args:
+            path (str): Directory for the layer files. It is created if needed.
+            tile (int): Tile edge length the reopened TiledRegion uses.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in LAYERS:
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+        self._write_header(path, tile)
+
+    def tiles(self):
+        return iter(self.stripes)
+
+    def _tile_of(self, cx, cy):
+        return self.stripes[int(np.searchsorted(self._bounds, cx, side='right')) - 1]
+
+    def _broadcast(self, command, stripes=None):
+        """Send command to the workers of stripes (all by default) and wait for all of their replies.
+
+        Raises:
+            WorkerError: If any of the workers failed. Every other worker has replied by then.
+
+        """
+        indexes = range(len(self.stripes)) if stripes is None else stripes
+        replies = {}
+        for index in indexes:
+            try:
+                self._connections[index].send(command)
+            except OSError:
+                replies[index] = _Failure(f"worker {index} is gone")
+        for index in indexes:
+            if index not in replies:
+                try:
+                    replies[index] = self._connections[index].recv()
+                except EOFError:
+                    replies[index] = _Failure(f"worker {index} exited")
+        failures = [f"{command[0]} failed in stripe {index}: {reply.message}" for index, reply in replies.items()
+                    if isinstance(reply, _Failure)]
+        if failures:
+            raise WorkerError('\n'.join(failures))
+        return [replies[index] for index in indexes]
+
+    def set_parameters(self, parameters):
+        TiledRegion.set_parameters(self, parameters)
+        self._broadcast(('parameters', self.parameters))
+
+    def randomize_elevation_base(self, mean=5, sd=1.5):
+        self.elevation_base[:] = self.random.terrain.normal(mean, sd, (self.xdim, self.ydim))
+
+    def pass_time(self, count=1):
+        super(ParallelRegion, self).pass_time(count)
+        self.timings['ticks'] += count
+
+    def _flora_phase(self):
+        start = time.perf_counter()
+        self._broadcast(('flora',))
+        self.timings['flora'] += time.perf_counter() - start
+
+    def spread_fire(self):
+        """Spread fire in rounds of parallel stripe spreads and halo exchanges.
+
+        Returns:
+            int: The number of cells ignited by spreading.
+
+        """
+        start = time.perf_counter()
+        pending = [index for index, has_front in enumerate(self._broadcast(('front',))) if has_front]
+        ignited = 0
+        while pending:
+            self.timings['fire_rounds'] += 1
+            replies = self._broadcast(('spread',), pending)
+            self._broadcast(('commit',), pending)
+            queued = set()
+            for count, halo in replies:
+                count_halo, tiles = self._ignite(halo)
+                ignited += count + count_halo
+                queued.update(int(np.searchsorted(self._bounds, x0, side='right')) - 1 for x0, _ in tiles)
+            pending = sorted(queued)
+        self.timings['fire'] += time.perf_counter() - start
+        return ignited
+
+    def erode_all(self, magnitude=1.0, rate=0.01):
+        start = time.perf_counter()
+        total = sum(self._broadcast(('erode', magnitude, rate, self.border_elevation)))
+        self._broadcast(('deposit',))
+        self.timings['erosion'] += time.perf_counter() - start
+        return total
+
+
+def _work(connection, layout, dims, stripe, random_state, parameters):
+    """Worker loop: attach to the shared layers and run stripe kernels on command. A kernel that raises is reported
+    back as a _Failure, and the loop goes on."""
+    xdim, ydim, flora_system = dims
+    region = ParallelRegion.__new__(ParallelRegion)
+    region._setup(None, xdim, ydim, None, flora_system, None)
+    region._layout = layout
+    region.random.set_state(random_state)
+    shared = {name: shared_memory.SharedMemory(name=block) for name, (block, dtype) in layout.items()}
+    region._attach(shared)
+    TiledRegion.set_parameters(region, parameters)
+    x, y = stripe
+    while True:
+        command = connection.recv()
+        if command[0] == 'stop':
+            break
+        try:
+            reply = _run(region, x, y, command)
+        except Exception:
+            reply = _Failure(traceback.format_exc())
+        connection.send(reply)
+    for name in LAYERS:
+        setattr(region, name, None)
+    region._scratch = {}
+    for block in shared.values():
+        block.close()
+    connection.close()
+
+
+def _run(region, x, y, command):
+    """Run one command of the worker loop on the stripe (x, y) and return the reply."""
+    if command[0] == 'flora':
+        return region._flora_tile(x, y)
+    elif command[0] == 'front':
+        return region._start_front(x, y)
+    elif command[0] == 'spread':
+        return region._spread_tile(x, y, commit=False), region._halo_ignitions
+    elif command[0] == 'commit':
+        return region._commit_fire()
+    elif command[0] == 'erode':
+        region.border_elevation = command[3]
+        return region._erode_tile(x, y, command[1], command[2])
+    elif command[0] == 'deposit':
+        return region._deposit_tile(x, y)
+    elif command[0] == 'parameters':
+        return TiledRegion.set_parameters(region, command[1])
+    raise ValueError(f"Unknown command {command[0]}")
+
+
+def measure_scaling(xdim=1000, ydim=1000, ticks=10, workers=(1, 2, 4), flora_system=1, seed=0):
+    """Time the same run over different worker counts.
+
+    Args:
+        xdim (int):
+        ydim (int):
+        ticks (int):
+        workers (tuple): Worker counts to try. The first is the baseline.
+        flora_system (int):
+        seed (int):
+
+    Returns:
+        list: A dict per worker count with workers, seconds, speedup and efficiency (speedup per worker, relative to
+            the baseline), plus the phase timings.
+
+    """
+    results = []
+    for count in workers:
+        with ParallelRegion(xdim, ydim, workers=count, flora_system=flora_system, seed=seed) as region:
+            start = time.perf_counter()
+            region.pass_time(ticks)
+            seconds = time.perf_counter() - start
+            results.append(dict(region.timings, workers=len(region.stripes), seconds=seconds))
+    base = results[0]
+    for result in results:
+        result['speedup'] = base['seconds'] / result['seconds']
+        result['efficiency'] = result['speedup'] * base['workers'] / result['workers']
+    return results
@@ -5,6 +5,9 @@ The region object should be tasked with all inter locale interactions. These mig
 eroding from ones locale to another. Locales should be able to handle all their actions on their own, but return any
 relevant info that the interation requires.
 
+Fire, erosion, border setup and neighborhood queries walk a beringia.neighbors.NeighborIndex of self.space, built once
+and rebuilt only when the topology changes, rather than asking networkx for neighbors on every call.
+
 .. _Docstring example here:
    https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
 
@@ -20,6 +23,11 @@ import heapq
 from beringia.localebase import Locale
 from beringia.localebase import Border
 from beringia.constants import STATE_CONSTANTS, PLANT_COLOR_KEY, GRAYSCALE_COLOR_KEY
+from beringia.instruments import Instruments
+from beringia.neighbors import NeighborIndex, neighbor_index
+from beringia.rng import RandomStreams
+from beringia.trace import Tracer, IGNITION, SPREAD, EROSION
+from beringia.terrain import field_at
 from math import floor
 
 
@@ -32,9 +40,14 @@ class Region(object):
         ydim (int):
         grid_type (str):
         colorize (bool):
+        seed (int or numpy.random.SeedSequence): Seeds self.random, the region's RandomStreams. Flora, fire, fauna and
+            terrain each draw from their own stream, so a seed repeats a run whatever else uses numpy.random.
 
     """
-    def __init__(self, xdim=10, ydim=10, grid_type='2d', flora_system=1, colorize=True, edges=True, slow_burn=False):
+    def __init__(self, xdim=10, ydim=10, grid_type='2d', flora_system=1, colorize=True, edges=True, slow_burn=False,
+                 seed=None):
+        self.seed = seed
+        self.random = RandomStreams(seed)
         self.xdim = xdim
         self.ydim = ydim
         self.grid_type = grid_type
@@ -47,11 +60,19 @@ class Region(object):
         else:
             # TODO: raise exception? default to 2d?
             self.space = nx.grid_2d_graph(self.xdim, ydim)
+        elevation_base = self.random.terrain.gamma(5, 0.5)
         for node in self.space.nodes:
-            self.space.node[node]['locale'] = Locale(flora_system=flora_system, location=node, region=self)
+            self.space.nodes[node]['locale'] = Locale(flora_system=flora_system, location=node, region=self,
+                                                      elevation_base=elevation_base)
         self.nodes = set([node for node in self.space.nodes])
+        self.border_nodes = set()
+        self._neighbor_index = None
+        self._locales = None
+        self._node_cells = None
         if edges:
             self._add_border_nodes()
+        else:
+            self._build_neighbor_index()
         self.conversion_rates = {0: 0.2, 1: 0.1, 2: 0.15, 3: 0.05, 4: 0.1, 5: 0}
         self.time = 0
         self.colorize = colorize
@@ -59,6 +80,8 @@ class Region(object):
         self.constants = STATE_CONSTANTS
         self.verbose = False
         self.basins_current=False
+        self.instruments = Instruments()
+        self.tracer = Tracer()
 
 
     #def _scheduler(self):
@@ -108,11 +131,38 @@ class Region(object):
             self.space.add_edge((self.xdim, j), (self.xdim - 1, j))
             self.border_nodes.add((self.xdim, j))
         for node in self.border_nodes:
-            self.space.node[node]['locale'] = Border()
-            neighbor=[i for i in nx.neighbors(self.space, node)][0]
-            self.space.node[node]['locale'].geology.elevation_base = self.space.node[neighbor]['locale'].geology.elevation_base
-            self.space.node[node]['locale'].geology.soil_depth = self.space.node[neighbor]['locale'].geology.soil_depth
-            self.space.node[node]['locale'].geology.elevation = self.space.node[neighbor]['locale'].geology.elevation
+            self.space.nodes[node]['locale'] = Border()
+        index = self._build_neighbor_index()
+        for cell in range(index.n_cells, index.n_total):
+            geology = self._locales[cell].geology
+            neighbor = self._locales[index.neighbors(cell)[0]].geology
+            geology.elevation_base = neighbor.elevation_base
+            geology.soil_depth = neighbor.soil_depth
+            geology.elevation = neighbor.elevation
+
+    @property
+    def neighbor_index(self):
+        """beringia.neighbors.NeighborIndex: The adjacency of self.space, with the border nodes flagged."""
+        return self._neighbor_index
+
+    def _build_neighbor_index(self):
+        """Index self.space and line its locales up with the cell ids. Run whenever the topology changes.
+
+        '2d' regions share the cached index of ArrayRegion. Hex and tri regions index their own graph, since the border
+        nodes are added to it.
+
+        Returns:
+            beringia.neighbors.NeighborIndex:
+
+        """
+        if self.grid_type in ('hex', 'tri'):
+            index = NeighborIndex.from_graph(self.space, self.grid_type, self.border_nodes)
+        else:
+            index = neighbor_index(self.xdim, self.ydim, '2d', bool(self.border_nodes))
+        self._locales = [self.space.nodes[index.location(cell)]['locale'] for cell in range(index.n_total)]
+        self._node_cells = [index.cell(node) for node in self.nodes]
+        self._neighbor_index = index
+        return index
 
 
     def show_map(self, do_print=True, show_fire=True, colorize=True):
@@ -252,7 +302,7 @@ class Region(object):
         plt.show()
 
     def pass_time(self, count=1, show_heat_map=False):
-        """Move forward one time(or count # of) step(s).
+        """Move forward one time(or count # of) step(s). Each phase is timed by self.instruments when it is enabled.
 
         Args:
             count (int):
@@ -261,27 +311,34 @@ class Region(object):
         if not show_heat_map or count > 50:
             if show_heat_map: print("Count too high. Display hidden")
             for _ in range(count):
-                self.time += 1
-                for node in self.nodes:
-                    self.space.node[node]['locale'].pass_time()
-                self.spread_fire(show=False)
-                self.erode_all(magnitude=0.1)
+                self._tick()
         if show_heat_map:
             array = self.get_map_array("flora")
             plt.imshow(array, cmap="YlGn")
             plt.colorbar()
             for _ in range(count):
-                self.time += 1
-                for node in self.nodes:
-                    self.space.node[node]['locale'].pass_time()
-                self.spread_fire(show=False)
-                self.erode_all(magnitude=0.1)
+                self._tick()
 
                 array = self.get_map_array("flora")
                 plt.imshow(array, cmap="YlGn")
                 plt.draw()
                 plt.pause(0.1)
 
+    def _tick(self):
+        instruments = self.instruments
+        self.time += 1
+        self.tracer.tick = self.time
+        instruments.timed('locales', len(self.nodes), self._locales_phase)
+        instruments.timed('fire', len(self.nodes), self.spread_fire, show=False)
+        transport = instruments.timed('erosion', len(self.nodes), self.erode_all, magnitude=0.1)
+        instruments.count('erosion_transport', transport)
+        instruments.end_tick(self)
+
+    def _locales_phase(self):
+        """Locale.pass_time, flora plus fauna, in every cell."""
+        for node in self.nodes:
+            self.space.nodes[node]['locale'].pass_time()
+
     def show_turns(self, count=1, pause=0.25):
         for _ in range(count):
             self.pass_time()
@@ -291,32 +348,40 @@ class Region(object):
     def spread_fire(self, verbose=False, pause=0.15, show=True):
         """Scan locales for fire, and if present, cause fire to spread to neighboring regions.
 
+        The locales burning at the start are recorded as ignition events, and the ones fire spreads to as spread
+        events, by self.tracer.
+
         Todo:
             * add locales_to_burn
 
         Args:
-            slow_burn (bool):
+            verbose (bool): Unused, enable self.tracer instead.
+            pause (float):
+            show (bool):
 
         """
-        locales_on_fire = []
-        fires_present: bool = False
-        for node in self.nodes:
-            if self.space.node[node]['locale'].on_fire == 1:
-                locales_on_fire.append(node)
-        if verbose: print("Locales initially on fire:", locales_on_fire)
-        if locales_on_fire:
-            fires_present = True
-            if verbose: print("Fire is present.")
-        for locale_ in locales_on_fire:
-            neighboring_nodes = self.space.neighbors(locale_)
-            if verbose: print("Fire is burning at:", node)
-
-            for node in neighboring_nodes:
-                if self.space.node[node]['locale'].flora.on_fire == 0:
-                    if self.space.node[node]['locale'].catch_fire():
-                        locales_on_fire.append(node)
-
-                        if verbose: print("Fire has spread to:", node)
+        index = self.neighbor_index
+        locales = self._locales
+        locales_on_fire = [cell for cell in self._node_cells if locales[cell].on_fire == 1]
+        fires_present = bool(locales_on_fire)
+        tracer = self.tracer
+        if tracer.enabled:
+            tracer.record(IGNITION, [self._trace_cell(index.location(cell)) for cell in locales_on_fire],
+                          [locales[cell].flora.state for cell in locales_on_fire])
+        attempts = 0
+        initially_on_fire = len(locales_on_fire)
+        # The wave each burning locale was reached by, 0 for those burning at the start.
+        waves = [0] * initially_on_fire
+        for position, cell in enumerate(locales_on_fire):
+            for neighbor in index.neighbors(cell).tolist():
+                if locales[neighbor].flora.on_fire == 0:
+                    attempts += 1
+                    if locales[neighbor].catch_fire():
+                        locales_on_fire.append(neighbor)
+                        waves.append(waves[position] + 1)
+
+                        if tracer.enabled:
+                            tracer.record(SPREAD, [self._trace_cell(index.location(neighbor))], waves[-1])
 
                         if self.slow_burn and show:
                             self.show_map()
@@ -324,6 +389,14 @@ class Region(object):
         if fires_present and not self.slow_burn and show:
             self.show_map()
             time.sleep(pause*2)
+        self.instruments.count('fire_attempts', attempts)
+        self.instruments.count('fire_ignitions', len(locales_on_fire) - initially_on_fire)
+
+    def _trace_cell(self, node):
+        """The cell id of a node in trace events, x * ydim + y as in ArrayRegion, or -1 for other nodes."""
+        if isinstance(node, tuple) and len(node) == 2 and all(isinstance(value, int) for value in node):
+            return node[0] * self.ydim + node[1]
+        return -1
 
     def insert_new_fauna(self, new_fauna=None, target=None, all_locales=True, target_locale=None, simple_food_chain=True):
         """insert_new_fauna docs
@@ -342,17 +415,17 @@ class Region(object):
         if all_locales:
             for node in self.nodes:
                 if simple_food_chain:
-                    self.space.node[node]['locale'].insert_fauna(new_fauna)
-                    self.space.node[node]['locale'].fauna_set_simple_food_chain()
+                    self.space.nodes[node]['locale'].insert_fauna(new_fauna)
+                    self.space.nodes[node]['locale'].fauna_set_simple_food_chain()
                 else:
-                    self.space.node[node]['locale'].insert_fauna(new_fauna, target)
+                    self.space.nodes[node]['locale'].insert_fauna(new_fauna, target)
             return True
         elif target_locale:
             if simple_food_chain:
-                self.space.node[target_locale]['locale'].insert_fauna(new_fauna)
-                self.space.node[target_locale]['locale'].fauna_set_simple_food_chain()
+                self.space.nodes[target_locale]['locale'].insert_fauna(new_fauna)
+                self.space.nodes[target_locale]['locale'].fauna_set_simple_food_chain()
             else:
-                self.space.node[target_locale]['locale'].insert_fauna(new_fauna, target)
+                self.space.nodes[target_locale]['locale'].insert_fauna(new_fauna, target)
             return True
         else:
             print("No target locale specified")
@@ -372,12 +445,12 @@ class Region(object):
 
         """
         if fire_state:
-            return self.space.node[(x, y)]['locale'].on_fire
+            return self.space.nodes[(x, y)]['locale'].on_fire
         else:
             if colorize:
-                return PLANT_COLOR_KEY[int(floor(self.space.node[(x, y)]['locale'].state))]
+                return PLANT_COLOR_KEY[int(floor(self.space.nodes[(x, y)]['locale'].state))]
             else:
-                return int(floor(self.space.node[(x, y)]['locale'].state))
+                return int(floor(self.space.nodes[(x, y)]['locale'].state))
 
     def view_elevation(self, x=0, y=0, colorize=False):
         """view_elevation docs
@@ -392,9 +465,9 @@ class Region(object):
 
         """
         if colorize:
-            return GRAYSCALE_COLOR_KEY[int(self.space.node[(x, y)]['locale'].geology.elevation//1)]
+            return GRAYSCALE_COLOR_KEY[int(self.space.nodes[(x, y)]['locale'].geology.elevation//1)]
         else:
-            return self.space.node[(x, y)]['locale'].geology.elevation
+            return self.space.nodes[(x, y)]['locale'].geology.elevation
 
     def view_fauna_pop(self, x=0, y=0, index=0, colorize=False, scale_factor=1.0, ceiling=100.0):
         """view_elevation docs
@@ -409,11 +482,11 @@ class Region(object):
             int: May have ascii colorization.
 
         """
-        if self.space.node[(x, y)]['locale'].fauna:
+        if self.space.nodes[(x, y)]['locale'].fauna:
             if colorize:
-                return GRAYSCALE_COLOR_KEY[min(ceiling, (int(self.space.node[(x, y)]['locale'].fauna[index].population * scale_factor //1)))]
+                return GRAYSCALE_COLOR_KEY[min(ceiling, (int(self.space.nodes[(x, y)]['locale'].fauna[index].population * scale_factor //1)))]
             else:
-                return int(self.space.node[(x, y)]['locale'].fauna[index].population * scale_factor //1)
+                return int(self.space.nodes[(x, y)]['locale'].fauna[index].population * scale_factor //1)
 
     def erode_one(self, node, magnitude=1.0, rate=0.01):
         """This will cause erosion to occur at one location.
@@ -424,21 +497,26 @@ class Region(object):
             rate (float):
 
         """
-        neighboring_nodes = self.space.neighbors(node)
-        lowest_neighbor = node
-        for eachNode in neighboring_nodes:
-            if self.space.node[lowest_neighbor]['locale'].geology.elevation > self.space.node[eachNode]['locale'].geology.elevation:
-                lowest_neighbor = eachNode
-
-        if lowest_neighbor != node:
-            slope = (self.space.node[node]['locale'].geology.elevation
-                     - self.space.node[lowest_neighbor]['locale'].geology.elevation)
+        return self._erode_cell(self.neighbor_index.cell(node), magnitude, rate)
+
+    def _erode_cell(self, cell, magnitude, rate):
+        """erode_one by cell id of self.neighbor_index."""
+        locales = self._locales
+        geology = lowest = locales[cell].geology
+        for neighbor in self.neighbor_index.neighbors(cell).tolist():
+            neighbor = locales[neighbor].geology
+            if lowest.elevation > neighbor.elevation:
+                lowest = neighbor
+
+        if lowest is not geology:
+            slope = geology.elevation - lowest.elevation
         else:
             slope = 0.01
-        transport = self.space.node[node]['locale'].geology.erode(magnitude, rate, slope)
-        self.space.node[lowest_neighbor]['locale'].geology.accrete(transport)
+        transport = geology.erode(magnitude, rate, slope)
+        lowest.accrete(transport)
 
         self.basins_current=False
+        return transport
 
     def erode_all(self, magnitude=1.0, rate=0.01):
         """erode_all docs
@@ -447,9 +525,15 @@ class Region(object):
             magnitude (float):
             rate (float):
 
+        Returns:
+            float: The total soil transported.
+
         """
-        for node in self.nodes:
-            self.erode_one(node, magnitude, rate)
+        if not self.tracer.enabled:
+            return sum(self._erode_cell(cell, magnitude, rate) for cell in self._node_cells)
+        transport = [self._erode_cell(cell, magnitude, rate) for cell in self._node_cells]
+        self.tracer.record(EROSION, [self._trace_cell(node) for node in self.nodes], transport)
+        return sum(transport)
 
     def calculate_aspect(self):
         if self.grid_type == '2d':
@@ -477,7 +561,7 @@ class Region(object):
                         west = self.view_elevation(x+1, y, colorize=False)
 
                     print(north, south, east, west)
-                    self.space.node[(x, y)]['locale'].geology._calculate_aspect(north, south, east, west)
+                    self.space.nodes[(x, y)]['locale'].geology._calculate_aspect(north, south, east, west)
 
     def randomize_elevation_base(self, mean=5, sd=1.5):
         """randomize_elevation_base docs
@@ -488,22 +572,37 @@ class Region(object):
 
         """
         for node in self.nodes:
-            self.space.node[node]['locale'].geology.elevation_base = np.random.normal(mean, sd)
-            self.space.node[node]['locale'].geology.recalculate_values()
+            self.space.nodes[node]['locale'].geology.elevation_base = self.random.terrain.normal(mean, sd)
+            self.space.nodes[node]['locale'].geology.recalculate_values()
 
     def randomize_elevation_base_cov(self, mean=5, cov=0.4):
         """randomize_elevation_base_cov docs
 
+        Neighboring locales are correlated. This is randomize_terrain with a correlation length of one locale.
+
         Args:
             mean (int):
-            cov (float):
+            cov (float): The variance of the elevations.
+
+        """
+        self.randomize_terrain(mean, np.sqrt(cov), correlation_length=1.0)
+
+    def randomize_terrain(self, mean=5, sd=1.5, correlation_length=8.0, hurst=0.8):
+        """Draw a spatially correlated elevation_base for every locale by spectral synthesis, see
+        terrain.spectral_field.
+
+        Args:
+            mean (float):
+            sd (float):
+            correlation_length (float): In locales.
+            hurst (float): Hurst exponent. Lower is rougher.
 
         """
-        adj_mat = nx.adjacency_matrix(self.space).todense()
-        means = [mean for _ in range(self.xdim * self.ydim)]
-        elevations = np.random.multivariate_normal(means, (adj_mat*cov))
-        for node in enumerate(self.nodes):
-            self.space.node[node[1]]['locale'].geology.elevation_base = elevations[node[0]]
+        nodes = list(self.nodes)
+        elevations = field_at(nodes, correlation_length, hurst, self.random.terrain)
+        for node, elevation in zip(nodes, elevations):
+            self.space.nodes[node]['locale'].geology.elevation_base = mean + sd * elevation
+            self.space.nodes[node]['locale'].geology.recalculate_values()
 
     def find_basins(self):
         """Find all the basins in the region and update the locales with the elevation of the point of outflow for the
@@ -573,46 +672,37 @@ class Region(object):
             print("Value out of range.")
             return Nor.gne
         else:
-            return self.space.node[(x,y)]['locale']
+            return self.space.nodes[(x,y)]['locale']
 
     def get_neighbors(self, x=0, y=0, depth=1, tiered=False, ids=False, borders=False):
-        if x > self.xdim or y > self.ydim or x < 0 or y < 0:
+        """Breadth first neighborhood of a location, out to depth steps, from self.neighbor_index.
+
+        Args:
+            x (int):
+            y (int):
+            depth (int):
+            tiered (bool): Return a list per step rather than one flat list.
+            ids (bool): Return locations rather than Locales.
+            borders (bool): Include border nodes.
+
+        Returns:
+            list:
+
+        """
+        index = self.neighbor_index
+        cell = index.cell((x, y))
+        if x > self.xdim or y > self.ydim or x < 0 or y < 0 or cell is None:
             if self.verbose:
                 print("Value out of range.")
             return None
-        else:
-            explored = set()
-            neighbors = []
-            new_queue = [self.get_locale(x,y).location]
-            for _ in range(depth):
-                queue = new_queue
-                new_queue = []
-                if tiered:
-                    tier = []
-                for node in queue:
-                    if (node[0] < 0 or node[0] > self.xdim or node[1] < 0 or node[1] > self.ydim) and borders is False:
-                        pass
-                    else:
-                        if node not in explored:
-                            neighbs = self.space.neighbors(node)
-                            neighbs = [n for n in neighbs if n not in explored]     # removing duplicates.
-                            if not borders:
-                                neighbs = [n for n in neighbs if
-                                           not (n[0] < 0 or n[0] > self.xdim or n[1] < 0 or n[1] > self.ydim)]
-                            if ids:
-                                if tiered:
-                                    tier.extend(neighbs)
-                                else:
-                                    neighbors.extend(neighbs)
-                            else:
-                                if tiered:
-                                    tier.extend([self.get_locale(*locale) for locale in neighbs])
-                                else:
-                                    neighbors.extend([self.get_locale(*locale) for locale in neighbs])
-                            new_queue.extend(neighbs)
-                    explored.add(node)
-                if tiered:
-                    neighbors.append(tier)
-
+        neighbors = []
+        for tier in index.neighborhood(cell, depth, borders):
+            if ids:
+                tier = [index.location(cell) for cell in tier]
+            else:
+                tier = [self._locales[cell] for cell in tier]
+            if tiered:
+                neighbors.append(tier)
+            else:
+                neighbors.extend(tier)
         return neighbors
-
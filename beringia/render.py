@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""render.py
+
+Terminal rendering for '2d' ArrayRegions. Every cell is turned into a glyph code with array arithmetic and looked up in
+a glyph table, and a frame is written with a single join and write. TerminalRenderer remembers the last frame it drew
+and afterwards only sends cursor-positioning escapes for the cells whose glyph changed.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import sys
+import time
+
+import numpy as np
+
+from beringia.constants import PLANT_COLOR_KEY
+
+
+FIRE_GLYPH = "\033[1;31mf\033[0;37m"
+STATES = range(-1, 10)
+FIRE_CODE = len(STATES)
+COLOR_GLYPHS = np.array([PLANT_COLOR_KEY[state] for state in STATES] + [FIRE_GLYPH], dtype=object)
+PLAIN_GLYPHS = np.array([str(state) for state in STATES] + ['f'], dtype=object)
+
+
+def glyph_codes(region, show_fire=True):
+    """A (ydim, xdim) array of glyph codes: flora state + 1, or FIRE_CODE for burning cells.
+
+    Args:
+        region (beringia.arrayregion.ArrayRegion):
+        show_fire (bool):
+
+    Returns:
+        numpy.ndarray:
+
+    """
+    codes = np.clip(np.floor(region.flora_state).astype(np.int64), -1, 9) + 1
+    if show_fire:
+        codes[region.on_fire == 1] = FIRE_CODE
+    return codes.reshape(region.xdim, region.ydim).T
+
+
+def frame_string(codes, glyphs=COLOR_GLYPHS):
+    """The whole frame as one string, one line per row.
+
+    Args:
+        codes (numpy.ndarray): (rows, columns) glyph codes.
+        glyphs (numpy.ndarray): glyph table.
+
+    Returns:
+        str:
+
+    """
+    cells = glyphs[codes]
+    return ''.join(''.join(row) + '\n' for row in cells)
+
+
+class TerminalRenderer(object):
+    """TerminalRenderer class docs
+
+    Draws successive frames of a region in place. The first frame clears the screen and is drawn in full; later frames
+    only redraw changed cells.
+
+    Args:
+        stream (file): Where to write. Defaults to sys.stdout.
+        colorize (bool):
+        max_fps (float): Frames asked for sooner than 1/max_fps after the last one are dropped. None for no cap.
+
+    """
+    def __init__(self, stream=None, colorize=True, max_fps=None):
+        self.stream = sys.stdout if stream is None else stream
+        self.glyphs = COLOR_GLYPHS if colorize else PLAIN_GLYPHS
+        self.max_fps = max_fps
+        self.last_codes = None
+        self.last_time = None
+        self.frames = 0
+        self.dropped = 0
+
+    def reset(self):
+        """Forget the last frame, so the next one is drawn in full."""
+        self.last_codes = None
+
+    def render(self, region, show_fire=True, force=False):
+        """Draw the current state of region.
+
+        Args:
+            region (beringia.arrayregion.ArrayRegion):
+            show_fire (bool):
+            force (bool): Draw even if the frame rate cap would drop this frame.
+
+        Returns:
+            bool: False if the frame was dropped.
+
+        """
+        now = time.perf_counter()
+        if not force and self.max_fps and self.last_time is not None and now - self.last_time < 1.0 / self.max_fps:
+            self.dropped += 1
+            return False
+        codes = glyph_codes(region, show_fire)
+        if self.last_codes is None or self.last_codes.shape != codes.shape:
+            out = "\033[2J\033[H" + frame_string(codes, self.glyphs)
+        else:
+            rows, columns = np.nonzero(codes != self.last_codes)
+            glyphs = self.glyphs[codes[rows, columns]]
+            out = ''.join(f"\033[{row + 1};{column + 1}H{glyph}"
+                          for row, column, glyph in zip(rows.tolist(), columns.tolist(), glyphs))
+            out += f"\033[{codes.shape[0] + 1};1H"
+        self._write(out)
+        self.last_codes = codes
+        self.last_time = now
+        self.frames += 1
+        return True
+
+    def _write(self, out):
+        buffer = getattr(self.stream, 'buffer', None)
+        if buffer is not None:
+            self.stream.flush()
+            buffer.write(out.encode())
+            buffer.flush()
+        else:
+            self.stream.write(out)
+            self.stream.flush()
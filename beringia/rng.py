@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""rng.py
+
+Seeded random streams. A region owns one RandomStreams, which splits a single seed into independent numpy Generators,
+one per subsystem, so that adding draws to one subsystem does not shift the random numbers of another, and so that
+parallel workers can be handed streams that never overlap.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import numpy as np
+
+
+SUBSYSTEMS = ('flora', 'fire', 'fauna', 'weather', 'terrain')
+
+
+class RandomStreams(object):
+    """RandomStreams class docs
+
+    Each subsystem in SUBSYSTEMS is an attribute holding its own numpy.random.Generator.
+
+    Args:
+        seed (int or numpy.random.SeedSequence): None draws fresh entropy from the OS.
+
+    """
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.seed = self.seed_sequence.entropy
+        for name, child in zip(SUBSYSTEMS, self.seed_sequence.spawn(len(SUBSYSTEMS))):
+            setattr(self, name, np.random.Generator(np.random.PCG64(child)))
+
+    def __repr__(self):
+        return f'RandomStreams seed={self.seed}'
+
+    def spawn(self, n):
+        """Independent child streams, eg one per parallel worker.
+
+        Args:
+            n (int):
+
+        Returns:
+            list: n RandomStreams.
+
+        """
+        return [RandomStreams(child) for child in self.seed_sequence.spawn(n)]
+
+    def get_state(self):
+        """The bit generator state of every stream, as plain (JSON friendly) dicts."""
+        return {name: getattr(self, name).bit_generator.state for name in SUBSYSTEMS}
+
+    def set_state(self, state):
+        """Restore states saved by get_state.
+
+        Args:
+            state (dict):
+
+        """
+        for name in SUBSYSTEMS:
+            getattr(self, name).bit_generator.state = state[name]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""runner.py
+
+Headless batch runs. run() builds an ArrayRegion, advances it with no rendering or sleeping, records a few per tick
+metrics and optional layer snapshots, writes them to an .npz file and returns a timing summary. It is what
+`python -m beringia run ...` calls.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import time
+
+import numpy as np
+
+from beringia.arrayregion import ArrayRegion
+from beringia.metrics import MetricsRecorder
+
+
+def run(xdim=100, ydim=100, ticks=100, flora_system=1, grid_type='2d', seed=None, out=None, snapshot_every=0,
+        fauna_depth=1, randomize_elevation=False, metrics=None, trace=None):
+    """Run one region for a number of ticks without any display.
+
+    Args:
+        xdim (int):
+        ydim (int):
+        ticks (int):
+        flora_system (int):
+        grid_type (str):
+        seed (int): Seed for the region's random streams, for reproducible runs.
+        out (str): Path of the .npz file to write. Nothing is written if None.
+        snapshot_every (int): Store the flora, fire and elevation layers every this many ticks. 0 for none.
+        fauna_depth (int):
+        randomize_elevation (bool): Draw a random elevation_base before the run.
+        metrics (str): Path of a CSV file to stream beringia.metrics aggregates to, every tick.
+        trace (str): Path of a binary beringia.trace file to record every event to.
+
+    Returns:
+        dict: A timing summary.
+
+    """
+    start = time.perf_counter()
+    region = ArrayRegion(xdim, ydim, grid_type=grid_type, flora_system=flora_system, fauna_depth=fauna_depth,
+                         seed=seed)
+    if randomize_elevation:
+        region.randomize_elevation_base()
+    recorder = None
+    if metrics:
+        recorder = MetricsRecorder(metrics)
+        region.add_tick_hook(recorder)
+    if trace:
+        region.tracer.enable(path=trace)
+    build_seconds = time.perf_counter() - start
+
+    cells_on_fire = np.zeros(ticks, dtype=np.int64)
+    mean_flora_state = np.zeros(ticks)
+    soil_depth_total = np.zeros(ticks)
+    snapshots = {'flora': [], 'fire': [], 'elevation': [], 'ticks': []}
+    start = time.perf_counter()
+    for tick in range(ticks):
+        region.pass_time()
+        cells_on_fire[tick] = np.count_nonzero(region.on_fire)
+        mean_flora_state[tick] = region.flora_state.mean()
+        soil_depth_total[tick] = region.soil_depth[:region.n_cells].sum()
+        if snapshot_every and (tick + 1) % snapshot_every == 0:
+            snapshots['flora'].append(region.flora_state.copy())
+            snapshots['fire'].append(region.on_fire.copy())
+            snapshots['elevation'].append(region.elevation[:region.n_cells])
+            snapshots['ticks'].append(region.time)
+    run_seconds = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+    region.tracer.close()
+
+    summary = {
+        'status': 'ok',
+        'xdim': xdim,
+        'ydim': ydim,
+        'grid_type': grid_type,
+        'cells': region.n_cells,
+        'flora_system': flora_system,
+        'seed': seed,
+        'ticks': ticks,
+        'build_seconds': build_seconds,
+        'run_seconds': run_seconds,
+        'seconds_per_tick': run_seconds / ticks if ticks else 0.0,
+        'cells_per_second': region.n_cells * ticks / run_seconds if run_seconds else 0.0,
+        'out': out,
+        'metrics': metrics,
+        'trace': trace
+    }
+    if out:
+        layers = {'snapshot_' + key: np.array(value) for key, value in snapshots.items() if value}
+        np.savez_compressed(
+            out, cells_on_fire=cells_on_fire, mean_flora_state=mean_flora_state, soil_depth_total=soil_depth_total,
+            flora_state=region.flora_state, on_fire=region.on_fire, elevation=region.elevation[:region.n_cells],
+            **layers
+        )
+    return summary
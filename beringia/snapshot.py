@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""snapshot.py
+
+Save and restore ArrayRegions. A snapshot is a directory holding one raw .npy file per layer plus a small JSON header
+with the format version, the region parameters and overrides, the fauna species, the time and the random stream state.
+Because the layers are plain .npy files they can be memory mapped, so opening even a very large landscape costs almost
+nothing until the cells are touched.
+
+    region.save('run/tick_1000')
+    region = ArrayRegion.load('run/tick_1000', mmap_mode='c')
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import json
+import os
+
+import numpy as np
+
+from beringia.fauna import BulkFauna, BulkFaunaD
+
+
+FORMAT = 'beringia-snapshot'
+VERSION = 1
+HEADER = 'header.json'
+LAYERS = ('flora_state', 'on_fire', 'elevation_base', 'soil_depth', 'soil_moisture', 'is_in_basin', 'basin_elevation',
+          'basin_label', 'fauna_population', 'fauna_stress')
+FAUNA_PARAMETERS = ('name', 'population', 'reproduction_rate', 'starvation_rate', 'feeding_rate', 'emigration_rate',
+                    'ambient_death_rate', 'cryptocity', 'stress_responses')
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, of another format, or of an unknown version."""
+
+
+def save(region, path):
+    """Write region to the directory path, creating it if needed.
+
+    Args:
+        region (beringia.arrayregion.ArrayRegion):
+        path (str):
+
+    """
+    os.makedirs(path, exist_ok=True)
+    header = {
+        'format': FORMAT,
+        'version': VERSION,
+        'xdim': region.xdim,
+        'ydim': region.ydim,
+        'grid_type': region.grid_type,
+        'edges': region.edges,
+        'flora_system': region.flora_system,
+        'colorize': region.colorize,
+        'slow_burn': region.slow_burn,
+        'n_cells': region.n_cells,
+        'n_border': region.n_border,
+        'time': region.time,
+        'basins_current': region.basins_current,
+        'fauna': [dict({key: getattr(taxa, key) for key in FAUNA_PARAMETERS}, discrete=isinstance(taxa, BulkFaunaD),
+                       diet=_diet(region, taxa)) for taxa in region.fauna],
+        'random_state': region.random.get_state(),
+        'parameters': region.parameters,
+        'layers': {}
+    }
+    for name in LAYERS:
+        array = np.ascontiguousarray(getattr(region, name))
+        np.save(os.path.join(path, name + '.npy'), array)
+        header['layers'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+    with open(os.path.join(path, HEADER), 'w') as f:
+        json.dump(header, f, indent=1)
+
+
+def _diet(region, taxa):
+    """A species' diet as [row, feeding_rate] pairs, with None for the flora, or None for a simple food chain."""
+    if getattr(taxa, 'diet', None) is None:
+        return None
+    rows = {id(other): s for s, other in enumerate(region.fauna)}
+    return [[rows.get(id(prey)), rate] for prey, rate in taxa.diet if prey is region._flora or id(prey) in rows]
+
+
+def read_header(path):
+    """The JSON header of a snapshot, checked for format and version.
+
+    Args:
+        path (str):
+
+    Returns:
+        dict:
+
+    """
+    try:
+        with open(os.path.join(path, HEADER)) as f:
+            header = json.load(f)
+    except FileNotFoundError:
+        raise SnapshotError(f"No snapshot header in {path}")
+    if header.get('format') != FORMAT:
+        raise SnapshotError(f"{path} is not a {FORMAT}")
+    if header.get('version', 0) > VERSION:
+        raise SnapshotError(f"Snapshot version {header.get('version')} is newer than this reader ({VERSION})")
+    return header
+
+
+def load(path, mmap_mode=None, cls=None):
+    """Read a snapshot written by save.
+
+    Args:
+        path (str):
+        mmap_mode (str): None reads the layers into memory. 'r' maps them read only, 'c' copy on write (changes stay
+            in memory) and 'r+' writes changes back to the snapshot.
+        cls (type): The region class to build, ArrayRegion by default.
+
+    Returns:
+        beringia.arrayregion.ArrayRegion:
+
+    """
+    if cls is None:
+        from beringia.arrayregion import ArrayRegion as cls
+    header = read_header(path)
+    region = cls.__new__(cls)
+    region._setup(header['xdim'], header['ydim'], header['grid_type'], header['flora_system'], header['colorize'],
+                  header['edges'], header['slow_burn'], None)
+    region.n_cells = header['n_cells']
+    region.n_border = header['n_border']
+    region.n_total = region.n_cells + region.n_border
+    for name in LAYERS:
+        if name == 'basin_label' and name not in header['layers']:
+            # Written before basins were labeled.
+            region.basin_label = np.zeros(region.n_cells, dtype=np.int64)
+            continue
+        array = np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+        expected = header['layers'][name]
+        if list(array.shape) != expected['shape'] or array.dtype.str != expected['dtype']:
+            raise SnapshotError(f"Layer {name} does not match the header")
+        setattr(region, name, array)
+    diets = []
+    for parameters in header['fauna']:
+        parameters = dict(parameters)
+        taxa = BulkFaunaD() if parameters.pop('discrete', False) else BulkFauna()
+        diets.append(parameters.pop('diet', None))
+        for key, value in parameters.items():
+            setattr(taxa, key, value)
+        taxa.prey = region.fauna[-1] if region.fauna else region._flora
+        region.fauna.append(taxa)
+    for taxa, diet in zip(region.fauna, diets):
+        if diet is not None:
+            taxa.diet = [(region._flora if row is None else region.fauna[row], rate) for row, rate in diet]
+            taxa.prey = taxa.diet[0][0] if taxa.diet else region._flora
+    region.set_parameters(header.get('parameters', {}))
+    region.time = header['time']
+    region.basins_current = header['basins_current']
+    region._next_basin_label = int(region.basin_label.max(initial=0)) + 1
+    region.random.set_state(header['random_state'])
+    return region
@@ -37,6 +37,10 @@ class Geology(Feature):
         soil_moisture (float):
 
     """
+    __slots__ = ('elevation_base', 'soil_depth', 'elevation', 'soil_stability', 'basin_elevation', 'is_in_basin',
+                 'is_local_minimum', 'aspect', '_hydrology', '_initial_moisture', '_initial_depth')
+    FLAT = (0.0, 0.0)
+
     def __init__(
         self, elevation_base=np.random.gamma(5, 0.5), soil_depth=np.random.lognormal(0.25, 0), soil_moisture=0.5
     ):
@@ -44,24 +48,44 @@ class Geology(Feature):
         self.soil_depth = soil_depth
         self.elevation = self._elevation()
         #self.water_content = self.soil_depth * self.soil_moisture
-        self.hydrology = Hydrology(water_content= soil_moisture*soil_depth, water_capacity=soil_depth)
-        self.soil_moisture = self.hydrology.water_content/self.hydrology.water_capacity
+        self._hydrology = None      # Built from these on first use, see hydrology.
+        self._initial_moisture = soil_moisture
+        self._initial_depth = soil_depth
         self.soil_stability = 0.0
         self.basin_elevation = self.elevation   #If a locale is part of a basin, this value is equal to the height of the lowest point constraining the basin(ie, where water would flow out if you filled up the basin.).
         self.is_in_basin = False
         self.is_local_minimum = False
-        self.aspect = self._calculate_aspect()
+        self.aspect = self.FLAT     # What _calculate_aspect gives without neighbors, shared until it is recalculated.
 
     def recalculate_values(self):
         """recalculate_values docs
 
         """
         self.elevation = self.elevation_base+self.soil_depth
-        self.soil_moisture = self.hydrology.water_content/self.hydrology.water_capacity
 
     def _elevation(self):
         return self.elevation_base+self.soil_depth
 
+    @property
+    def hydrology(self):
+        """Hydrology: Built on first use, from the soil_depth and soil_moisture the geology started with."""
+        if self._hydrology is None:
+            self._hydrology = Hydrology(
+                water_content=self._initial_moisture*self._initial_depth, water_capacity=self._initial_depth
+            )
+        return self._hydrology
+
+    @hydrology.setter
+    def hydrology(self, hydrology):
+        self._hydrology = hydrology
+
+    @property
+    def soil_moisture(self):
+        """float: The water content over the water capacity of the hydrology."""
+        if self._hydrology is None:
+            return self._initial_moisture*self._initial_depth/self._initial_depth
+        return self._hydrology.water_content/self._hydrology.water_capacity
+
     def set_basin_elevation(self, elevation = None):
         if not elevation: elevation = self.elevation
         self.basin_elevation = elevation
@@ -151,6 +175,8 @@ class Hydrology(object):
         water_content (float):
         water_capacity (float):
     """
+    __slots__ = ('water_content', 'water_capacity', 'water_depth', 'water_elevation', 'max_water_depth')
+
     def __init__(
             self, water_content=0.5, water_capacity=1.0
     ):
@@ -191,6 +217,8 @@ class BorderGeology(Geology):
         soil_moisture (float):
 
     """
+    __slots__ = ()
+
     def __init__(self):
         super(BorderGeology, self).__init__()
 
@@ -199,7 +227,6 @@ class BorderGeology(Geology):
 
         """
         self.elevation = self.elevation_base+self.soil_depth
-        self.soil_moisture = self.hydrology.water_content/self.hydrology.water_capacity
 
     def _elevation(self):
         return self.elevation_base+self.soil_depth
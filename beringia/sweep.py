@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""sweep.py
+
+Parameter sweeps. Each point of a sweep is a dict of ArrayRegion.set_parameters overrides, so flora state constants,
+the FloraSystem2-4 rates, BulkFauna rates and the erosion magnitude and rate can all be varied without editing code.
+Points come from a full grid or a Latin hypercube and run in parallel. Finished points are cached as small JSON files
+named by a hash of their configuration, parameters and seed, so a repeated or extended sweep only runs the new points.
+The result is one tidy table with a row per point.
+
+    points = latin_hypercube({'state_constants.3.fireSpreadProb': (0.1, 0.6), 'erosion.rate': (0.005, 0.05)}, 64)
+    table = sweep({'xdim': 100, 'ydim': 100, 'ticks': 200}, points, replicates=4, cache='sweep_cache', out='sweep.csv')
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+from beringia.ensemble import DEFAULT_CONFIG, SERIES, run_replicate, summarize, map_jobs
+
+
+def grid(spec):
+    """Every combination of the listed values.
+
+    Args:
+        spec (dict): {parameter name: list of values}
+
+    Returns:
+        list: One {parameter name: value} dict per point.
+
+    """
+    names = list(spec)
+    return [dict(zip(names, values)) for values in itertools.product(*(spec[name] for name in names))]
+
+
+def latin_hypercube(spec, n, seed=None):
+    """n points spread over the given ranges so that every parameter hits each of n equal strata exactly once.
+
+    Args:
+        spec (dict): {parameter name: (low, high)}
+        n (int):
+        seed (int):
+
+    Returns:
+        list: One {parameter name: value} dict per point.
+
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in spec.items():
+        columns[name] = low + (rng.permutation(n) + rng.uniform(0, 1, n)) / n * (high - low)
+    return [{name: float(values[i]) for name, values in columns.items()} for i in range(n)]
+
+
+def point_key(config, parameters, seed=None, replicates=1):
+    """The cache key of one point: a hash of everything its result depends on, the series it measures included."""
+    text = json.dumps({'config': dict(DEFAULT_CONFIG, **config), 'parameters': parameters, 'seed': seed,
+                       'replicates': replicates, 'series': SERIES}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def run_point(config, parameters, seed=None, replicates=1):
+    """Run the replicates of one point and reduce them to scalar metrics.
+
+    Every point uses the same replicate seeds, so differences between points come from the parameters rather than from
+    the draws.
+
+    Args:
+        config (dict): Keys of beringia.ensemble.DEFAULT_CONFIG.
+        parameters (dict): Overrides for ArrayRegion.set_parameters.
+        seed (int):
+        replicates (int):
+
+    Returns:
+        dict: <series>_mean (averaged over ticks and replicates) and <series>_final (the last tick, averaged over
+            replicates) for every series of beringia.ensemble.SERIES.
+
+    """
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    means = summarize([run_replicate(config, child, parameters) for child in seeds])['mean']
+    row = {}
+    for name in SERIES:
+        row[name + '_mean'] = float(means[name].mean())
+        row[name + '_final'] = float(means[name][-1])
+    return row
+
+
+def _run_point(args):
+    return run_point(*args)
+
+
+def sweep(config, points, replicates=1, seed=None, workers=None, cache=None, out=None):
+    """Run every point and collect one table.
+
+    Args:
+        config (dict): Keys of beringia.ensemble.DEFAULT_CONFIG.
+        points (list): {parameter name: value} dicts, eg from grid or latin_hypercube.
+        replicates (int): Runs per point.
+        seed (int): Root seed of every point's replicates.
+        workers (int): Worker processes. None uses every core.
+        cache (str): Directory of cached point results. None disables caching.
+        out (str): Optional CSV file for the table.
+
+    Returns:
+        dict: {column: numpy.ndarray}, with 'key', 'cached', one column per parameter and one per metric.
+
+    """
+    keys = [point_key(config, point, seed, replicates) for point in points]
+    results = {}
+    cached = set()
+    if cache is not None:
+        os.makedirs(cache, exist_ok=True)
+        for key in keys:
+            path = os.path.join(cache, key + '.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    results[key] = json.load(f)['metrics']
+                cached.add(key)
+    todo = {key: point for key, point in zip(keys, points) if key not in results}
+    rows = map_jobs(_run_point, [(config, point, seed, replicates) for point in todo.values()], workers)
+    for (key, point), row in zip(todo.items(), rows):
+        results[key] = row
+        if cache is not None:
+            with open(os.path.join(cache, key + '.json'), 'w') as f:
+                json.dump({'config': config, 'parameters': point, 'seed': seed, 'replicates': replicates,
+                           'metrics': row}, f)
+    names = list(dict.fromkeys(name for point in points for name in point))
+    metrics = list(results[keys[0]]) if keys else []
+    table = {'key': np.array(keys), 'cached': np.array([key in cached for key in keys])}
+    for name in names:
+        table[name] = np.array([point.get(name, np.nan) for point in points])
+    for name in metrics:
+        table[name] = np.array([results[key][name] for key in keys])
+    if out is not None:
+        write_table(table, out)
+    return table
+
+
+def write_table(table, path):
+    """Write a {column: array} table as CSV.
+
+    Args:
+        table (dict):
+        path (str):
+
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(table)
+        writer.writerows(zip(*(column.tolist() for column in table.values())))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""terrain.py
+
+Spatially correlated terrain by spectral synthesis. White noise is filtered in the Fourier domain by the amplitude of a
+von Karman spectrum,
+
+    (1 + (k * correlation_length) ** 2) ** (-(hurst + 1) / 2)
+
+and transformed back, giving a Gaussian field that is smooth over correlation_length cells and rough below it, the
+more so the lower the Hurst exponent. The cost is two real FFTs of the grid, O(N log N) time and O(N) memory, so a
+4096x4096 field takes a few seconds:
+
+    region.randomize_terrain(mean=5, sd=1.5, correlation_length=32, hurst=0.7)
+
+A field is periodic over the grid it is synthesized on, so unless periodic is asked for the grid is padded by twice the
+correlation length and cropped, and opposite edges of the terrain are unrelated.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import numpy as np
+from scipy import fft
+
+
+def spectral_field(shape, correlation_length=8.0, hurst=0.8, rng=None, periodic=False):
+    """A correlated Gaussian field, scaled to mean 0 and standard deviation 1.
+
+    Args:
+        shape (tuple): (xdim, ydim).
+        correlation_length (float): In cells.
+        hurst (float): Hurst exponent, > 0. 1 is smooth, values near 0 are rough.
+        rng (numpy.random.Generator): Source of the noise, or a seed for one. The legacy numpy.random module works too.
+        periodic (bool): Let the field wrap around the edges of the grid.
+
+    Returns:
+        numpy.ndarray: Of shape.
+
+    Raises:
+        ValueError: For a correlation_length or hurst that is not positive.
+
+    """
+    if correlation_length <= 0 or hurst <= 0:
+        raise ValueError("correlation_length and hurst must be positive")
+    if not hasattr(rng, 'standard_normal'):
+        rng = np.random.default_rng(rng)
+    if periodic:
+        padded = tuple(shape)
+    else:
+        pad = int(np.ceil(2 * correlation_length))
+        padded = tuple(fft.next_fast_len(n + min(pad, n), real=True) for n in shape)
+    spectrum = fft.rfft2(rng.standard_normal(padded), overwrite_x=True, workers=-1)
+    k = np.hypot(*np.meshgrid(fft.fftfreq(padded[0]), fft.rfftfreq(padded[1]), indexing='ij', sparse=True))
+    k *= 2 * np.pi * correlation_length
+    k *= k
+    k += 1.0
+    spectrum *= k ** (-(hurst + 1) / 2)
+    spectrum[0, 0] = 0.0
+    field = fft.irfft2(spectrum, padded, overwrite_x=True, workers=-1)[:shape[0], :shape[1]]
+    field -= field.mean()
+    sd = field.std()
+    if sd > 0:
+        field /= sd
+    return field
+
+
+def field_at(locations, correlation_length=8.0, hurst=0.8, rng=None):
+    """spectral_field sampled at integer (x, y) locations, for grids that are not laid out as an xdim by ydim array,
+    like the hex and tri lattices.
+
+    Args:
+        locations (list): (x, y) tuples.
+        correlation_length (float):
+        hurst (float):
+        rng:
+
+    Returns:
+        numpy.ndarray: One value per location.
+
+    """
+    locations = np.asarray(list(locations), dtype=np.int64).reshape(-1, 2)
+    origin = locations.min(axis=0)
+    shape = tuple(locations.max(axis=0) - origin + 1)
+    field = spectral_field(shape, correlation_length, hurst, rng)
+    return field[locations[:, 0] - origin[0], locations[:, 1] - origin[1]]
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""tiled.py
+
+Out of core landscapes. A TiledRegion keeps each layer of a '2d' grid in a memory mapped .npy file in its directory and
+runs every phase of a tick one fixed size tile at a time, so only a few tiles are ever in memory and the grid size is
+bounded by disk rather than RAM. Layers are (xdim, ydim) arrays, as returned by ArrayRegion.get_map_array.
+
+Flora is purely local. Fire and erosion read a one cell halo around each tile:
+    Fire spreads in rounds. A tile spreads fire from its own front cells, in waves, until it can go no further; cells
+    it ignites in its halo join the front of the neighboring tile, which is spread again in the next round. Rounds
+    repeat until no front is left, and each (burning cell, neighbor) link gets exactly one roll, as in ArrayRegion.
+    Erosion takes two passes so that every cell sees the elevations from the start of the step. The first pass works
+    out each cell's transport and direction from its tile and halo, and the second collects the deposits arriving
+    from the halo. The results match ArrayRegion.erode_all.
+
+Grid edges behave like ArrayRegion border cells at a fixed elevation: fire does not spread onto them, and soil carried
+onto them is lost. Fauna and basins are not carried by tiled regions.
+
+    region = TiledRegion('landscape', 10000, 10000, tile=1024, flora_system=3, seed=1)
+    region.pass_time(10)
+    region.save()
+    region = TiledRegion.open('landscape')
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import json
+import os
+
+import numpy as np
+
+from beringia.arrayregion import ArrayRegion, FLORA_SYSTEMS
+from beringia.flora import FloraSystem1
+from beringia.soil import Geology
+from beringia.rng import RandomStreams
+
+
+HEADER = 'tiled.json'
+LAYERS = ('flora_state', 'on_fire', 'elevation_base', 'soil_depth', 'soil_moisture')
+SCRATCH = {'fire_front': np.int8, 'transport': np.float64, 'direction': np.int8, 'soil_next': np.float64,
+           'base_next': np.float64}
+STAY = 4
+
+
+class TiledRegion(object):
+    """TiledRegion class docs
+
+    Args:
+        path (str): Directory for the layer files. It is created if needed.
+        xdim (int):
+        ydim (int):
+        tile (int): Tile edge length in cells.
+        flora_system (int):
+        seed (int): Seed for the region's RandomStreams.
+
+    """
+    def __init__(self, path, xdim=1000, ydim=1000, tile=1024, flora_system=1, seed=None):
+        os.makedirs(path, exist_ok=True)
+        self._setup(path, xdim, ydim, tile, flora_system, seed)
+        geology = Geology()
+        self.border_elevation = self.random.terrain.gamma(5, 0.5) + geology.soil_depth
+        dtype = np.int64 if isinstance(self._flora.state, int) else np.float64
+        initial = {'flora_state': (dtype, self._flora.state), 'on_fire': (np.int8, 0),
+                   'elevation_base': (np.float64, self.border_elevation - geology.soil_depth),
+                   'soil_depth': (np.float64, geology.soil_depth), 'soil_moisture': (np.float64, geology.soil_moisture)}
+        for name, (dtype, value) in initial.items():
+            layer = self._map(name, dtype, 'w+')
+            for x, y in self.tiles():
+                layer[x, y] = value
+            setattr(self, name, layer)
+        self.save()
+
+    def _setup(self, path, xdim, ydim, tile, flora_system, seed):
+        self.path = path
+        self.xdim = xdim
+        self.ydim = ydim
+        self.tile = tile
+        self.grid_type = '2d'
+        self.random = RandomStreams(seed)
+        self.flora_system = flora_system
+        self.flora_class = FLORA_SYSTEMS.get(flora_system, FloraSystem1)
+        self._flora = self.flora_class()
+        self.fauna = []
+        self.time = 0
+        self.tick_hooks = []
+        self.parameters = {}
+        self.flora_parameters = {}
+        self.fire_parameters = {}
+        self.erosion_parameters = {'magnitude': 0.1}
+        self.fauna_parameters = []
+        self.dispersal = None
+        self._scratch = {}
+        self._halo_ignitions = None
+        self._spread = None
+
+    def __repr__(self):
+        return f'tiled region {self.xdim}x{self.ydim} in {self.path}'
+
+    @classmethod
+    def open(cls, path, mmap_mode='r+'):
+        """Reopen a region written by save.
+
+        Args:
+            path (str):
+            mmap_mode (str): 'r+' to keep writing to the layer files, 'c' to keep changes in memory, 'r' to only read.
+
+        Returns:
+            TiledRegion:
+
+        """
+        with open(os.path.join(path, HEADER)) as f:
+            header = json.load(f)
+        region = cls.__new__(cls)
+        region._setup(path, header['xdim'], header['ydim'], header['tile'], header['flora_system'], None)
+        for name in LAYERS:
+            setattr(region, name, np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode))
+        region.border_elevation = header['border_elevation']
+        region.time = header['time']
+        region.set_parameters(header['parameters'])
+        region.random.set_state(header['random_state'])
+        return region
+
+    def save(self):
+        """Flush the layers and write the header."""
+        for name in LAYERS:
+            layer = getattr(self, name)
+            if isinstance(layer, np.memmap):
+                layer.flush()
+        self._write_header(self.path, self.tile)
+
+    def _write_header(self, path, tile):
+        header = {
+            'xdim': self.xdim,
+            'ydim': self.ydim,
+            'tile': tile,
+            'flora_system': self.flora_system,
+            'border_elevation': self.border_elevation,
+            'time': self.time,
+            'parameters': self.parameters,
+            'random_state': self.random.get_state()
+        }
+        with open(os.path.join(path, HEADER), 'w') as f:
+            json.dump(header, f, indent=1)
+
+    # The overrides work the same way as on ArrayRegion; tiled regions have no fauna to apply fauna rates to.
+    set_parameters = ArrayRegion.set_parameters
+    _apply_fauna_parameters = ArrayRegion._apply_fauna_parameters
+
+    def _map(self, name, dtype, mode='r+'):
+        return np.lib.format.open_memmap(os.path.join(self.path, name + '.npy'), mode=mode, dtype=dtype,
+                                         shape=(self.xdim, self.ydim) if mode == 'w+' else None)
+
+    def scratch(self, name):
+        """A per tick working layer, created on first use and reused afterwards."""
+        if name not in self._scratch:
+            self._scratch[name] = self._map('scratch_' + name, SCRATCH[name], 'w+')
+        return self._scratch[name]
+
+    def tiles(self):
+        """Every tile as a pair of slices, in row major tile order."""
+        for x0 in range(0, self.xdim, self.tile):
+            for y0 in range(0, self.ydim, self.tile):
+                yield slice(x0, min(x0 + self.tile, self.xdim)), slice(y0, min(y0 + self.tile, self.ydim))
+
+    def _halo(self, x, y):
+        """The tile grown by one cell on each side, clipped to the grid."""
+        return (slice(max(x.start - 1, 0), min(x.stop + 1, self.xdim)),
+                slice(max(y.start - 1, 0), min(y.stop + 1, self.ydim)))
+
+    def _tile_of(self, cx, cy):
+        x0 = cx // self.tile * self.tile
+        y0 = cy // self.tile * self.tile
+        return slice(x0, min(x0 + self.tile, self.xdim)), slice(y0, min(y0 + self.tile, self.ydim))
+
+    def get_map_array(self, kind="flora"):
+        """Return a whole layer as an (xdim, ydim) array. Only sensible for grids that fit in memory.
+
+        Args:
+            kind (str): "flora", "elev"/"elevation", "fire", "soil" or "moisture".
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        if kind == "elev" or kind == "elevation":
+            return self.elevation_base + self.soil_depth
+        layer = {'flora': self.flora_state, 'fire': self.on_fire, 'soil': self.soil_depth,
+                 'moisture': self.soil_moisture}[kind]
+        return np.asarray(layer, dtype=np.float64)
+
+    def randomize_elevation_base(self, mean=5, sd=1.5):
+        """Draw a normal elevation_base for every cell, tile by tile.
+
+        Args:
+            mean (int):
+            sd (float):
+
+        """
+        for x, y in self.tiles():
+            self.elevation_base[x, y] = self.random.terrain.normal(mean, sd, (x.stop - x.start, y.stop - y.start))
+
+    def pass_time(self, count=1):
+        """Move forward one time(or count # of) step(s).
+
+        Args:
+            count (int):
+
+        """
+        for _ in range(count):
+            self.time += 1
+            self._flora_phase()
+            self.spread_fire()
+            self.erode_all(**self.erosion_parameters)
+            for hook in self.tick_hooks:
+                hook(self)
+
+    def add_tick_hook(self, hook):
+        self.tick_hooks.append(hook)
+
+    def _flora_phase(self):
+        for x, y in self.tiles():
+            self._flora_tile(x, y)
+
+    def _flora_tile(self, x, y):
+        state = np.array(self.flora_state[x, y])
+        on_fire = np.array(self.on_fire[x, y])
+        self.flora_class.bulk_step(state.ravel(), on_fire.ravel(), rng=self.random.flora, **self.flora_parameters)
+        self.flora_state[x, y] = state
+        self.on_fire[x, y] = on_fire
+
+    def spread_fire(self):
+        """Spread fire from every burning cell, tile by tile, until no tile has a front left.
+
+        Returns:
+            int: The number of cells ignited by spreading.
+
+        """
+        pending = [(x, y) for x, y in self.tiles() if self._start_front(x, y)]
+        ignited = 0
+        while pending:
+            queued = {}
+            for x, y in pending:
+                ignited += self._spread_tile(x, y)
+                count, tiles = self._ignite(self._halo_ignitions)
+                ignited += count
+                queued.update(tiles)
+            pending = list(queued.values())
+        return ignited
+
+    def _start_front(self, x, y):
+        """Put the burning cells of a tile on its front. Returns True if there are any."""
+        burning = self.on_fire[x, y] == 1
+        self.scratch('fire_front')[x, y] = burning
+        return bool(burning.any())
+
+    def _spread_tile(self, x, y, commit=True):
+        """Spread fire from the front of one tile for as long as it stays inside the tile.
+
+        Only the tile's own cells are written. Cells ignited in the halo are left in self._halo_ignitions as an
+        (n, 2) array of (x, y) for _ignite. With commit=False the tile's fire flags are held back until _commit_fire,
+        so that tiles spreading at the same time all read their halos as they were when the round started.
+
+        Returns:
+            int: The number of the tile's own cells ignited.
+
+        """
+        front_layer = self.scratch('fire_front')
+        hx, hy = self._halo(x, y)
+        on_fire = np.array(self.on_fire[hx, hy])
+        state = np.asarray(self.flora_state[hx, hy]).ravel()
+        flat = on_fire.ravel()
+        wx, wy = on_fire.shape
+        own_window = (slice(x.start - hx.start, x.stop - hx.start), slice(y.start - hy.start, y.stop - hy.start))
+        inner = np.zeros(on_fire.shape, dtype=bool)
+        inner[own_window] = True
+        window_front = np.zeros(on_fire.shape, dtype=bool)
+        window_front[inner] = np.asarray(front_layer[x, y]).ravel() == 1
+        front_layer[x, y] = 0
+        front = np.flatnonzero(window_front)
+        ignited = 0
+        halo = []
+        while front.size:
+            fx, fy = np.divmod(front, wy)
+            tx = np.concatenate((fx - 1, fx + 1, fx, fx))
+            ty = np.concatenate((fy, fy, fy - 1, fy + 1))
+            inside = (tx >= 0) & (tx < wx) & (ty >= 0) & (ty < wy)
+            targets = tx[inside] * wy + ty[inside]
+            targets = targets[flat[targets] == 0]
+            if not targets.size:
+                break
+            spread_prob = self.flora_class.bulk_spread_prob(state[targets], **self.fire_parameters)
+            hit = np.unique(targets[self.random.fire.uniform(0, 1, targets.size) < spread_prob])
+            flat[hit] = 1
+            own = inner.ravel()[hit]
+            halo.append(hit[~own])
+            front = hit[own]
+            ignited += front.size
+        self._spread = (x, y, on_fire[own_window])
+        if commit:
+            self._commit_fire()
+        halo = np.concatenate(halo) if halo else np.zeros(0, dtype=np.int64)
+        self._halo_ignitions = np.column_stack(np.divmod(halo, wy)) + (hx.start, hy.start)
+        return ignited
+
+    def _commit_fire(self):
+        x, y, on_fire = self._spread
+        self.on_fire[x, y] = on_fire
+        self._spread = None
+
+    def _ignite(self, cells):
+        """Set fire to cells, an (n, 2) array of (x, y), and put them on their tiles' fronts.
+
+        Returns:
+            tuple: The number of cells that were not already burning, and {tile key: tile} of the tiles they are in.
+
+        """
+        front_layer = self.scratch('fire_front')
+        count = 0
+        tiles = {}
+        for cx, cy in cells.tolist():
+            if self.on_fire[cx, cy] == 0:
+                self.on_fire[cx, cy] = 1
+                front_layer[cx, cy] = 1
+                count += 1
+                tile = self._tile_of(cx, cy)
+                tiles[(tile[0].start, tile[1].start)] = tile
+        return count, tiles
+
+    def erode_all(self, magnitude=1.0, rate=0.01):
+        """Erode every cell toward its lowest neighbor in one step, with the rules of ArrayRegion.erode_all.
+
+        Args:
+            magnitude (float):
+            rate (float):
+
+        Returns:
+            float: The total soil transported.
+
+        """
+        total = sum(self._erode_tile(x, y, magnitude, rate) for x, y in self.tiles())
+        for x, y in self.tiles():
+            self._deposit_tile(x, y)
+        return total
+
+    def _erode_tile(self, x, y, magnitude, rate):
+        """First erosion pass: work out each cell's transport and direction from the tile and its halo.
+
+        Only scratch layers are written, so every tile still reads the elevations from the start of the step.
+
+        """
+        hx, hy = self._halo(x, y)
+        elevation = np.full((x.stop - x.start + 2, y.stop - y.start + 2), self.border_elevation)
+        elevation[hx.start - x.start + 1:hx.stop - x.start + 1, hy.start - y.start + 1:hy.stop - y.start + 1] = \
+            self.elevation_base[hx, hy] + self.soil_depth[hx, hy]
+        own = elevation[1:-1, 1:-1]
+        neighbors = np.stack((elevation[:-2, 1:-1], elevation[2:, 1:-1], elevation[1:-1, :-2], elevation[1:-1, 2:]))
+        direction = np.argmin(neighbors, axis=0)
+        lowest = np.take_along_axis(neighbors, direction[None], axis=0)[0]
+        downhill = lowest < own
+        slope = np.where(downhill, own - lowest, 0.01)
+
+        soil = np.asarray(self.soil_depth[x, y])
+        load = magnitude * rate * slope
+        over = load > soil
+        transport = np.where(over, soil, load)
+        self.scratch('base_next')[x, y] = self.elevation_base[x, y] - np.where(over, (load - load * rate) * rate, 0.0)
+        self.scratch('soil_next')[x, y] = np.where(over, load * rate, soil - load) + np.where(downhill, 0.0, transport)
+        self.scratch('transport')[x, y] = np.where(downhill, transport, 0.0)
+        self.scratch('direction')[x, y] = np.where(downhill, direction, STAY)
+        return float(transport.sum())
+
+    def _deposit_tile(self, x, y):
+        """Second erosion pass: add the deposits arriving from the halo and commit the tile."""
+        hx, hy = self._halo(x, y)
+        shape = (x.stop - x.start + 2, y.stop - y.start + 2)
+        window = (slice(hx.start - x.start + 1, hx.stop - x.start + 1),
+                  slice(hy.start - y.start + 1, hy.stop - y.start + 1))
+        transport = np.zeros(shape)
+        transport[window] = self.scratch('transport')[hx, hy]
+        direction = np.full(shape, STAY, dtype=np.int8)
+        direction[window] = self.scratch('direction')[hx, hy]
+        # A cell receives from the neighbor on its x+1 side if that neighbor sends toward x-1 (direction 0), etc.
+        incoming = (np.where(direction[2:, 1:-1] == 0, transport[2:, 1:-1], 0.0)
+                    + np.where(direction[:-2, 1:-1] == 1, transport[:-2, 1:-1], 0.0)
+                    + np.where(direction[1:-1, 2:] == 2, transport[1:-1, 2:], 0.0)
+                    + np.where(direction[1:-1, :-2] == 3, transport[1:-1, :-2], 0.0))
+        self.soil_depth[x, y] = self.scratch('soil_next')[x, y] + incoming
+        self.elevation_base[x, y] = self.scratch('base_next')[x, y]
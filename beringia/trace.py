@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""trace.py
+
+Structured event tracing. Every region has a Tracer, off by default, which records typed events as fixed size records
+(tick, kind, species, cell, value) in an in memory ring buffer, or appends them to a binary file:
+
+    region.tracer.enable()                                  # keep the last 2**20 events in memory
+    region.tracer.enable(path='run.trace')                  # or write every event to a file
+    region.pass_time(100)
+    summarize(region.tracer.events())
+
+Events are recorded a whole array at a time by the array engines, and one locale at a time by Region and its fauna.
+While the tracer is off the only cost is one attribute check per phase, as no event arrays are built. After a run, the
+file can be filtered and summarized without the simulation:
+
+    python -m beringia.trace run.trace --kinds spread ignition --ticks 10 20
+
+The kinds, and the value of their events:
+    feeding: food found by a species in a cell.
+    starvation: animals of a species lost to starvation.
+    reproduction: animals of a species born.
+    emigration: animals of a species leaving a cell.
+    ignition: a cell burning at the start of a fire spread, with its flora state.
+    spread: a cell ignited by spreading fire, with the wave that reached it.
+    erosion: soil carried away from a cell.
+
+.. _Docstring example here:
+   https://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
+
+"""
+import argparse
+import sys
+
+import numpy as np
+
+
+KINDS = ('feeding', 'starvation', 'reproduction', 'emigration', 'ignition', 'spread', 'erosion')
+FEEDING, STARVATION, REPRODUCTION, EMIGRATION, IGNITION, SPREAD, EROSION = range(len(KINDS))
+EVENT_DTYPE = np.dtype([('tick', '<i8'), ('kind', 'u1'), ('species', '<i2'), ('cell', '<i8'), ('value', '<f8')])
+
+
+class Tracer(object):
+    """Tracer class docs
+
+    Args:
+        capacity (int): Events kept by the ring buffer. The oldest are overwritten first.
+        path (str): Append events to this binary file instead.
+        enabled (bool):
+
+    """
+    def __init__(self, capacity=2 ** 20, path=None, enabled=False):
+        self.capacity = capacity
+        self.enabled = False
+        self.path = None
+        self._file = None
+        self.tick = 0
+        self.recorded = 0
+        self._buffer = None
+        if enabled:
+            self.enable(path=path)
+
+    def __repr__(self):
+        target = self.path if self.path else f'ring buffer of {self.capacity}'
+        return f'tracer ({"on" if self.enabled else "off"}, {self.recorded} events, {target})'
+
+    def enable(self, capacity=None, path=None):
+        """Start recording, into a fresh ring buffer or appending to path.
+
+        Args:
+            capacity (int): Overrides the ring buffer size.
+            path (str):
+
+        """
+        self.close()
+        if capacity is not None:
+            self.capacity = capacity
+        self.path = path
+        self.recorded = 0
+        if path:
+            self._file = open(path, 'ab')
+        else:
+            self._buffer = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording. The ring buffer is kept, and a file is closed."""
+        self.enabled = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.disable()
+        self._buffer = None
+
+    def record(self, kind, cells, values, species=-1):
+        """Record one event of kind per cell, at the current tick.
+
+        Args:
+            kind (int): One of the kind constants, eg SPREAD.
+            cells (numpy.ndarray): Cell ids.
+            values (numpy.ndarray or float):
+            species (int): The species row, -1 for events that are not about a species.
+
+        """
+        if not self.enabled:
+            return
+        cells = np.asarray(cells)
+        events = np.empty(cells.size, dtype=EVENT_DTYPE)
+        events['tick'] = self.tick
+        events['kind'] = kind
+        events['species'] = species
+        events['cell'] = cells
+        events['value'] = values
+        if self._file is not None:
+            self._file.write(events.tobytes())
+        else:
+            if events.size > self.capacity:
+                self.recorded += events.size - self.capacity
+                events = events[-self.capacity:]
+            slots = (self.recorded + np.arange(events.size)) % self.capacity
+            self._buffer[slots] = events
+        self.recorded += events.size
+
+    @property
+    def dropped(self):
+        """int: Events overwritten in the ring buffer."""
+        return 0 if self.path else max(0, self.recorded - self.capacity)
+
+    def events(self):
+        """The recorded events, oldest first. Read back from the file when recording to one.
+
+        Returns:
+            numpy.ndarray: Of EVENT_DTYPE.
+
+        """
+        if self.path:
+            if self._file is not None:
+                self._file.flush()
+            return read_trace(self.path)
+        if self._buffer is None:
+            return np.zeros(0, dtype=EVENT_DTYPE)
+        if self.recorded <= self.capacity:
+            return self._buffer[:self.recorded].copy()
+        start = self.recorded % self.capacity
+        return np.concatenate([self._buffer[start:], self._buffer[:start]])
+
+    def save(self, path):
+        """Write the recorded events to a binary trace file, readable with read_trace."""
+        self.events().tofile(path)
+
+
+def read_trace(path):
+    """Load a binary trace file.
+
+    Args:
+        path (str):
+
+    Returns:
+        numpy.ndarray: Of EVENT_DTYPE.
+
+    """
+    return np.fromfile(path, dtype=EVENT_DTYPE)
+
+
+def filter_events(events, kinds=None, ticks=None, species=None, cells=None):
+    """Select events.
+
+    Args:
+        events (numpy.ndarray): Of EVENT_DTYPE.
+        kinds (list): Kind names or constants.
+        ticks (tuple): First and last tick, inclusive.
+        species (list): Species rows.
+        cells (list): Cell ids.
+
+    Returns:
+        numpy.ndarray:
+
+    """
+    keep = np.ones(events.size, dtype=bool)
+    if kinds is not None:
+        keep &= np.isin(events['kind'], [KINDS.index(kind) if isinstance(kind, str) else kind for kind in kinds])
+    if ticks is not None:
+        keep &= (events['tick'] >= ticks[0]) & (events['tick'] <= ticks[1])
+    if species is not None:
+        keep &= np.isin(events['species'], species)
+    if cells is not None:
+        keep &= np.isin(events['cell'], cells)
+    return events[keep]
+
+
+def summarize(events):
+    """Count and total the events of each kind, overall and per species.
+
+    Args:
+        events (numpy.ndarray): Of EVENT_DTYPE.
+
+    Returns:
+        dict: {kind name: {'events', 'total', 'ticks' (first, last), 'cells' (distinct), 'species' ({row: {'events',
+            'total'}})}}
+
+    """
+    summary = {}
+    for kind in np.unique(events['kind']):
+        selected = events[events['kind'] == kind]
+        entry = {'events': int(selected.size), 'total': float(selected['value'].sum()),
+                 'ticks': (int(selected['tick'].min()), int(selected['tick'].max())),
+                 'cells': int(np.unique(selected['cell']).size), 'species': {}}
+        rows, inverse = np.unique(selected['species'], return_inverse=True)
+        counts = np.bincount(inverse, minlength=rows.size)
+        totals = np.bincount(inverse, weights=selected['value'], minlength=rows.size)
+        for row, count, total in zip(rows, counts, totals):
+            if row >= 0:
+                entry['species'][int(row)] = {'events': int(count), 'total': float(total)}
+        summary[KINDS[kind]] = entry
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='beringia.trace', description='Filter and summarize a trace file.')
+    parser.add_argument('path')
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=None)
+    parser.add_argument('--ticks', nargs=2, type=int, default=None, metavar=('FIRST', 'LAST'))
+    parser.add_argument('--species', nargs='+', type=int, default=None)
+    parser.add_argument('--cells', nargs='+', type=int, default=None)
+    parser.add_argument('--out', default=None, help='Write the selected events to this trace file.')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    events = filter_events(read_trace(args.path), args.kinds, args.ticks, args.species, args.cells)
+    if args.out:
+        events.tofile(args.out)
+    for kind, entry in summarize(events).items():
+        print('{}: {} events, total {:.6g}, ticks {}-{}, {} cells'.format(
+            kind, entry['events'], entry['total'], entry['ticks'][0], entry['ticks'][1], entry['cells']))
+        for row, species in entry['species'].items():
+            print('    species {}: {} events, total {:.6g}'.format(row, species['events'], species['total']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
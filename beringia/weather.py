@@ -17,11 +17,13 @@ class Weather(Feature):
 
     Args:
         periodicity (int):
+        rng (numpy.random.Generator): Source of the weather noise. Defaults to the global numpy.random state.
 
     """
-    def __init__(self, periodicity=12):
+    def __init__(self, periodicity=12, rng=None):
         super(Weather, self).__init__()
         self.periodicity = periodicity
+        self.rng = numpy.random if rng is None else rng
         self.rain_base = 0.5
         self.rain_boost = 0.5
         self.rain_wet_season_offset = 6
@@ -42,7 +44,7 @@ class Weather(Feature):
 
         """
         seasonal_variation = math.sin(2*math.pi*(time+self.rain_wet_season_offset)/self.periodicity)
-        rain_noise = numpy.random.lognormal(-3, self.rain_variance)
+        rain_noise = self.rng.lognormal(-3, self.rain_variance)
         rain_fall = seasonal_variation + rain_noise + self.rain_base
         return rain_fall
 
@@ -57,9 +59,24 @@ class Weather(Feature):
 
         """
         seasonal_variation = math.sin(2*math.pi*(time+self.sunlight_offset)/self.periodicity)
-        sunlight_noise = numpy.random.lognormal(-3, self.sunlight_variance)
+        sunlight_noise = self.rng.lognormal(-3, self.sunlight_variance)
         sunlight = seasonal_variation + sunlight_noise + self.sunlight_base
         return sunlight
 
+    def rain_series(self, times):
+        """rain for many times at once, with the noise drawn in one batch.
+
+        Args:
+            times (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+
+        """
+        times = numpy.asarray(times)
+        seasonal_variation = numpy.sin(2*math.pi*(times+self.rain_wet_season_offset)/self.periodicity)
+        rain_noise = self.rng.lognormal(-3, self.rain_variance, times.shape)
+        return seasonal_variation + rain_noise + self.rain_base
+
     def temp(self, time=0):
         pass
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Tests of the ArrayRegion kernels against the object model of beringia.region."""
+import numpy as np
+import pytest
+
+from beringia.arrayregion import ArrayRegion
+from beringia.localebase import FLORA_SYSTEMS
+from beringia.region import Region
+
+
+def _pair(flora_system=1, xdim=9, ydim=7, seed=3):
+    """An ArrayRegion and a Region with the same seed, and so the same border elevations, and the array region's
+    random elevations copied to the locales."""
+    array = ArrayRegion(xdim, ydim, flora_system=flora_system, seed=seed)
+    array.randomize_elevation_base()
+    region = Region(xdim, ydim, flora_system=flora_system, seed=seed)
+    for cell, node in enumerate(np.ndindex(xdim, ydim)):
+        geology = region.get_locale(*node).geology
+        geology.elevation_base = array.elevation_base[cell]
+        geology.recalculate_values()
+    return array, region
+
+
+class _Recorder(object):
+    """Draws from a numpy Generator, keeping every array handed out."""
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.draws = {'uniform': [], 'normal': []}
+
+    def uniform(self, *args):
+        self.draws['uniform'].append(self.rng.uniform(*args))
+        return self.draws['uniform'][-1]
+
+    def normal(self, *args):
+        self.draws['normal'].append(self.rng.normal(*args))
+        return self.draws['normal'][-1]
+
+
+class _Replay(object):
+    """Hands out given draws one at a time, in the order the per locale code asks for them."""
+    def __init__(self, uniform, normal=()):
+        self.draws = {'uniform': iter(uniform), 'normal': iter(normal)}
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        return next(self.draws['uniform'])
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        return next(self.draws['normal'])
+
+
+def _set_flora(array, region, state, on_fire):
+    array.flora_state[:] = state
+    array.on_fire[:] = on_fire
+    for cell, node in enumerate(np.ndindex(array.xdim, array.ydim)):
+        locale = region.get_locale(*node)
+        locale.flora.state = array.flora_state[cell].item()
+        locale.flora.on_fire = locale.on_fire = int(on_fire[cell])
+
+
+def _geology_layers(region):
+    """elevation_base and soil_depth of the region's locales, in ArrayRegion cell order."""
+    geologies = [region.get_locale(*node).geology for node in np.ndindex(region.xdim, region.ydim)]
+    return (np.array([geology.elevation_base for geology in geologies]),
+            np.array([geology.soil_depth for geology in geologies]))
+
+
+def _erode_from_start_of_step(region, magnitude, rate):
+    """Region.erode_one for every locale, with lowest neighbors and slopes taken from the elevations at the start of
+    the step, and every deposit made after all the erosion."""
+    space = region.space
+    elevation = {node: space.nodes[node]['locale'].geology.elevation for node in space.nodes}
+    deposits = []
+    for node in region.nodes:
+        lowest = node
+        for neighbor in space.neighbors(node):
+            if elevation[lowest] > elevation[neighbor]:
+                lowest = neighbor
+        slope = elevation[node] - elevation[lowest] if lowest != node else 0.01
+        deposits.append((lowest, space.nodes[node]['locale'].geology.erode(magnitude, rate, slope)))
+    for lowest, transport in deposits:
+        space.nodes[lowest]['locale'].geology.accrete(transport)
+    return sum(transport for _, transport in deposits)
+
+
+def test_border_elevations_match():
+    array, region = _pair()
+    for node in region.border_nodes:
+        geology = region.space.nodes[node]['locale'].geology
+        assert geology.elevation_base == array.elevation_base[array.n_cells]
+        assert geology.soil_depth == array.soil_depth[array.n_cells]
+    assert (array.elevation_base[array.n_cells:] == array.elevation_base[array.n_cells]).all()
+
+
+def test_erode_all_matches_erode_one_from_the_start_of_the_step():
+    array, region = _pair()
+    for magnitude in (0.1, 1.0, 40.0):
+        transport = array.erode_all(magnitude=magnitude, rate=0.05)
+        expected = _erode_from_start_of_step(region, magnitude, 0.05)
+        assert transport == pytest.approx(expected)
+        base, soil = _geology_layers(region)
+        np.testing.assert_allclose(array.elevation_base[:array.n_cells], base, rtol=1e-12)
+        np.testing.assert_allclose(array.soil_depth[:array.n_cells], soil, rtol=1e-12, atol=1e-15)
+
+
+def test_erode_one_matches_region():
+    array, region = _pair()
+    for node in sorted(region.nodes)[::3]:
+        array.erode_one(node, magnitude=2.0, rate=0.05)
+        region.erode_one(node, magnitude=2.0, rate=0.05)
+    base, soil = _geology_layers(region)
+    np.testing.assert_array_equal(array.elevation_base[:array.n_cells], base)
+    np.testing.assert_array_equal(array.soil_depth[:array.n_cells], soil)
+
+
+def test_flora_bulk_step_matches_locale_pass_time():
+    rng = np.random.default_rng(0)
+    for flora_system, flora_class in FLORA_SYSTEMS.items():
+        array, region = _pair(flora_system, 20, 15)
+        if hasattr(flora_class, 'STATE_CONSTANTS'):
+            state = rng.choice(sorted(flora_class.STATE_CONSTANTS), array.n_cells)
+        else:
+            state = rng.uniform(0.0, 10.5, array.n_cells)
+        _set_flora(array, region, state, rng.random(array.n_cells) < 0.2)
+        burning = array.on_fire == 1
+
+        recorder = _Recorder(flora_system)
+        array.random.flora = recorder
+        array._flora_phase()
+
+        # The cell of each locale, in the order Region runs them.
+        order = [node[0] * array.ydim + node[1] for node in region.nodes]
+        uniform = recorder.draws['uniform'][-1]
+        if uniform.ndim == 2:
+            uniform = uniform[:, order].T.ravel()
+        else:
+            uniform = uniform[order]
+        normal = ()
+        if recorder.draws['normal']:
+            # FloraSystem2 draws its growth for the cells at or below max after burning, in cell order.
+            growing = np.where(burning, state * (1 - 0.9), state) <= 9.9999
+            draw = np.cumsum(growing) - 1
+            normal = recorder.draws['normal'][0][[draw[cell] for cell in order if growing[cell]]]
+        region.random.flora = _Replay(uniform, normal)
+        region._locales_phase()
+
+        locales = [region.get_locale(*node) for node in np.ndindex(array.xdim, array.ydim)]
+        np.testing.assert_array_equal(array.flora_state, [locale.flora.state for locale in locales])
+        np.testing.assert_array_equal(array.on_fire, [locale.flora.on_fire for locale in locales])
+        np.testing.assert_array_equal(array.state, [locale.state for locale in locales])
+
+
+def test_spread_fire_matches_region_in_distribution():
+    """Every burning cell gets one catch_fire roll against each neighbor not yet burning, in both engines, so the
+    chance of each cell burning is the same, though the rolls are drawn in a different order."""
+    state = np.random.default_rng(1).choice([-1, 0, 2, 3, 4, 5], 81, p=[0.05, 0.05, 0.2, 0.3, 0.3, 0.1])
+    on_fire = np.zeros(81, dtype=int)
+    on_fire[40] = 1
+    burnt = {'array': [], 'region': []}
+    for seed in range(300):
+        array, region = _pair(1, 9, 9, seed)
+        _set_flora(array, region, state, on_fire)
+        array.spread_fire(show=False)
+        region.spread_fire(show=False)
+        burnt['array'].append(array.on_fire == 1)
+        burnt['region'].append([region.get_locale(*node).on_fire == 1 for node in np.ndindex(9, 9)])
+    array, region = np.array(burnt['array']), np.array(burnt['region'])
+    assert not array[:, state <= 0].any() and not region[:, state <= 0].any()
+    area = array.sum(axis=1), region.sum(axis=1)
+    error = np.sqrt((area[0].var() + area[1].var()) / 300)
+    assert abs(area[0].mean() - area[1].mean()) < 4 * error
+    # Per cell burn frequencies, binomial over the runs.
+    frequency = array.mean(axis=0), region.mean(axis=0)
+    error = np.sqrt((frequency[0] * (1 - frequency[0]) + frequency[1] * (1 - frequency[1])) / 300) + 1 / 300
+    assert (abs(frequency[0] - frequency[1]) < 5 * error).all()
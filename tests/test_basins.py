@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.basins."""
+import heapq
+
+import numpy as np
+import pytest
+
+from beringia import basins
+from beringia.arrayregion import ArrayRegion
+
+
+def _priority_flood(elevation, table, outlets):
+    """The per cell heap flood that fill_depressions replaces."""
+    n = elevation.size
+    filled = np.full(n, np.inf)
+    heap = [(elevation[cell], cell) for cell in np.flatnonzero(outlets)]
+    filled[outlets] = elevation[outlets]
+    heapq.heapify(heap)
+    while heap:
+        level, cell = heapq.heappop(heap)
+        for neighbor in table[cell]:
+            if neighbor < n and filled[neighbor] == np.inf:
+                filled[neighbor] = max(elevation[neighbor], level)
+                heapq.heappush(heap, (filled[neighbor], neighbor))
+    return filled
+
+
+def _region(grid_type, seed, rough):
+    region = ArrayRegion(24, 18, grid_type=grid_type, seed=seed)
+    if rough:
+        region.randomize_elevation_base()
+    else:
+        region.randomize_terrain(correlation_length=3.0)
+    return region
+
+
+@pytest.mark.parametrize('grid_type', ['2d', 'hex', 'tri'])
+@pytest.mark.parametrize('rough', [False, True])
+def test_fill_depressions_matches_a_priority_flood(grid_type, rough):
+    for seed in range(3):
+        region = _region(grid_type, seed, rough)
+        table = region.neighbor_index.padded()
+        elevation = region.elevation[:region.n_cells].copy()
+        outlets = basins.outlet_cells(table)
+        expected = _priority_flood(elevation, table, outlets)
+        np.testing.assert_array_equal(basins.fill_depressions(elevation, table, outlets), expected)
+        np.testing.assert_array_equal(basins.BasinMap(table).update(elevation), expected)
+
+
+def test_labels_and_aggregates():
+    region = _region('2d', 5, True)
+    table = region.neighbor_index.padded()
+    elevation = region.elevation[:region.n_cells].copy()
+    filled = basins.fill_depressions(elevation, table, basins.outlet_cells(table))
+    labels = basins.label_basins(filled, elevation, table)
+    np.testing.assert_array_equal(labels > 0, filled > elevation)
+    assert labels.max() > 1
+    stats = basins.basin_aggregates(labels, filled, elevation, table)
+    for label in range(1, labels.max() + 1):
+        cells = np.flatnonzero(labels == label)
+        assert stats['area'][label] == cells.size
+        assert stats['volume'][label] == pytest.approx((filled[cells] - elevation[cells]).sum())
+        assert stats['spill_elevation'][label] == filled[cells[0]]
+        outlet = stats['outlet'][label]
+        assert labels[outlet] != label and elevation[outlet] == filled[cells[0]]
+    # The first cell of every basin comes before the first cell of the next.
+    firsts = [np.flatnonzero(labels == label)[0] for label in range(1, labels.max() + 1)]
+    assert firsts == sorted(firsts)
+
+
+@pytest.mark.parametrize('grid_type', ['2d', 'hex', 'tri'])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_incremental_updates_match_a_rebuild(grid_type, seed):
+    region = _region(grid_type, seed, True)
+    table = region.neighbor_index.padded()
+    elevation = region.elevation[:region.n_cells].copy()
+    n = elevation.size
+    neighbors = np.where(table < n, table, n)
+    basin_map = basins.BasinMap(table)
+    basin_map.update(elevation)
+    rng = np.random.default_rng(seed)
+    for _ in range(60):
+        labels = np.append(basin_map.labels, 0)
+        if rng.uniform() < 0.3:
+            # Put a cell next to a basin exactly at its spill elevation, to tie with its outlet.
+            label = rng.choice(np.flatnonzero(basin_map.stats['area']))
+            dirty = rng.choice(np.flatnonzero((labels[:n] != label) & (labels[neighbors] == label).any(axis=1)), 1)
+            elevation[dirty] = basin_map.stats['spill_elevation'][label]
+        else:
+            # Raise or lower cells, mostly on basin rims, so that basins flood, drain, split and merge.
+            rim = np.flatnonzero((labels[:n] == 0) & (labels[neighbors] > 0).any(axis=1))
+            dirty = rng.choice(rim if rng.uniform() < 0.7 else n, 2, replace=False)
+            elevation[dirty] += rng.choice([-1, 1], dirty.size) * rng.exponential(0.3, dirty.size)
+        filled = basin_map.update(elevation, dirty)
+
+        fresh = basins.BasinMap(table)
+        np.testing.assert_array_equal(filled, fresh.update(elevation))
+        # Labels are numbered differently, but must split the cells into the same basins.
+        pairs = np.unique(np.column_stack((basin_map.labels, fresh.labels)), axis=0)
+        assert np.unique(pairs[:, 0]).size == np.unique(pairs[:, 1]).size == len(pairs)
+        for label, match in pairs[pairs[:, 0] > 0]:
+            for key in ('area', 'depth', 'spill_elevation', 'outlet'):
+                assert basin_map.stats[key][label] == fresh.stats[key][match]
+            assert basin_map.stats['volume'][label] == pytest.approx(fresh.stats['volume'][match])
+    assert basin_map.counts['incremental'] > 50
+
+
+@pytest.mark.parametrize('grid_type', ['2d', 'hex'])
+def test_erosion_keeps_the_basins_of_a_rebuild(grid_type):
+    region = _region(grid_type, 2, False)
+    region.find_basins()
+    table = region.neighbor_index.padded()
+    for _ in range(10):
+        region.erode_all(magnitude=0.1)
+        assert np.count_nonzero(region._basin_dirty) < region.n_cells // 10
+        labels = region.get_basin_labels()
+        fresh = basins.BasinMap(table)
+        filled = fresh.update(region.elevation[:region.n_cells])
+        np.testing.assert_array_equal(region.basin_elevation[:region.n_cells], filled)
+        np.testing.assert_array_equal(labels > 0, fresh.labels > 0)
+        assert region.basin_stats['volume'].sum() == pytest.approx(fresh.stats['volume'].sum())
+    assert region.basin_map.counts['incremental'] == 10
+    if grid_type == '2d':
+        np.testing.assert_array_equal(region.get_map_array('basins'), labels.reshape(region.xdim, region.ydim))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.dispersal."""
+import numpy as np
+import pytest
+
+from beringia.arrayregion import ArrayRegion
+from beringia.dispersal import Dispersal
+
+
+@pytest.mark.parametrize('preference, aversion', [(0.0, 0.0), (0.5, 0.0), (0.0, 2.0), (3.0, 1.0)])
+@pytest.mark.parametrize('discrete', [False, True])
+def test_disperse_conserves_population(preference, aversion, discrete):
+    region = ArrayRegion(15, 12, flora_system=3, seed=2)
+    region.randomize_elevation_base()
+    region.pass_time(3)
+    region.dispersal = Dispersal(preference, aversion)
+    rng = np.random.default_rng(0)
+    emigrants = rng.integers(0, 20, region.n_cells).astype(np.float64)
+    if not discrete:
+        emigrants *= 0.37
+    arrivals = region.dispersal.disperse(region, emigrants, discrete=discrete, rng=rng)
+    assert (arrivals >= 0).all()
+    assert arrivals.sum() == pytest.approx(emigrants.sum())
+    if discrete:
+        np.testing.assert_array_equal(arrivals, np.round(arrivals))
+
+
+def test_burnt_cells_are_not_negative_destinations():
+    region = ArrayRegion(10, 10, flora_system=1, seed=0)
+    region.flora_state[:] = -1
+    region.flora_state[::3] = 4
+    region.dispersal = Dispersal(flora_preference=2.0)
+    attraction, total = region.dispersal.weights(region)
+    assert (attraction >= 0).all()
+    emigrants = np.full(region.n_cells, 10.0)
+    arrivals = region.dispersal.disperse(region, emigrants, discrete=True, rng=np.random.default_rng(1))
+    assert arrivals.sum() == emigrants.sum()
+    assert (arrivals >= 0).all()
+
+
+def test_negative_flora_preference_is_rejected():
+    region = ArrayRegion(5, 5, seed=0)
+    with pytest.raises(ValueError):
+        region.set_parameters({'dispersal.flora_preference': -0.5})
+    with pytest.raises(ValueError):
+        Dispersal(flora_preference=-1.0)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.foodwebs and the array feeding of beringia.fauna."""
+import warnings
+
+import numpy as np
+import pytest
+
+from beringia.arrayregion import ArrayRegion
+from beringia.fauna import BulkFauna
+from beringia.flora import FloraSystem1
+from beringia.foodwebs import read_food_webs
+
+
+@pytest.mark.parametrize('web', sorted(read_food_webs()))
+def test_feeding_empty_and_burnt_cells_is_finite(web):
+    region = ArrayRegion(12, 12, flora_system=1, seed=1)
+    region.set_food_web(web)
+    region.fauna_population[:, ::2] = 0
+    region.flora_state[::3] = -1
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        region._fauna_phase()
+    assert np.isfinite(region.fauna_stress).all()
+    assert np.isfinite(region.fauna_population).all()
+
+
+def test_bulk_feed_with_nothing_hunted_leaves_stress_alone():
+    taxa = BulkFauna(prey=FloraSystem1())
+    population = np.array([0.0, 0.0, 2.0])
+    stress = np.array([0.5, 0.5, 0.5])
+    food = np.array([-1.0, 3.0, -1.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        enough_food = taxa.bulk_feed(population, stress, food)
+    np.testing.assert_array_equal(enough_food, [False, True, False])
+    assert stress[0] == 0.5
+    assert stress[1] == 0.5 * 0.25
+    assert stress[2] > 0.5
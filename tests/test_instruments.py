@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.instruments."""
+import time
+
+import pytest
+
+from beringia.arrayregion import ArrayRegion
+from beringia.instruments import Instruments
+
+
+class _Clock(object):
+    """A clock that only moves when told to."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_nested_phases_are_exclusive():
+    clock = _Clock()
+    instruments = Instruments(enabled=True, clock=clock)
+
+    def outer():
+        clock.sleep(0.02)
+        instruments.timed('inner', 0, clock.sleep, 0.05)
+
+    instruments.timed('outer', 0, outer)
+    seconds = instruments.as_dict()['phases']
+    assert seconds['outer']['seconds'] == pytest.approx(0.02)
+    assert seconds['inner']['seconds'] == pytest.approx(0.05)
+
+
+def test_dispersal_is_one_call_per_tick():
+    region = ArrayRegion(20, 20, flora_system=3, seed=0)
+    region.set_food_web('simple')
+    region.instruments.enable()
+    region.pass_time(3)
+    dispersal = region.instruments.as_dict()['phases']['dispersal']
+    assert dispersal['calls'] == 3
+    assert dispersal['cells'] == 3 * region.n_cells * len(region.fauna)
+
+
+def test_phase_shares_add_up_to_the_tick():
+    region = ArrayRegion(40, 40, flora_system=3, seed=0)
+    region.set_food_web('simple')
+    region.instruments.enable()
+    start = time.perf_counter()
+    region.pass_time(3)
+    elapsed = time.perf_counter() - start
+    phases = region.instruments.as_dict()['phases']
+    assert 'dispersal' in phases and 'fauna' in phases
+    assert sum(phase['seconds'] for phase in phases.values()) <= elapsed
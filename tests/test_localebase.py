@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.localebase."""
+import tracemalloc
+
+import numpy as np
+
+from beringia.fauna import BulkFauna
+from beringia.flora import FloraSystem2, FloraSystem3
+from beringia.localebase import Border, Locale
+from beringia.soil import BorderGeology
+
+
+def test_views_write_through_to_the_locale():
+    np.random.seed(0)
+    locale = Locale(flora_system=3, elevation_base=2.0)
+    assert isinstance(locale.flora, FloraSystem3) and isinstance(locale.fauna[0], BulkFauna)
+    assert locale.geology.elevation == locale.geology.basin_elevation == 2.0 + locale.geology.soil_depth
+    locale.pass_time()
+    assert locale.flora.state > FloraSystem3.INITIAL_STATE
+    assert locale.fauna[0].population != 1
+    locale.geology.erode(slope=1.0)
+    locale.geology.set_is_in_basin(True)
+    assert locale.geology.elevation < 2.0 + Locale(elevation_base=2.0).geology.soil_depth
+    assert locale.geology.is_in_basin is True
+    assert locale.fauna[0].prey == locale.flora and locale.fauna[0].location is locale
+    assert isinstance(Locale(flora_system=1).flora.state, int)
+
+
+def test_parameters_are_shared_until_a_locale_changes_them():
+    first, second = Locale(), Locale()
+    first.fauna[0].feeding_rate = 0.9
+    first.geology.hydrology.water_content = 5.0
+    assert first.fauna[0].feeding_rate == 0.9 and second.fauna[0].feeding_rate == 0.3
+    assert second.geology.hydrology.water_content != 5.0
+    assert Locale().fauna[0].feeding_rate == 0.3 and Locale()._kind is Locale()._kind
+
+
+def test_inserting_and_removing_fauna():
+    locale = Locale(fauna_depth=1)
+    locale.fauna[0].population = 0.5
+    locale.insert_fauna(BulkFauna(population=2.0, feeding_rate=0.1))
+    assert [taxa.population for taxa in locale.fauna] == [0.5, 2.0]
+    assert locale.fauna[1].feeding_rate == 0.1 and not isinstance(locale.fauna[1].prey, BulkFauna)
+    assert locale.fauna_set_simple_food_chain() and locale.fauna[1].prey == locale.fauna[0]
+    locale.fauna = locale.fauna[1:]
+    assert [taxa.population for taxa in locale.fauna] == [2.0] and locale.fauna_depth == 1
+    locale.remove_single_fauna()
+    assert locale.fauna == [] and not locale.fauna_set_simple_food_chain()
+
+
+def test_assigned_features_are_adopted():
+    locale = Locale(flora_system=1)
+    flora = FloraSystem2()
+    flora.state = 4.5
+    locale.flora = flora
+    assert isinstance(locale.flora, FloraSystem2) and locale.flora.state == 4.5
+    assert isinstance(Border().geology, BorderGeology) and Border().geology.erode() == 0.0
+
+
+def test_a_cell_costs_a_fifth_of_the_dict_based_model():
+    np.random.seed(0)
+    Locale(flora_system=3).pass_time()
+    tracemalloc.start()
+    try:
+        locales = [Locale(flora_system=3) for _ in range(20000)]
+        for locale in locales:
+            locale.pass_time()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert size / len(locales) < 1180 / 5
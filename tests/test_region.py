@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.region."""
+import numpy as np
+
+from beringia.region import Region
+from beringia.trace import FEEDING, IGNITION, SPREAD
+
+
+def _run(seed, flora_system):
+    region = Region(8, 8, flora_system=flora_system, seed=seed)
+    region.randomize_terrain(correlation_length=2.0)
+    region.insert_new_fauna()
+    np.random.seed(12345 + seed)
+    region.pass_time(5)
+    np.random.uniform(0, 1, 100)
+    return region
+
+
+def test_seed_repeats_a_run_whatever_uses_numpy_random():
+    for flora_system in (1, 2):
+        first, second = _run(3, flora_system), _run(3, flora_system)
+        for kind in ('flora', 'elevation'):
+            np.testing.assert_array_equal(first.get_map_array(kind), second.get_map_array(kind))
+        np.testing.assert_array_equal(first.get_map_array('fauna'), second.get_map_array('fauna'))
+
+
+def test_geology_is_drawn_from_the_terrain_stream():
+    elevation = Region(3, 3, seed=1).get_locale(0, 0).geology.elevation_base
+    assert Region(3, 3, seed=1).get_locale(1, 1).geology.elevation_base == elevation
+    assert Region(3, 3, seed=2).get_locale(0, 0).geology.elevation_base != elevation
+
+
+def test_fire_and_fauna_events_go_to_the_tracer(capsys):
+    region = Region(6, 6, seed=0)
+    region.insert_new_fauna()
+    for node in region.nodes:
+        region.space.nodes[node]['locale'].fauna[0].verbose = True
+    region.get_locale(2, 2).flora.on_fire = 1
+    region.get_locale(2, 2).on_fire = 1
+    region.tracer.enable()
+    region.spread_fire(verbose=True, show=False)
+    region.pass_time(2)
+    assert capsys.readouterr().out == ''
+    kinds = set(region.tracer.events()['kind'])
+    assert {IGNITION, FEEDING} <= kinds
+    assert set(region.tracer.events()['species']) >= {0}
+
+
+def test_spread_events_carry_their_wave():
+    region = Region(12, 12, flora_system=1, seed=0)
+    for node in region.nodes:
+        region.get_locale(*node).flora.state = 5
+    region.get_locale(6, 6).flora.on_fire = 1
+    region.get_locale(6, 6).on_fire = 1
+    region.tracer.enable()
+    region.spread_fire(show=False)
+    events = region.tracer.events()
+    waves = {(6, 6): 0}
+    waves.update(((cell // 12, cell % 12), wave) for cell, wave in events[events['kind'] == SPREAD][['cell', 'value']])
+    assert max(waves.values()) > 2
+    # Every locale was reached from one the wave before.
+    for node, wave in waves.items():
+        if wave:
+            assert wave - 1 in [waves.get(neighbor) for neighbor in region.get_neighbors(*node, ids=True)]
+
+
+def test_neighbor_index_matches_the_graph():
+    for region in (Region(7, 5, seed=0), Region(7, 5, edges=False, seed=0), Region(4, 3, grid_type='hex', seed=0)):
+        index = region.neighbor_index
+        assert index.n_total == region.space.number_of_nodes()
+        assert {index.location(cell) for cell in range(index.n_cells, index.n_total)} == region.border_nodes
+        for cell in range(index.n_total):
+            node = index.location(cell)
+            assert region.space.nodes[node]['locale'] is region._locales[cell]
+            assert {index.location(n) for n in index.neighbors(cell)} == set(region.space.neighbors(node))
+
+
+def test_get_neighbors_rings():
+    region = Region(7, 5, seed=0)
+    rings = region.get_neighbors(0, 0, depth=2, tiered=True, ids=True)
+    assert [sorted(ring) for ring in rings] == [[(0, 1), (1, 0)], [(0, 2), (1, 1), (2, 0)]]
+    rings = region.get_neighbors(0, 0, depth=1, ids=True, borders=True)
+    assert sorted(rings) == [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    assert region.get_neighbors(3, 2)[0] is region.get_locale(*region.get_neighbors(3, 2, ids=True)[0])
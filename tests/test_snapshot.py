@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.snapshot."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from beringia.arrayregion import ArrayRegion
+from beringia.snapshot import LAYERS, HEADER, SnapshotError
+
+
+def _region(web):
+    region = ArrayRegion(14, 11, flora_system=1, seed=6)
+    region.randomize_terrain(correlation_length=3.0)
+    region.set_parameters({'state_constants.3.fireSpreadProb': 0.6, 'erosion.magnitude': 0.3})
+    region.set_food_web(web)
+    region.pass_time(4)
+    region.find_basins()
+    return region
+
+
+@pytest.mark.parametrize('web', ['simple', 'omnivore'])
+@pytest.mark.parametrize('mmap_mode', [None, 'c'])
+def test_round_trip_continues_the_run(tmp_path, web, mmap_mode):
+    region = _region(web)
+    region.save(str(tmp_path / 'snapshot'))
+    loaded = ArrayRegion.load(str(tmp_path / 'snapshot'), mmap_mode=mmap_mode)
+
+    assert (loaded.xdim, loaded.ydim, loaded.time) == (region.xdim, region.ydim, region.time)
+    assert loaded.parameters == region.parameters
+    assert [type(taxa) for taxa in loaded.fauna] == [type(taxa) for taxa in region.fauna]
+    for name in LAYERS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(region, name))
+
+    region.pass_time(3)
+    loaded.pass_time(3)
+    for name in LAYERS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(region, name))
+
+
+def test_unreadable_snapshots_are_rejected(tmp_path):
+    with pytest.raises(SnapshotError):
+        ArrayRegion.load(str(tmp_path / 'missing'))
+    path = str(tmp_path / 'snapshot')
+    ArrayRegion(4, 4, seed=0).save(path)
+    with open(os.path.join(path, HEADER)) as f:
+        header = json.load(f)
+    header['version'] += 1
+    with open(os.path.join(path, HEADER), 'w') as f:
+        json.dump(header, f)
+    with pytest.raises(SnapshotError):
+        ArrayRegion.load(path)
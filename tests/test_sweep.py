@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.sweep and beringia.ensemble."""
+import numpy as np
+
+from beringia.arrayregion import ArrayRegion
+from beringia.ensemble import run_ensemble
+from beringia.fauna import BulkFauna
+from beringia.sweep import grid, latin_hypercube, sweep
+
+CONFIG = {'xdim': 10, 'ydim': 10, 'ticks': 15, 'food_web': 'simple'}
+
+
+def test_fauna_overrides_apply_to_species_added_later():
+    region = ArrayRegion(5, 5, fauna_depth=0, seed=0)
+    region.set_parameters({'fauna.ambient_death_rate': 0.123, 'fauna.1.feeding_rate': 0.7})
+    region.set_food_web('simple')
+    assert [taxa.ambient_death_rate for taxa in region.fauna] == [0.123] * len(region.fauna)
+    assert [taxa.feeding_rate == 0.7 for taxa in region.fauna] == [False, True] + [False] * (len(region.fauna) - 2)
+    region.insert_new_fauna(BulkFauna())
+    assert region.fauna[-1].ambient_death_rate == 0.123
+
+
+def test_sweep_over_a_fauna_rate_changes_the_fauna(tmp_path):
+    points = grid({'fauna.starvation_rate': [0.0, 0.5]})
+    table = sweep(CONFIG, points, seed=1, workers=1, cache=str(tmp_path), out=str(tmp_path / 'sweep.csv'))
+    assert not table['cached'].any()
+    low, high = table['fauna_population_final']
+    assert high < low
+    again = sweep(CONFIG, points + [{'fauna.starvation_rate': 0.25}], seed=1, workers=1, cache=str(tmp_path))
+    assert again['cached'].tolist() == [True, True, False]
+    np.testing.assert_array_equal(again['fauna_population_final'][:2], table['fauna_population_final'])
+    assert (tmp_path / 'sweep.csv').read_text().splitlines()[0].startswith('key,cached,fauna.starvation_rate,')
+
+
+def test_latin_hypercube_hits_every_stratum_once():
+    points = latin_hypercube({'erosion.rate': (0.0, 1.0), 'fauna.feeding_rate': (2.0, 4.0)}, 8, seed=3)
+    assert np.array_equal(np.sort(np.floor([p['erosion.rate'] * 8 for p in points])), np.arange(8))
+    assert np.array_equal(np.sort(np.floor([(p['fauna.feeding_rate'] - 2) * 4 for p in points])), np.arange(8))
+
+
+def test_ensemble_is_reproducible_and_workers_do_not_matter():
+    first = run_ensemble(CONFIG, 3, workers=1, seed=2)
+    second = run_ensemble(CONFIG, 3, workers=2, seed=2)
+    assert first['n_replicates'] == 3
+    for name, values in first['replicates'].items():
+        np.testing.assert_array_equal(values, second['replicates'][name])
+    assert first['replicates']['fauna_population'].std(axis=0).max() > 0
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Tests for beringia.tiled and beringia.parallel."""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from beringia.arrayregion import ArrayRegion
+from beringia.tiled import TiledRegion
+from beringia.parallel import ParallelRegion, WorkerError
+
+
+def test_open_saved_tiled_region(tmp_path):
+    region = TiledRegion(str(tmp_path / 'tiled'), 20, 20, tile=8, seed=1)
+    region.set_parameters({'state_constants.3.fireSpreadProb': 0.5})
+    region.pass_time(2)
+    region.save()
+
+    reopened = TiledRegion.open(str(tmp_path / 'tiled'))
+    assert reopened.time == 2
+    assert reopened.parameters == region.parameters
+    np.testing.assert_array_equal(reopened.get_map_array('flora'), region.get_map_array('flora'))
+    reopened.pass_time(1)
+    assert reopened.time == 3
+
+
+def test_parallel_region_steps():
+    with ParallelRegion(20, 20, workers=2, seed=1) as region:
+        region.set_parameters({'erosion.rate': 0.02})
+        region.pass_time(2)
+        assert region.timings['ticks'] == 2
+        assert np.isfinite(region.get_map_array('elevation')).all()
+
+
+def test_parallel_region_saves_a_tiled_region(tmp_path):
+    with ParallelRegion(16, 12, workers=2, flora_system=3, seed=4) as region:
+        region.randomize_elevation_base()
+        region.pass_time(2)
+        region.save(str(tmp_path / 'saved'), tile=8)
+        layers = {kind: region.get_map_array(kind).copy() for kind in ('flora', 'fire', 'elevation', 'soil')}
+        parameters = region.parameters
+
+    reopened = TiledRegion.open(str(tmp_path / 'saved'))
+    assert (reopened.xdim, reopened.ydim, reopened.tile, reopened.time) == (16, 12, 8, 2)
+    assert reopened.parameters == parameters
+    for kind, layer in layers.items():
+        np.testing.assert_array_equal(reopened.get_map_array(kind), layer)
+    reopened.pass_time(1)
+
+
+def _elevation_base(array):
+    """ArrayRegion's elevation_base as an (xdim, ydim) grid."""
+    return array.elevation_base[:array.n_cells].reshape(array.xdim, array.ydim)
+
+
+def test_tiled_and_parallel_erosion_match_array_region(tmp_path):
+    array = ArrayRegion(13, 11, seed=5)
+    array.randomize_elevation_base()
+    tiled = TiledRegion(str(tmp_path / 'tiled'), 13, 11, tile=4, seed=5)
+    tiled.elevation_base[:] = _elevation_base(array)
+    with ParallelRegion(13, 11, workers=3, seed=5) as parallel:
+        assert tiled.border_elevation == parallel.border_elevation == array.elevation[array.n_cells]
+        parallel.elevation_base[:] = _elevation_base(array)
+        for _ in range(4):
+            total = array.erode_all(1.0, 0.05)
+            assert tiled.erode_all(1.0, 0.05) == pytest.approx(total)
+            assert parallel.erode_all(1.0, 0.05) == pytest.approx(total)
+        for kind in ('elevation', 'soil'):
+            np.testing.assert_allclose(tiled.get_map_array(kind), array.get_map_array(kind), rtol=0, atol=1e-12)
+            np.testing.assert_allclose(parallel.get_map_array(kind), array.get_map_array(kind), rtol=0, atol=1e-12)
+
+
+def test_tiled_and_parallel_fire_burn_the_ignited_components(tmp_path):
+    # Fire spreads through state 5 for sure and never through state 0, so every engine must burn exactly the
+    # connected patches of state 5 that touch an ignition, however the grid is split into tiles.
+    rng = np.random.default_rng(2)
+    state = np.where(rng.uniform(size=(23, 17)) < 0.55, 5, 0)
+    ignitions = [(0, 0), (11, 8), (22, 16), (5, 13)]
+    state[tuple(zip(*ignitions))] = 5
+    labels, _ = ndimage.label(state == 5)
+    expected = np.isin(labels, [labels[cell] for cell in ignitions])
+
+    parameters = {'state_constants.5.fireSpreadProb': 1.0}
+    array = ArrayRegion(23, 17, seed=0)
+    tiled = TiledRegion(str(tmp_path / 'tiled'), 23, 17, tile=5, seed=0)
+    with ParallelRegion(23, 17, workers=3, seed=0) as parallel:
+        for region in (array, tiled, parallel):
+            region.set_parameters(parameters)
+        array.flora_state[:array.n_cells] = state.ravel()
+        array.on_fire[:] = 0
+        for cell in ignitions:
+            array.on_fire[array._cell(*cell)] = 1
+        for region in (tiled, parallel):
+            region.flora_state[:] = state
+            region.on_fire[:] = 0
+            region.on_fire[tuple(zip(*ignitions))] = 1
+        array.spread_fire(show=False)
+        tiled.spread_fire()
+        parallel.spread_fire()
+        np.testing.assert_array_equal(array.get_map_array('fire') == 1, expected)
+        np.testing.assert_array_equal(tiled.get_map_array('fire') == 1, expected)
+        np.testing.assert_array_equal(parallel.get_map_array('fire') == 1, expected)
+
+
+@pytest.mark.parametrize('flora_system', [0, 1, 3])
+def test_one_tile_flora_steps_match_array_region(tmp_path, flora_system):
+    array = ArrayRegion(12, 9, flora_system=flora_system, seed=7)
+    tiled = TiledRegion(str(tmp_path / 'tiled'), 12, 9, tile=12, flora_system=flora_system, seed=7)
+    for _ in range(5):
+        array._flora_phase()
+        tiled._flora_phase()
+        np.testing.assert_array_equal(tiled.flora_state, array.flora_state.reshape(12, 9))
+        np.testing.assert_array_equal(tiled.on_fire, array.on_fire.reshape(12, 9))
+
+
+def test_worker_failures_reach_the_parent_and_close_frees_memory():
+    with pytest.raises(WorkerError, match='erode failed in stripe 0'):
+        with ParallelRegion(12, 10, workers=2, seed=0) as region:
+            blocks = [block.name for block in region._shared.values()]
+            with pytest.raises(WorkerError, match='TypeError'):
+                region.erode_all(rate='x')
+            region.erode_all(1.0, 0.01)
+            assert np.isfinite(region.get_map_array('elevation')).all()
+            region.erode_all(rate='x')
+    for name in blocks:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)